@@ -0,0 +1,136 @@
+# 벤치마크용 합성 소스.
+#   SyntheticHls: 로컬 HTTP 서버가 고정 크기 세그먼트로 된 플레이리스트를 제공한다.
+#   make_test_stream / IngestSink: 실제 재송출 파이프라인(ffmpeg 포함)용 입력 파일과 인제스트 대역
+from __future__ import annotations
+
+import os
+import socket
+import subprocess
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TS_PACKET = 188
+
+
+def _segment(index: int, size: int) -> bytes:
+    # MPEG-TS 동기 바이트(0x47)로 시작하는 188바이트 패킷을 채운다
+    packets = max(1, size // TS_PACKET)
+    packet = b"\x47" + bytes([index % 256]) * (TS_PACKET - 1)
+    return packet * packets
+
+
+class SyntheticHls:
+    def __init__(self, segments: int = 30, segment_bytes: int = 256 * 1024) -> None:
+        self.segments = [_segment(i, segment_bytes) for i in range(segments)]
+        playlist = ["#EXTM3U", "#EXT-X-TARGETDURATION:2", "#EXT-X-MEDIA-SEQUENCE:0"]
+        for i in range(segments):
+            playlist += ["#EXTINF:2.0,", f"seg{i}.ts"]
+        playlist.append("#EXT-X-ENDLIST")
+        self.playlist = ("\n".join(playlist) + "\n").encode()
+        self._httpd: ThreadingHTTPServer | None = None
+
+    def __enter__(self) -> SyntheticHls:
+        source = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):  # noqa: N802
+                path = os.path.basename(self.path)
+                if path == "index.m3u8":
+                    body, ctype = source.playlist, "application/vnd.apple.mpegurl"
+                elif path.startswith("seg") and path.endswith(".ts"):
+                    body, ctype = source.segments[int(path[3:-3])], "video/mp2t"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        threading.Thread(target=self._httpd.serve_forever, args=(0.05,), daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+
+    @property
+    def url(self) -> str:
+        assert self._httpd is not None
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}/index.m3u8"
+
+
+def make_test_stream(path: str, seconds: float, video_bitrate: str = "3000k") -> None:
+    # lavfi testsrc2 + sine 으로 H.264/AAC MPEG-TS 파일을 만든다 (FLV 로 copy 가능한 코덱)
+    subprocess.run(
+        [
+            "ffmpeg",
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-y",
+            "-f",
+            "lavfi",
+            "-i",
+            f"testsrc2=size=1280x720:rate=30:duration={seconds}",
+            "-f",
+            "lavfi",
+            "-i",
+            f"sine=frequency=440:sample_rate=48000:duration={seconds}",
+            "-c:v",
+            "libx264",
+            "-preset",
+            "veryfast",
+            "-b:v",
+            video_bitrate,
+            "-g",
+            "60",
+            "-c:a",
+            "aac",
+            "-b:a",
+            "128k",
+            "-f",
+            "mpegts",
+            path,
+        ],
+        check=True,
+    )
+
+
+class IngestSink:
+    # 인제스트 서버 대역: TCP 로 받은 바이트를 세고 첫 바이트/마지막 바이트 시각을 기록한다
+    def __init__(self) -> None:
+        self.bytes = 0
+        self.first_byte_at: float | None = None
+        self.last_byte_at: float | None = None
+        self._server = socket.create_server(("127.0.0.1", 0))
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    @property
+    def url(self) -> str:
+        return f"tcp://127.0.0.1:{self._server.getsockname()[1]}"
+
+    def _serve(self) -> None:
+        try:
+            conn, _ = self._server.accept()
+        except OSError:
+            return
+        with conn:
+            while chunk := conn.recv(256 * 1024):
+                now = time.perf_counter()
+                if self.first_byte_at is None:
+                    self.first_byte_at = now
+                self.last_byte_at = now
+                self.bytes += len(chunk)
+
+    def close(self, timeout: float = 5.0) -> None:
+        self._thread.join(timeout)
+        self._server.close()
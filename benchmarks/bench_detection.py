@@ -0,0 +1,63 @@
+# 감지 폴링 1회당 비용 비교: 매 폴링마다 YoutubeDL 생성(기존) vs DetectionSession 재사용.
+# 실제 YoutubeDL 생성/초기화 비용은 그대로 두고 extract_info만 가짜 응답으로 대체한다.
+#
+#   uv run python benchmarks/bench_detection.py --polls 200
+from __future__ import annotations
+
+import argparse
+import json
+import time
+import types
+
+import yt_dlp
+
+from youtube_dump import watcher as W
+
+OFFLINE_INFO = {"id": "UCfake", "is_live": False, "live_status": "not_live"}
+
+
+class FakeExtractorYDL(yt_dlp.YoutubeDL):
+    def extract_info(self, url, download=True, *args, **kwargs):  # type: ignore[override]
+        return dict(OFFLINE_INFO)
+
+
+def _measure(poll, polls: int) -> dict:
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    for i in range(polls):
+        poll(f"https://www.youtube.com/@channel{i % 50}")
+    cpu = time.process_time() - cpu
+    wall = time.perf_counter() - wall
+    return {
+        "polls": polls,
+        "cpu_ms_per_poll": cpu * 1000 / polls,
+        "wall_ms_per_poll": wall * 1000 / polls,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--polls", type=int, default=200)
+    args = parser.parse_args()
+
+    W.yt_dlp = types.SimpleNamespace(YoutubeDL=FakeExtractorYDL)
+
+    fresh = _measure(W.get_live_video_url, args.polls)
+    with W.DetectionSession() as session:
+        reused = _measure(lambda url: W.get_live_video_url(url, session=session), args.polls)
+
+    print(
+        json.dumps(
+            {
+                "benchmark": "detection_poll",
+                "fresh_per_poll": fresh,
+                "session": reused,
+                "cpu_speedup": fresh["cpu_ms_per_poll"] / max(reused["cpu_ms_per_poll"], 1e-9),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
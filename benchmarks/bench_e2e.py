@@ -0,0 +1,220 @@
+# 재송출 파이프라인 전체(producer -> relay -> ffmpeg -> 인제스트) 벤치마크. ffmpeg 가 필요하다.
+# yt-dlp 대신 미리 만든 합성 MPEG-TS 파일을 실시간 속도(-re)로 흘리는 ffmpeg 를 producer 로 쓰고
+# (build_ytdlp_cmd 교체), 출력은 로컬 TCP 인제스트 대역(IngestSink)으로 보낸다.
+#   ttfb_s         : restream_youtube 호출부터 인제스트에 첫 바이트가 도착할 때까지
+#   throughput_mbps: 인제스트가 받은 바이트 / 첫 바이트~마지막 바이트 구간
+#   speed          : ffmpeg -progress speed 중앙값 (원본이 실시간이므로 1.0 근처가 정상)
+#   cpu_s, rss_mb  : 세션당 평균 (자식 프로세스 전체 + 이 프로세스의 relay 스레드 등)
+#
+#   uv run python benchmarks/bench_e2e.py --seconds 20 --sessions 1 2 4 --out e2e.json
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from importlib import metadata
+
+from _synthetic import IngestSink, make_test_stream
+
+from youtube_dump import streamer as S
+from youtube_dump.relay import RELAY_BACKENDS
+
+
+def _producer_cmd(path: str) -> list[str]:
+    # 합성 파일을 실시간 속도로 stdout 에 흘린다 (재인코딩 없음)
+    cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-re", "-i", path]
+    return [*cmd, "-c", "copy", "-f", "mpegts", "-"]
+
+
+class _TreeSampler:
+    # /proc 를 주기적으로 읽어 이 프로세스의 자손 프로세스 RSS 합의 최댓값을 잰다 (리눅스 전용)
+
+    def __init__(self, interval: float = 0.25) -> None:
+        self.interval = interval
+        self.peak_bytes = 0
+        self._page = os.sysconf("SC_PAGE_SIZE")
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self) -> _TreeSampler:
+        if os.path.isdir("/proc"):
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            total = sum(self._rss(pid) for pid in self._descendants())
+            self.peak_bytes = max(self.peak_bytes, total)
+
+    def _rss(self, pid: int) -> int:
+        try:
+            with open(f"/proc/{pid}/statm", encoding="ascii") as fp:
+                return int(fp.read().split()[1]) * self._page
+        except (OSError, ValueError, IndexError):
+            return 0
+
+    @staticmethod
+    def _descendants() -> list[int]:
+        children: dict[int, list[int]] = {}
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry}/stat", encoding="ascii", errors="replace") as fp:
+                    stat = fp.read()
+            except OSError:
+                continue
+            # comm 에 공백/괄호가 있을 수 있어 마지막 ')' 뒤에서 ppid 를 읽는다
+            ppid = int(stat.rsplit(")", 1)[1].split()[1])
+            children.setdefault(ppid, []).append(int(entry))
+        found, stack = [], [os.getpid()]
+        while stack:
+            for child in children.get(stack.pop(), []):
+                found.append(child)
+                stack.append(child)
+        return found
+
+
+def _cpu_children() -> float:
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def run(mode: str, sessions: int, relay: str | None, preset: str) -> dict:
+    sinks = [IngestSink() for _ in range(sessions)]
+    speeds: list[list[float]] = [[] for _ in range(sessions)]
+    started = [0.0] * sessions
+    errors: list[str] = []
+
+    def _session(index: int) -> None:
+        samples = speeds[index]
+
+        def _on_progress(record) -> None:  # type: ignore[no-untyped-def]
+            if record.speed is not None and not record.done:
+                samples.append(record.speed)
+
+        started[index] = time.perf_counter()
+        try:
+            S.restream_youtube(
+                source_url=f"synthetic://{index}",
+                stream_key="",
+                ingest_url="",
+                yt_dlp_format="best",
+                copy_mode=mode == "copy",
+                video_bitrate="3000k",
+                audio_bitrate="128k",
+                x264_preset=preset,
+                live_from_start=False,
+                verbose=False,
+                extra_outputs=[sinks[index].url],
+                relay=relay or False,
+                on_progress=_on_progress,
+            )
+        except Exception as exc:
+            errors.append(str(exc))
+
+    threads = [threading.Thread(target=_session, args=(i,)) for i in range(sessions)]
+    cpu_children = _cpu_children()
+    cpu_self = time.process_time()
+    wall = time.perf_counter()
+    with _TreeSampler() as sampler:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    wall = time.perf_counter() - wall
+    cpu = _cpu_children() - cpu_children + time.process_time() - cpu_self
+    for sink in sinks:
+        sink.close()
+
+    ttfb = [
+        sink.first_byte_at - start
+        for sink, start in zip(sinks, started, strict=True)
+        if sink.first_byte_at is not None
+    ]
+    throughput = [
+        sink.bytes * 8 / (sink.last_byte_at - sink.first_byte_at) / 1e6
+        for sink in sinks
+        if sink.first_byte_at is not None and sink.last_byte_at > sink.first_byte_at
+    ]
+    all_speeds = [s for samples in speeds for s in samples]
+    return {
+        "mode": mode,
+        "sessions": sessions,
+        "relay": relay,
+        "errors": errors,
+        "wall_s": wall,
+        "ttfb_s_median": statistics.median(ttfb) if ttfb else None,
+        "ttfb_s_max": max(ttfb) if ttfb else None,
+        "throughput_mbps_median": statistics.median(throughput) if throughput else None,
+        "speed_median": statistics.median(all_speeds) if all_speeds else None,
+        "speed_min": min(all_speeds) if all_speeds else None,
+        "cpu_s_per_session": cpu / sessions,
+        "cpu_pct_per_session": cpu / sessions / wall * 100 if wall else None,
+        "rss_mb_per_session": sampler.peak_bytes / sessions / 1e6,
+        "ingest_bytes": [sink.bytes for sink in sinks],
+    }
+
+
+def _ffmpeg_version() -> str:
+    out = subprocess.run(["ffmpeg", "-version"], capture_output=True, text=True, check=True)
+    return out.stdout.splitlines()[0]
+
+
+def _package_version() -> str | None:
+    try:
+        return metadata.version("youtube-dump")
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=20.0, help="합성 원본 길이(초)")
+    parser.add_argument(
+        "--modes", nargs="+", choices=["copy", "reencode"], default=["copy", "reencode"]
+    )
+    parser.add_argument("--sessions", nargs="+", type=int, default=[1, 2, 4])
+    parser.add_argument("--relay", choices=RELAY_BACKENDS, default=None)
+    parser.add_argument("--preset", default="veryfast")
+    parser.add_argument("--out", default=None, help="결과 JSON 을 이 파일에도 저장")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        source = os.path.join(workdir, "source.ts")
+        make_test_stream(source, args.seconds)
+        S.build_ytdlp_cmd = lambda **kwargs: _producer_cmd(source)
+        results = [
+            run(mode, sessions, args.relay, args.preset)
+            for mode in args.modes
+            for sessions in args.sessions
+        ]
+
+    report = {
+        "benchmark": "e2e",
+        "version": _package_version(),
+        "ffmpeg": _ffmpeg_version(),
+        "cpu_count": os.cpu_count(),
+        "seconds": args.seconds,
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fp:
+            fp.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# CLI 기동 시 import 비용 (-X importtime). 새 인터프리터를 여러 번 띄워 중앙값을 재고,
+# 예산(--budget-ms)을 넘거나 무거운 의존성(yt_dlp, google API 클라이언트)이 딸려 오면 실패한다.
+#
+#   uv run python benchmarks/bench_import.py --runs 5 --budget-ms 250
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# 이 모듈들은 실제로 쓰는 명령(감지, OAuth)에서만 불러와야 한다
+HEAVY_MODULES = ("yt_dlp", "googleapiclient", "google_auth_oauthlib", "google.oauth2")
+
+
+def importtime(module: str) -> dict[str, tuple[int, int]]:
+    # 모듈 이름 -> (self us, cumulative us)
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    timings: dict[str, tuple[int, int]] = {}
+    for line in out.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        if self_us.strip().isdigit():
+            timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--module", default="youtube_dump.cli")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=250.0)
+    parser.add_argument("--top", type=int, default=10, help="누적 시간이 큰 모듈을 몇 개 보여줄지")
+    args = parser.parse_args()
+
+    runs = [importtime(args.module) for _ in range(args.runs)]
+    totals = [timings[args.module][1] / 1000 for timings in runs]
+    last = runs[-1]
+    heavy = sorted(
+        name for name in last if any(name == h or name.startswith(h + ".") for h in HEAVY_MODULES)
+    )
+    top = sorted(last.items(), key=lambda item: item[1][1], reverse=True)[1 : args.top + 1]
+    median = statistics.median(totals)
+    report = {
+        "benchmark": "import_time",
+        "module": args.module,
+        "runs": args.runs,
+        "cumulative_ms_median": median,
+        "cumulative_ms_min": min(totals),
+        "budget_ms": args.budget_ms,
+        "heavy_modules": heavy,
+        "top_ms": {name: cumulative / 1000 for name, (_, cumulative) in top},
+    }
+    print(json.dumps(report, indent=2))
+    if heavy:
+        sys.exit(f"무거운 의존성이 기동 시 import 됨: {', '.join(heavy)}")
+    if median > args.budget_ms:
+        sys.exit(f"import 시간 {median:.1f}ms 가 예산 {args.budget_ms:.0f}ms 를 넘음")
+
+
+if __name__ == "__main__":
+    main()
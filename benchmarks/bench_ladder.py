@@ -0,0 +1,111 @@
+# 렌디션 래더 벤치마크: 렌디션마다 ffmpeg 를 따로 띄우는 경우(디코딩 N번)와
+# --rendition 래더(디코딩 1번, split/scale 후 출력별 인코딩)를 같은 합성 원본으로 비교한다. ffmpeg 가 필요하다.
+# 원본을 -re 없이 최대 속도로 인코딩해 CPU 초와 걸린 시간을 잰다.
+#   cpu_s : 자식 프로세스 CPU 초 합
+#   wall_s: 모든 출력이 끝날 때까지 걸린 시간
+#
+#   uv run python benchmarks/bench_ladder.py --seconds 20 --rendition 720p@2500k 480p@1200k audio@128k
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import tempfile
+import time
+
+from _synthetic import make_test_stream
+
+from youtube_dump import streamer as S
+
+
+def _cpu_children() -> float:
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _config(source: str, renditions: list[S.Rendition], preset: str) -> S.StreamConfig:
+    return S.StreamConfig(
+        ingest_url="",
+        stream_key="",
+        copy_mode=False,
+        video_bitrate="4500k",
+        audio_bitrate="128k",
+        x264_preset=preset,
+        live_from_start=False,
+        verbose=False,
+        extra_outputs=["null"],
+        inputs=[source],
+        renditions=renditions,
+    )
+
+
+def _run(cmds: list[list[str]]) -> dict:
+    for cmd in cmds:
+        cmd.remove("-re")
+    cpu = _cpu_children()
+    wall = time.perf_counter()
+    procs = [subprocess.Popen(cmd) for cmd in cmds]
+    codes = [proc.wait() for proc in procs]
+    return {
+        "processes": len(cmds),
+        "returncodes": codes,
+        "wall_s": time.perf_counter() - wall,
+        "cpu_s": _cpu_children() - cpu,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=20.0, help="합성 원본 길이(초)")
+    parser.add_argument(
+        "--rendition",
+        nargs="+",
+        default=["720p@2500k", "480p@1200k", "audio@128k"],
+        help="출력 URL 없이 렌디션 지정 (출력은 모두 null)",
+    )
+    parser.add_argument("--preset", default="veryfast")
+    parser.add_argument("--out", default=None, help="결과 JSON 을 이 파일에도 저장")
+    args = parser.parse_args()
+
+    renditions = [S.parse_rendition(f"{spec}=null") for spec in args.rendition]
+    with tempfile.TemporaryDirectory() as workdir:
+        source = os.path.join(workdir, "source.ts")
+        make_test_stream(source, args.seconds, video_bitrate="6000k")
+        # 기본 출력 + 렌디션마다 원본을 따로 디코딩하는 ffmpeg
+        separate = [_config(source, [], args.preset).build_ffmpeg_cmd()]
+        for rendition in renditions:
+            cfg = _config(source, [], args.preset)
+            cfg.extra_outputs = [rendition.output]
+            cfg.max_height = rendition.height
+            cfg.video_bitrate = rendition.video_bitrate or cfg.video_bitrate
+            cfg.audio_bitrate = rendition.audio_bitrate or cfg.audio_bitrate
+            cmd = cfg.build_ffmpeg_cmd()
+            if rendition.audio_only:
+                cmd[cmd.index("-c:v") : cmd.index("-c:a")] = ["-vn"]
+            separate.append(cmd)
+        results = {
+            "separate": _run(separate),
+            "ladder": _run([_config(source, renditions, args.preset).build_ffmpeg_cmd()]),
+        }
+
+    report = {
+        "benchmark": "ladder",
+        "cpu_count": os.cpu_count(),
+        "seconds": args.seconds,
+        "renditions": args.rendition,
+        "results": results,
+        "cpu_saved_pct": (1 - results["ladder"]["cpu_s"] / results["separate"]["cpu_s"]) * 100
+        if results["separate"]["cpu_s"]
+        else None,
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fp:
+            fp.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
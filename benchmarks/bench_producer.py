@@ -0,0 +1,79 @@
+# producer 모드별 time-to-first-byte 비교 (합성 HLS 소스 사용).
+#   subprocess: build_ytdlp_cmd 로 `python -m yt_dlp -o -` 를 띄운다 (인터프리터 기동 + 재추출)
+#   inprocess : 감지 단계에서 얻은 info dict 를 재사용해 이 프로세스에서 바로 받는다
+#
+#   uv run python benchmarks/bench_producer.py --runs 5
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import tempfile
+import time
+
+import yt_dlp
+from _synthetic import SyntheticHls
+
+from youtube_dump import producer as P
+from youtube_dump import streamer as S
+
+
+def ttfb_subprocess(url: str) -> float:
+    cmd = S.build_ytdlp_cmd(
+        source_url=url, yt_dlp_format="best", live_from_start=False, verbose=False
+    )
+    # 도중에 죽이면 yt-dlp 가 조각 파일(--Frag1 등)을 남기므로 임시 디렉터리에서 실행
+    with tempfile.TemporaryDirectory() as workdir:
+        start = time.perf_counter()
+        proc = subprocess.Popen(
+            cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, bufsize=0, cwd=workdir
+        )
+        assert proc.stdout is not None
+        proc.stdout.read(1)
+        elapsed = time.perf_counter() - start
+        proc.kill()
+        proc.wait()
+    return elapsed
+
+
+def ttfb_inprocess(info: dict) -> float:
+    start = time.perf_counter()
+    with yt_dlp.YoutubeDL({"quiet": True, "format": "best"}) as ydl:
+        producer = P.InProcessProducer(P.select_formats(info, ydl), ydl=ydl)
+        (fd,) = producer.start()
+        os.read(fd, 1)
+        elapsed = time.perf_counter() - start
+        producer.terminate()
+        producer.wait(timeout=5)
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with SyntheticHls() as source:
+        # 감지 단계의 extract_info 를 흉내 내어 미리 info dict 를 만든다
+        with yt_dlp.YoutubeDL({"quiet": True}) as ydl:
+            info = ydl.extract_info(source.url, download=False)
+
+        results = {}
+        for mode, run in (
+            ("subprocess", lambda: ttfb_subprocess(source.url)),
+            ("inprocess", lambda: ttfb_inprocess(info)),
+        ):
+            samples = [run() for _ in range(args.runs)]
+            results[mode] = {
+                "runs": args.runs,
+                "ttfb_ms_median": statistics.median(samples) * 1000,
+                "ttfb_ms_min": min(samples) * 1000,
+            }
+
+    print(json.dumps({"benchmark": "producer_ttfb", "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
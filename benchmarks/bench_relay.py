@@ -0,0 +1,72 @@
+# relay 백엔드별 처리량과 GB 당 CPU 시간 비교.
+# 원본(`head -c N /dev/zero`)과 소비자(`cat > /dev/null`)는 별도 프로세스라서
+# 이 프로세스의 CPU 시간(process_time)은 relay 가 쓴 만큼만 잡힌다.
+#   legacy: 예전 streamer._forward_stream 과 같은 방식 (read(64KiB) 마다 새 bytes + write/flush)
+#
+#   uv run python benchmarks/bench_relay.py --gb 4
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import time
+
+from youtube_dump import relay as R
+
+GIB = 1024**3
+
+
+def _legacy(src_fd: int, dst_fd: int) -> None:
+    with os.fdopen(src_fd, "rb", closefd=False) as src, os.fdopen(dst_fd, "wb") as dst:
+        for chunk in iter(lambda: src.read(64 * 1024), b""):
+            dst.write(chunk)
+            dst.flush()
+
+
+def run(backend: str, size: int) -> dict:
+    source = subprocess.Popen(["head", "-c", str(size), "/dev/zero"], stdout=subprocess.PIPE)
+    assert source.stdout is not None
+    read_fd, write_fd = os.pipe()
+    sink = subprocess.Popen(["cat"], stdin=read_fd, stdout=subprocess.DEVNULL)
+    os.close(read_fd)
+
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    if backend == "legacy":
+        _legacy(source.stdout.fileno(), write_fd)
+        moved = size
+    else:
+        relay = R.Relay(source.stdout.fileno(), write_fd, backend=backend).start()
+        relay.join()
+        moved = relay.snapshot().bytes_out
+    source.wait()
+    sink.wait()
+    cpu = time.process_time() - cpu
+    wall = time.perf_counter() - wall
+    source.stdout.close()
+    assert moved == size, (backend, moved)
+    return {
+        "throughput_mb_s": size / wall / 1e6,
+        "cpu_s_per_gb": cpu / (size / GIB),
+        "wall_s": wall,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--gb", type=float, default=2.0)
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        default=["legacy", "copy", "ring"] + (["splice"] if R.SPLICE_AVAILABLE else []),
+    )
+    args = parser.parse_args()
+
+    size = int(args.gb * GIB)
+    results = {backend: run(backend, size) for backend in args.backends}
+    print(json.dumps({"benchmark": "relay", "gb": args.gb, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
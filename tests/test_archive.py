@@ -0,0 +1,167 @@
+import json
+import os
+import shutil
+import subprocess
+import time
+
+import pytest
+
+from youtube_dump import archive as A
+from youtube_dump import streamer as S
+
+
+def _segment_name(ts: float, ext: str = ".ts") -> str:
+    return time.strftime(A.SEGMENT_TIME_FORMAT, time.localtime(ts)) + ext
+
+
+def _write_segment(directory, ts: float, size: int) -> str:
+    path = directory / _segment_name(ts)
+    path.write_bytes(b"\0" * size)
+    return str(path)
+
+
+def test_output_spec_ts_and_mp4():
+    muxer, url, options = A.ArchiveConfig("/archive/ch", segment_seconds=30).output_spec()
+    assert muxer == "segment"
+    assert url == "/archive/ch/%Y%m%d-%H%M%S.ts"
+    assert options["segment_time"] == "30"
+    assert options["segment_format"] == "mpegts"
+    assert options["strftime"] == "1"
+
+    _, url, options = A.ArchiveConfig("/archive/ch", container="mp4").output_spec()
+    assert url.endswith(".mp4")
+    assert options["segment_format_options"] == "movflags=+frag_keyframe+empty_moov"
+
+
+def test_archive_config_validates():
+    with pytest.raises(ValueError):
+        A.ArchiveConfig("/archive", container="webm")
+    with pytest.raises(ValueError):
+        A.ArchiveConfig("/archive", segment_seconds=0)
+
+
+def test_apply_retention_by_size_and_age():
+    segments = [A.Segment(f"/a/{i}.ts", 1000.0 + i * 60, 100) for i in range(5)]
+    segments[-1].complete = False
+
+    kept, removed = A.apply_retention(segments, max_bytes=250, max_age_seconds=None, now=2000.0)
+    assert [s.path for s in removed] == ["/a/0.ts", "/a/1.ts", "/a/2.ts"]
+    assert len(kept) == 2
+
+    kept, removed = A.apply_retention(segments, max_bytes=None, max_age_seconds=750, now=1850.0)
+    assert [s.path for s in removed] == ["/a/0.ts", "/a/1.ts"]
+
+    # 쓰이는 중인 마지막 세그먼트는 한도를 넘어도 남긴다
+    kept, removed = A.apply_retention(segments, max_bytes=0, max_age_seconds=0, now=9999.0)
+    assert [s.path for s in kept] == ["/a/4.ts"]
+
+
+def test_recorder_prunes_and_writes_index(tmp_path):
+    now = time.time()
+    base = int(now) - 600
+    for i in range(4):
+        _write_segment(tmp_path, base + i * 60, 1000)
+    (tmp_path / "notes.txt").write_text("ignored")
+
+    cfg = A.ArchiveConfig(str(tmp_path), segment_seconds=60, max_bytes=2500)
+    recorder = A.ArchiveRecorder(cfg, interval=3600, clock=lambda: now)
+    recorder.start()
+    try:
+        assert len(list(tmp_path.glob("*.ts"))) == 2
+        # 기록 중에는 마지막 세그먼트가 색인에 미완료로 표시된다
+        assert [os.path.basename(s.path) for s in recorder.segments()] == [
+            _segment_name(base + 120)
+        ]
+        assert len(A.list_segments(tmp_path, complete_only=False)) == 2
+    finally:
+        recorder.stop()
+
+    segments = A.list_segments(tmp_path)
+    assert [os.path.basename(s.path) for s in segments] == [
+        _segment_name(base + 120),
+        _segment_name(base + 180),
+    ]
+    assert all(os.path.isabs(s.path) and s.size == 1000 for s in segments)
+    assert recorder.removed_count == 2
+    index = json.loads((tmp_path / A.INDEX_NAME).read_text(encoding="utf-8"))
+    assert index["segments"][0]["path"] == _segment_name(base + 120)
+
+
+def test_list_segments_without_index(tmp_path):
+    assert A.list_segments(tmp_path / "missing") == []
+
+
+def test_stream_config_archive_only_and_with_rtmp():
+    kwargs = dict(
+        ingest_url="rtmp://a.rtmp.youtube.com/live2",
+        copy_mode=True,
+        video_bitrate="3000k",
+        audio_bitrate="160k",
+        x264_preset="veryfast",
+        live_from_start=False,
+        verbose=False,
+        archive=A.ArchiveConfig("/archive/ch", segment_seconds=10),
+    )
+    cmd = S.StreamConfig(stream_key="", **kwargs).build_ffmpeg_cmd()
+    assert cmd[cmd.index("-f") + 1] == "segment"
+    assert cmd[cmd.index("-segment_time") + 1] == "10"
+    assert cmd[-1] == "/archive/ch/%Y%m%d-%H%M%S.ts"
+
+    cmd = S.StreamConfig(stream_key="key123", **kwargs).build_ffmpeg_cmd()
+    assert cmd[cmd.index("-f") + 1] == "tee"
+    assert cmd[-1].endswith(
+        "|[f=segment:onfail=ignore:segment_time=10:segment_format=mpegts:"
+        "reset_timestamps=1:strftime=1]/archive/ch/%Y%m%d-%H%M%S.ts"
+    )
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg 필요")
+def test_records_segments_with_ffmpeg(tmp_path):
+    source = subprocess.Popen(
+        [
+            "ffmpeg",
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-f",
+            "lavfi",
+            "-i",
+            "testsrc=duration=4:size=160x120:rate=10",
+            "-f",
+            "lavfi",
+            "-i",
+            "sine=duration=4",
+            "-c:v",
+            "libx264",
+            "-preset",
+            "ultrafast",
+            "-g",
+            "10",
+            "-c:a",
+            "aac",
+            "-f",
+            "mpegts",
+            "pipe:1",
+        ],
+        stdout=subprocess.PIPE,
+    )
+    cfg = S.StreamConfig(
+        ingest_url="rtmp://127.0.0.1:9/live",
+        stream_key="",
+        copy_mode=True,
+        video_bitrate="3000k",
+        audio_bitrate="160k",
+        x264_preset="veryfast",
+        live_from_start=False,
+        verbose=False,
+        archive=A.ArchiveConfig(str(tmp_path), segment_seconds=1),
+    )
+    cmd = cfg.build_ffmpeg_cmd()
+    cmd.remove("-re")
+    with A.ArchiveRecorder(cfg.archive, interval=0.2):
+        proc = subprocess.run(
+            cmd, stdin=source.stdout, capture_output=True, timeout=60, check=False
+        )
+    source.wait()
+    assert proc.returncode == 0, proc.stderr.decode("utf-8", "replace")[-2000:]
+    assert A.list_segments(tmp_path)
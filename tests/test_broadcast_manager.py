@@ -0,0 +1,241 @@
+import json
+import re
+import threading
+import urllib.parse
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httplib2
+import pytest
+from googleapiclient.discovery import build
+from googleapiclient.http import BatchHttpRequest
+
+from youtube_dump import youtube_api as API
+
+
+class _FakeYouTube:
+    # liveStreams/liveBroadcasts 만 흉내 내는 로컬 HTTP 대역 (배치 엔드포인트 포함)
+
+    def __init__(self):
+        self.streams = {}
+        self.broadcasts = {}
+        self.http_requests = []
+        self.calls = []
+        # True: 바인딩 즉시 송출 중 (enableAutoStart 로 이미 들어오는 스트림에 묶인 경우)
+        self.auto_live = False
+        # 여기 든 (method, resource) 요청은 500 으로 실패한다
+        self.fail = set()
+        self.lock = threading.Lock()
+
+    def dispatch(self, method, target, body):  # noqa: PLR0911
+        url = urllib.parse.urlsplit(target)
+        query = dict(urllib.parse.parse_qsl(url.query))
+        resource = url.path.removeprefix("/youtube/v3/")
+        with self.lock:
+            self.calls.append((method, resource))
+            if (method, resource) in self.fail:
+                return 500, {"error": {"code": 500, "message": "backend error"}}
+            if (method, resource) == ("GET", "liveStreams"):
+                return 200, {"items": list(self.streams.values())}
+            if (method, resource) == ("POST", "liveStreams"):
+                stream_id = f"s{len(self.streams) + 1}"
+                self.streams[stream_id] = {
+                    "id": stream_id,
+                    "snippet": body["snippet"],
+                    "cdn": {
+                        "ingestionInfo": {
+                            "ingestionAddress": "rtmp://127.0.0.1/live2",
+                            "streamName": f"key-{stream_id}",
+                        }
+                    },
+                    "status": {"streamStatus": "ready"},
+                    "contentDetails": body["contentDetails"],
+                }
+                return 200, self.streams[stream_id]
+            if (method, resource) == ("POST", "liveBroadcasts"):
+                broadcast_id = f"b{len(self.broadcasts) + 1}"
+                self.broadcasts[broadcast_id] = {
+                    "id": broadcast_id,
+                    "snippet": body["snippet"],
+                    "status": {"lifeCycleStatus": "created"},
+                }
+                return 200, self.broadcasts[broadcast_id]
+            if (method, resource) == ("POST", "liveBroadcasts/bind"):
+                broadcast = self.broadcasts[query["id"]]
+                broadcast["streamId"] = query["streamId"]
+                broadcast["status"]["lifeCycleStatus"] = "live" if self.auto_live else "ready"
+                return 200, broadcast
+            if (method, resource) == ("GET", "liveBroadcasts"):
+                ids = query["id"].split(",")
+                return 200, {"items": [self.broadcasts[i] for i in ids if i in self.broadcasts]}
+            if (method, resource) == ("POST", "liveBroadcasts/transition"):
+                broadcast = self.broadcasts[query["id"]]
+                broadcast["status"]["lifeCycleStatus"] = query["broadcastStatus"]
+                return 200, broadcast
+            if (method, resource) == ("DELETE", "liveBroadcasts"):
+                del self.broadcasts[query["id"]]
+                return 204, None
+        return 404, {"error": {"code": 404, "message": target}}
+
+    def batch(self, content_type, body):
+        message = BytesParser(policy=HTTP).parsebytes(
+            f"Content-Type: {content_type}\r\n\r\n".encode() + body
+        )
+        boundary = "fake-batch-boundary"
+        out = []
+        for part in message.iter_parts():
+            payload = part.get_payload()
+            request_line, rest = payload.split("\n", 1)
+            method, target, _ = request_line.split(" ")
+            inner = re.split(r"\r?\n\r?\n", rest, maxsplit=1)[1]
+            status, result = self.dispatch(method, target, json.loads(inner) if inner else None)
+            text = json.dumps(result) if result is not None else ""
+            content_id = part["Content-ID"].strip("<>")
+            out.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\n"
+                f"Content-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 {status} OK\r\nContent-Type: application/json\r\n\r\n{text}\r\n"
+            )
+        out.append(f"--{boundary}--\r\n")
+        return f"multipart/mixed; boundary={boundary}", "".join(out).encode()
+
+
+@pytest.fixture
+def backend():
+    fake = _FakeYouTube()
+
+    class _Handler(BaseHTTPRequestHandler):
+        def _handle(self):
+            fake.http_requests.append((self.command, self.path))
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            if self.path == "/batch":
+                content_type, data = fake.batch(self.headers["Content-Type"], body)
+                status = 200
+            else:
+                status, result = fake.dispatch(
+                    self.command, self.path, json.loads(body) if body else None
+                )
+                content_type = "application/json"
+                data = json.dumps(result).encode() if result is not None else b""
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        do_GET = do_POST = do_DELETE = _handle  # noqa: N815
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_address[1]}/"
+    service = build(
+        "youtube",
+        "v3",
+        http=httplib2.Http(),
+        static_discovery=True,
+        client_options={"api_endpoint": base},
+    )
+    # 배치 엔드포인트는 discovery 문서의 rootUrl 고정이라 로컬 대역으로 돌린다
+    service.new_batch_http_request = lambda callback=None: BatchHttpRequest(
+        callback=callback, batch_uri=base + "batch"
+    )
+    yield fake, service
+    server.shutdown()
+    server.server_close()
+
+
+def test_create_poll_and_end_many_broadcasts_in_batches(backend):
+    fake, service = backend
+    manager = API.BroadcastManager(API.StreamPool(service=service))
+
+    broadcasts = manager.create_many([f"archive {i}" for i in range(30)])
+    assert [b.ingest for b in broadcasts[:2]] == [
+        ("rtmp://127.0.0.1/live2", "key-s1"),
+        ("rtmp://127.0.0.1/live2", "key-s2"),
+    ]
+    assert {b.status for b in broadcasts} == {"ready"}
+    # 스트림 목록 + 스트림 생성 배치 + broadcast 생성 배치 + 바인딩 배치
+    assert [m for m, _ in fake.http_requests] == ["GET", "POST", "POST", "POST"]
+    assert len(fake.streams) == 30
+    assert {b["streamId"] for b in fake.broadcasts.values()} == set(fake.streams)
+
+    fake.broadcasts["b1"]["status"]["lifeCycleStatus"] = "live"
+    fake.broadcasts["b2"]["status"]["lifeCycleStatus"] = "complete"
+    del fake.broadcasts["b3"]
+    fake.http_requests.clear()
+    statuses = manager.poll()
+    assert len(fake.http_requests) == 1
+    assert (statuses["b1"], statuses["b2"], statuses["b3"]) == ("live", "complete", "revoked")
+    assert len(manager.active) == 28
+
+    fake.http_requests.clear()
+    manager.end_many(manager.active)
+    # 상태 조회 + 종료 배치
+    assert [m for m, _ in fake.http_requests] == ["GET", "POST"]
+    assert fake.broadcasts["b1"]["status"]["lifeCycleStatus"] == "complete"
+    assert set(fake.broadcasts) == {"b1", "b2"}
+    assert manager.active == []
+
+    # 끝난 broadcast 의 스트림은 다음 생성에 다시 쓴다
+    fake.http_requests.clear()
+    (again,) = manager.create_many(["next"])
+    assert again.stream.stream_id in fake.streams
+    assert len(fake.streams) == 30
+    assert [m for m, _ in fake.http_requests] == ["POST", "POST"]
+
+
+@pytest.mark.parametrize("aired", [True, False])
+def test_live_broadcasts_session_creates_and_ends_one_broadcast(backend, aired):
+    fake, service = backend
+    fake.auto_live = aired
+    broadcasts = API.LiveBroadcasts(API.BroadcastManager(API.StreamPool(service=service)))
+    broadcasts.prewarm().result()
+    assert list(fake.streams) == ["s1"]
+
+    with broadcasts.session("[채널] 라이브") as (ingest_url, stream_key):
+        # 키는 방송 생성을 기다리지 않고 바로 나온다
+        assert (ingest_url, stream_key) == ("rtmp://127.0.0.1/live2", "key-s1")
+    broadcasts.close()
+
+    if aired:
+        (broadcast,) = fake.broadcasts.values()
+        assert broadcast["snippet"]["title"] == "[채널] 라이브"
+        assert broadcast["status"]["lifeCycleStatus"] == "complete"
+        assert ("POST", "liveBroadcasts/transition") in fake.calls
+    else:
+        assert fake.broadcasts == {}
+        assert ("DELETE", "liveBroadcasts") in fake.calls
+    assert broadcasts.manager.active == []
+    # 스트림은 풀로 돌아가 다음 라이브에 다시 쓴다
+    assert broadcasts.manager.pool.acquire().stream_id == "s1"
+
+
+def test_create_many_deletes_broadcasts_when_bind_fails(backend):
+    fake, service = backend
+    manager = API.BroadcastManager(API.StreamPool(service=service))
+    fake.fail.add(("POST", "liveBroadcasts/bind"))
+
+    with pytest.raises(API.BroadcastError):
+        manager.create_many(["a", "b"])
+    # 만든 broadcast 는 지우고 스트림은 풀로 돌려준다
+    assert fake.broadcasts == {}
+    assert manager.active == []
+    assert {s.stream_id for s in manager.pool.acquire_many(2)} == {"s1", "s2"}
+    assert len(fake.streams) == 2
+
+
+def test_end_many_releases_streams_when_end_fails(backend):
+    fake, service = backend
+    manager = API.BroadcastManager(API.StreamPool(service=service))
+    (broadcast,) = manager.create_many(["a"])
+    fake.fail.add(("DELETE", "liveBroadcasts"))
+
+    with pytest.raises(API.BroadcastError):
+        manager.end_many([broadcast])
+    assert manager.active == []
+    assert manager.pool.acquire().stream_id == broadcast.stream.stream_id
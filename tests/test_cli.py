@@ -1,3 +1,4 @@
+import pytest
 from click.testing import CliRunner
 
 from youtube_dump import cli as C
@@ -66,6 +67,8 @@ def test_cli_watch_invokes_watcher(monkeypatch):
             "0.1",
             "--max-checks",
             "2",
+            "--restart-max-delay",
+            "30",
         ],
     )
     assert result.exit_code == 0, result.output
@@ -73,3 +76,96 @@ def test_cli_watch_invokes_watcher(monkeypatch):
     assert called["stream_key"] == "abcd"
     assert called["poll_interval_seconds"] == 0.1
     assert called["max_checks"] == 2
+    assert called["restart_policy"].initial_delay == 1.0
+    assert called["restart_policy"].max_delay == 30.0
+
+
+def test_cli_watch_many_invokes_watcher(monkeypatch, tmp_path):
+    called = {}
+
+    def _fake_watch_many_channels(**kwargs):
+        called.update(kwargs)
+
+    monkeypatch.setattr(C.watcher, "watch_many_channels", _fake_watch_many_channels)
+
+    config = tmp_path / "channels.json"
+    config.write_text(
+        '[{"channel_url": "https://www.youtube.com/@a", "stream_key": "abcd"}]', encoding="utf-8"
+    )
+
+    runner = CliRunner()
+    result = runner.invoke(
+        C.cli, ["watch-many", str(config), "--workers", "8", "--max-checks", "1"]
+    )
+    assert result.exit_code == 0, result.output
+    assert called["channels"][0].stream_key == "abcd"
+    assert called["max_detect_workers"] == 8
+    assert called["max_checks"] == 1
+
+
+def test_cli_restream_extra_outputs(monkeypatch):
+    called = {}
+    monkeypatch.setattr(C, "restream_youtube", lambda **kwargs: called.update(kwargs))
+
+    runner = CliRunner()
+    result = runner.invoke(
+        C.cli,
+        [
+            "restream",
+            "https://youtube.com/watch?v=LIVE",
+            "--stream-key",
+            "abcd",
+            "--extra-output",
+            "rtmp://b.rtmp.youtube.com/live2/abcd",
+            "--extra-output",
+            "/archive/live.ts",
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    assert called["extra_outputs"] == ["rtmp://b.rtmp.youtube.com/live2/abcd", "/archive/live.ts"]
+    assert called["copy_mode"] is None
+
+
+def test_cli_restream_archive_only(monkeypatch):
+    called = {}
+    monkeypatch.delenv("YOUTUBE_STREAM_KEY", raising=False)
+    monkeypatch.setattr(C, "restream_youtube", lambda **kwargs: called.update(kwargs))
+
+    runner = CliRunner()
+    result = runner.invoke(
+        C.cli,
+        [
+            "restream",
+            "https://youtube.com/watch?v=LIVE",
+            "--archive-dir",
+            "/archive/live",
+            "--segment-seconds",
+            "30",
+            "--retain-gb",
+            "2",
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    assert called["stream_key"] == ""
+    assert called["archive"].directory == "/archive/live"
+    assert called["archive"].segment_seconds == 30
+    assert called["archive"].max_bytes == 2 * 1024**3
+    assert called["archive"].max_age_seconds is None
+    assert called["relay"] is None
+    assert called["stall_timeout"] is None
+    assert called["speed_alert"] == 0.95
+
+
+@pytest.mark.parametrize(
+    ("args", "expected"), [(["--relay"], "ring"), (["--relay", "splice"], "splice")]
+)
+def test_cli_restream_relay_backend(monkeypatch, args, expected):
+    called = {}
+    monkeypatch.setattr(C, "restream_youtube", lambda **kwargs: called.update(kwargs))
+
+    runner = CliRunner()
+    result = runner.invoke(
+        C.cli, ["restream", "https://youtube.com/watch?v=LIVE", "--stream-key", "abcd", *args]
+    )
+    assert result.exit_code == 0, result.output
+    assert called["relay"] == expected
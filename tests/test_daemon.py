@@ -0,0 +1,239 @@
+import http.client
+import json
+import threading
+import time
+
+import pytest
+
+from youtube_dump import daemon as D
+from youtube_dump import presets as P
+from youtube_dump import watcher as W
+
+LIVE_URL = "https://www.youtube.com/watch?v=LIVE"
+
+
+def _spec(kind="restream", **overrides):
+    return {"kind": kind, "url": LIVE_URL, "stream_key": "k", "copy_mode": False} | overrides
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+class _Runner:
+    # 취소될 때까지 송출하는 척하는 작업 본문
+    def __init__(self):
+        self.started = []
+        self.fail = set()
+
+    def __call__(self, job):
+        self.started.append(job.job_id)
+        if job.config.channel_url in self.fail:
+            raise RuntimeError("ffmpeg 종료 코드 1")
+        job.stop.wait(5)
+
+
+@pytest.fixture
+def runner():
+    return _Runner()
+
+
+def _daemon(runner, **kwargs):
+    return D.JobDaemon(runners={"restream": runner, "watch": runner}, **kwargs)
+
+
+def test_estimate_cost():
+    copy = D.estimate_cost(
+        W.parse_channel_config({"channel_url": LIVE_URL, "stream_key": "k", "copy_mode": True})
+    )
+    assert copy.cores == D.COPY_CORES
+    # 원본 수신 + 유튜브 송출
+    assert copy.mbps == pytest.approx((3.0 + 0.16) * 2)
+
+    config = W.parse_channel_config({
+        "channel_url": LIVE_URL,
+        "stream_key": "k",
+        "extra_outputs": ["./archive.ts"],
+        "renditions": ["540p@1200k=rtmp://b/live2/k", "audio@128k=./audio.m4a"],
+    })
+    assert D.estimate_cost(config).cores == pytest.approx(2.0 + 0.5 + D.AUDIO_CORES)
+    calibration = P.Calibration(
+        width=1920,
+        height=1080,
+        fps=30,
+        video_bitrate="4500k",
+        cpu_count=8,
+        presets={"veryfast": P.PresetMeasurement("veryfast", 4.0, 1.2)},
+    )
+    cost = D.estimate_cost(config, calibration)
+    assert cost.cores == pytest.approx(1.2 + 0.3 + D.AUDIO_CORES)
+    # 파일 출력은 대역폭에 넣지 않는다
+    assert cost.mbps == pytest.approx((3.0 + 0.16) * 2 + 1.2 + 0.16)
+
+
+def test_jobs_over_budget_wait_in_queue(runner):
+    jobs = _daemon(runner, cpu_budget=4.5)
+    first = jobs.submit(_spec())
+    second = jobs.submit(_spec(kind="watch"))
+    third = jobs.submit(_spec())
+    # copy 작업은 남은 예산에 들어가므로 대기 중인 재인코딩 작업을 앞질러 시작한다
+    cheap = jobs.submit(_spec(copy_mode=True))
+    assert [j.state for j in (first, second, third, cheap)] == [
+        "running",
+        "running",
+        "queued",
+        "running",
+    ]
+    assert jobs.usage().cores == pytest.approx(4.1)
+
+    assert jobs.cancel(first.job_id).state == "cancelling"
+    _wait_for(lambda: third.state == "running")
+    assert first.state == "cancelled"
+    assert runner.started == ["1", "2", "4", "3"]
+
+    jobs.close()
+    assert {j.state for j in jobs.jobs()} == {"cancelled"}
+    assert jobs.usage() == D.JobCost(0.0, 0.0)
+
+
+def test_failed_job_frees_budget_for_queue(runner):
+    runner.fail.add("https://www.youtube.com/watch?v=BROKEN")
+    jobs = _daemon(runner, cpu_budget=2.0)
+    broken = jobs.submit(_spec(url="https://www.youtube.com/watch?v=BROKEN"))
+    waiting = jobs.submit(_spec())
+    _wait_for(lambda: waiting.state == "running")
+    assert (broken.state, broken.error) == ("failed", "ffmpeg 종료 코드 1")
+    jobs.close()
+
+
+def test_bandwidth_budget(runner):
+    jobs = _daemon(runner, cpu_budget=100.0, bandwidth_mbps=10.0)
+    assert jobs.submit(_spec()).state == "running"
+    assert jobs.submit(_spec()).state == "queued"
+    jobs.close()
+
+
+def test_rejects_invalid_jobs(runner):
+    jobs = _daemon(runner, cpu_budget=1.0)
+    with pytest.raises(ValueError, match="작업 종류"):
+        jobs.submit(_spec(kind="upload"))
+    with pytest.raises(ValueError, match="알 수 없는 항목"):
+        jobs.submit(_spec(bogus=1))
+    # 예산에 영영 들어가지 못하는 작업은 대기열에 넣지 않는다
+    with pytest.raises(ValueError, match="예산"):
+        jobs.submit(_spec())
+    assert jobs.jobs() == []
+
+
+def test_cancel_queued_job(runner):
+    jobs = _daemon(runner, cpu_budget=2.0)
+    jobs.submit(_spec())
+    queued = jobs.submit(_spec())
+    assert jobs.cancel(queued.job_id).state == "cancelled"
+    assert jobs.cancel("missing") is None
+    jobs.close()
+    assert runner.started == ["1"]
+
+
+def test_control_api(runner):
+    jobs = _daemon(runner, cpu_budget=2.0)
+    server = D.start_control_server(jobs, port=0, token="secret")
+    target = {"port": server.server_address[1], "token": "secret"}
+    try:
+        status, body = D.call_control_api("POST", "/jobs", _spec(), **target)
+        assert (status, body["state"], body["cores"]) == (201, "running", 2.0)
+        assert "k" not in body.values()
+        status, body = D.call_control_api("POST", "/jobs", _spec(), **target)
+        assert (status, body["id"], body["state"]) == (201, "2", "queued")
+
+        status, body = D.call_control_api("GET", "/jobs", **target)
+        assert [item["state"] for item in body["jobs"]] == ["running", "queued"]
+        assert body["budget"] == {"cores": 2.0, "mbps": None}
+        assert body["used"]["cores"] == 2.0
+
+        status, body = D.call_control_api("DELETE", "/jobs/1", **target)
+        assert (status, body["state"]) == (200, "cancelling")
+        _wait_for(lambda: D.call_control_api("GET", "/jobs/2", **target)[1]["state"] == "running")
+
+        status, body = D.call_control_api("POST", "/jobs", {"kind": "watch"}, **target)
+        assert status == 400
+        assert "channel_url" in body["error"]
+        assert D.call_control_api("GET", "/jobs/9", **target)[0] == 404
+        assert D.call_control_api("DELETE", "/jobs/9", **target)[0] == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+        jobs.close()
+
+
+def _raw_request(port, method, path, body=b"", headers=None):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    try:
+        conn.request(method, path, body=body, headers=headers or {})
+        response = conn.getresponse()
+        return response.status, json.loads(response.read() or b"{}")
+    finally:
+        conn.close()
+
+
+def test_control_api_rejects_untrusted_requests(runner):
+    jobs = _daemon(runner, cpu_budget=2.0)
+    server = D.start_control_server(jobs, port=0, token="secret")
+    port = server.server_address[1]
+    body = json.dumps(_spec()).encode()
+    auth = {"Authorization": "Bearer secret"}
+    try:
+        # 토큰이 없거나 틀리면 401
+        assert D.call_control_api("POST", "/jobs", _spec(), port=port)[0] == 401
+        assert D.call_control_api("GET", "/jobs", port=port, token="wrong")[0] == 401
+        # 브라우저(Origin 헤더)는 토큰이 맞아도 403, JSON 이 아닌 본문은 415
+        origin = auth | {"Content-Type": "application/json", "Origin": "http://evil.example"}
+        assert _raw_request(port, "POST", "/jobs", body, origin)[0] == 403
+        form = auth | {"Content-Type": "text/plain"}
+        assert _raw_request(port, "POST", "/jobs", body, form)[0] == 415
+        assert _raw_request(port, "DELETE", "/jobs/1", b"", auth)[0] == 415
+        # 형식이 틀린 항목은 작업을 만들기 전에 400
+        for bad in (
+            {"renditions": "720p@2500k=rtmp://x/y"},
+            {"renditions": 5},
+            {"copy_mode": "no"},
+        ):
+            status, reply = D.call_control_api(
+                "POST", "/jobs", _spec(**bad), port=port, token="secret"
+            )
+            assert status == 400, reply
+        assert jobs.jobs() == []
+    finally:
+        server.shutdown()
+        server.server_close()
+        jobs.close()
+
+
+def test_control_token_file_is_private(tmp_path):
+    path = tmp_path / "conf" / "daemon.token"
+    token = D.write_control_token(path)
+    assert D.read_control_token(path) == token
+    assert path.stat().st_mode & 0o777 == 0o600
+    # 다시 띄우면 새 토큰으로 바꾼다
+    assert D.write_control_token(path) != token
+
+
+def test_watch_job_stops_on_cancel(monkeypatch):
+    # 실제 watch 본문(watch_channel_and_restream)을 취소하면 송출 중인 세션과 폴링이 함께 끝난다
+    streaming = threading.Event()
+
+    def fake_restream_youtube(**kwargs):
+        streaming.set()
+        kwargs["stop_event"].wait(5)
+
+    monkeypatch.setattr(W, "detect_live", lambda url, session: W.Detection(live_video_url=LIVE_URL))
+    monkeypatch.setattr(W, "restream_youtube", fake_restream_youtube)
+    jobs = D.JobDaemon(cpu_budget=4.0)
+    job = jobs.submit(_spec(kind="watch", url="https://www.youtube.com/@handle"))
+    assert streaming.wait(5)
+    jobs.cancel(job.job_id)
+    _wait_for(lambda: job.state == "cancelled")
+    assert job.error is None
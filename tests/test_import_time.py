@@ -0,0 +1,37 @@
+import subprocess
+import sys
+
+# CLI 기동에 딸려 오면 안 되는 무거운 의존성 (감지/OAuth 명령에서만 import)
+HEAVY_MODULES = ("yt_dlp", "googleapiclient", "google_auth_oauthlib", "google.oauth2")
+# 느린 CI 에서도 넘지 않을 넉넉한 예산. 정밀한 비교는 benchmarks/bench_import.py
+BUDGET_MS = 1000
+
+
+def _run(code: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=True
+    )
+
+
+def test_cli_import_does_not_load_heavy_dependencies():
+    out = _run("import sys, youtube_dump.cli; print('\\n'.join(sys.modules))").stdout.split()
+    loaded = [m for m in out if any(m == h or m.startswith(h + ".") for h in HEAVY_MODULES)]
+    assert loaded == []
+
+
+def test_cli_import_time_within_budget():
+    for line in _run("import youtube_dump.cli").stderr.splitlines():
+        if line.rstrip().endswith("| youtube_dump.cli"):
+            cumulative_us = int(line.split("|")[1])
+            break
+    else:
+        raise AssertionError("importtime 출력에 youtube_dump.cli 가 없음")
+    assert cumulative_us / 1000 < BUDGET_MS
+
+
+def test_detection_loads_ytdlp_on_first_use():
+    out = _run(
+        "import sys; from youtube_dump import watcher as W; "
+        "before = 'yt_dlp' in sys.modules; W._yt_dlp(); print(before, 'yt_dlp' in sys.modules)"
+    ).stdout.split()
+    assert out == ["False", "True"]
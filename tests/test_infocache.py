@@ -0,0 +1,232 @@
+import os
+import subprocess
+import sys
+import time
+import types
+
+from youtube_dump import infocache as IC
+from youtube_dump import streamer as S
+from youtube_dump import watcher as W
+
+VIDEO_ID = "abcdefghijk"
+
+
+def _info(expire: float) -> dict:
+    manifest = f"https://rr1.googlevideo.com/videoplayback/expire/{int(expire)}/index.m3u8"
+    return {
+        "id": VIDEO_ID,
+        "title": "live",
+        "is_live": True,
+        "webpage_url": f"https://www.youtube.com/watch?v={VIDEO_ID}",
+        "extractor": "youtube",
+        "extractor_key": "Youtube",
+        "formats": [
+            {
+                "format_id": "96",
+                "url": manifest,
+                "manifest_url": manifest,
+                "protocol": "m3u8_native",
+                "ext": "mp4",
+                "vcodec": "avc1.4d401f",
+                "acodec": "mp4a.40.2",
+            }
+        ],
+    }
+
+
+def test_video_id_from_url():
+    assert IC.video_id_from_url(f"https://www.youtube.com/watch?v={VIDEO_ID}") == VIDEO_ID
+    assert IC.video_id_from_url(f"https://youtu.be/{VIDEO_ID}") == VIDEO_ID
+    assert IC.video_id_from_url(f"https://www.youtube.com/live/{VIDEO_ID}?si=x") == VIDEO_ID
+    assert IC.video_id_from_url("https://www.youtube.com/@handle/live") is None
+
+
+def test_put_get_uses_url_expiry(tmp_path):
+    now = time.time()
+    cache = IC.InfoCache(tmp_path, margin_seconds=600)
+    path = cache.put(_info(now + 3600))
+    assert path == tmp_path / f"{VIDEO_ID}.info.json"
+    assert not list(tmp_path.glob(".*.tmp"))
+
+    cached = cache.get(VIDEO_ID)
+    assert cached is not None
+    assert cached.info["formats"][0]["format_id"] == "96"
+    assert abs(cached.expires_at - (now + 3000)) < 2
+
+
+def test_expired_and_broken_entries_are_misses(tmp_path):
+    now = time.time()
+    cache = IC.InfoCache(tmp_path, margin_seconds=600)
+    # 만료 직전 URL 은 저장하지 않는다
+    assert cache.put(_info(now + 300)) is None
+
+    cache.put(_info(now + 3600))
+    later = IC.InfoCache(tmp_path, margin_seconds=600, clock=lambda: now + 3500)
+    assert later.get(VIDEO_ID) is None
+    assert not cache.path_for(VIDEO_ID).exists()
+
+    cache.put(_info(now + 3600))
+    cache.path_for(VIDEO_ID).write_text("{", encoding="utf-8")
+    os.utime(cache.path_for(VIDEO_ID), (now, now + 3600))
+    assert cache.get(VIDEO_ID) is None
+    assert cache.get("../etc/passwd") is None
+
+
+def test_info_without_expiry_uses_max_age(tmp_path):
+    now = time.time()
+    cache = IC.InfoCache(tmp_path, max_age_seconds=60)
+    info = {"id": VIDEO_ID, "url": "https://example.com/live.m3u8"}
+    cache.put(info)
+    assert abs(cache.get(VIDEO_ID).expires_at - (now + 60)) < 2
+    assert IC.InfoCache(tmp_path, clock=lambda: now + 120).prune() == 1
+
+
+def test_cached_file_is_readable_by_ytdlp(tmp_path):
+    path = IC.InfoCache(tmp_path).put(_info(time.time() + 6 * 3600))
+    cmd = [sys.executable, "-m", "yt_dlp", "--load-info-json", str(path), "--simulate"]
+    out = subprocess.run(
+        [*cmd, "--print", "%(id)s %(format_id)s"], capture_output=True, text=True, check=True
+    )
+    assert out.stdout.strip() == f"{VIDEO_ID} 96"
+
+
+def test_detection_stores_live_info(monkeypatch, tmp_path):
+    info = _info(time.time() + 3600)
+
+    class _FakeYDL:
+        def __init__(self, opts):
+            pass
+
+        def extract_info(self, url, download=False):
+            return info
+
+    monkeypatch.setattr(W, "yt_dlp", types.SimpleNamespace(YoutubeDL=_FakeYDL))
+    cache = IC.InfoCache(tmp_path)
+    with W.DetectionSession(cache=cache) as session:
+        session.detect("https://www.youtube.com/@handle")
+    assert cache.get(VIDEO_ID).info["id"] == VIDEO_ID
+
+
+def test_restream_loads_cached_info(monkeypatch, tmp_path):
+    cache = IC.InfoCache(tmp_path)
+    cache.put(_info(time.time() + 3600))
+    commands = []
+    build_ytdlp_cmd = S.build_ytdlp_cmd
+
+    def fake_build_ytdlp_cmd(**kwargs):
+        commands.append(build_ytdlp_cmd(**kwargs))
+        return [sys.executable, "-c", "import sys; sys.stdout.buffer.write(b'a' * 1000)"]
+
+    monkeypatch.setattr(S, "ensure_binaries", lambda verbose=False: None)
+    monkeypatch.setattr(S, "build_ytdlp_cmd", fake_build_ytdlp_cmd)
+    monkeypatch.setattr(
+        S.StreamConfig,
+        "build_ffmpeg_cmd",
+        lambda self: [sys.executable, "-c", "import sys; sys.stdin.buffer.read()"],
+    )
+
+    S.restream_youtube(
+        source_url=f"https://www.youtube.com/watch?v={VIDEO_ID}",
+        stream_key="abc",
+        ingest_url="rtmp://a.rtmp.youtube.com/live2",
+        yt_dlp_format="best",
+        copy_mode=True,
+        video_bitrate="3000k",
+        audio_bitrate="160k",
+        x264_preset="veryfast",
+        live_from_start=False,
+        verbose=False,
+        info_cache=cache,
+    )
+    (cmd,) = commands
+    assert cmd[-2:] == ["--load-info-json", str(cache.path_for(VIDEO_ID))]
+    assert f"https://www.youtube.com/watch?v={VIDEO_ID}" not in cmd
+
+
+def test_restream_reuses_copy_mode_extraction(monkeypatch, tmp_path):
+    # copy 모드 자동 판별로 추출한 info 를 yt-dlp 가 다시 추출하지 않고 그대로 받는다
+    cache = IC.InfoCache(tmp_path)
+    extractions = []
+    commands = []
+    build_ytdlp_cmd = S.build_ytdlp_cmd
+
+    def fake_extract_formats(source_url, yt_dlp_format, verbose, info=None):
+        extractions.append(source_url)
+        extracted = _info(time.time() + 3600)
+        return extracted, extracted["formats"]
+
+    def fake_build_ytdlp_cmd(**kwargs):
+        commands.append(build_ytdlp_cmd(**kwargs))
+        return [sys.executable, "-c", "import sys; sys.stdout.buffer.write(b'a' * 1000)"]
+
+    monkeypatch.setattr(S, "ensure_binaries", lambda verbose=False: None)
+    monkeypatch.setattr(S, "extract_formats", fake_extract_formats)
+    monkeypatch.setattr(S, "build_ytdlp_cmd", fake_build_ytdlp_cmd)
+    monkeypatch.setattr(
+        S.StreamConfig,
+        "build_ffmpeg_cmd",
+        lambda self: [sys.executable, "-c", "import sys; sys.stdin.buffer.read()"],
+    )
+
+    result = S.restream_youtube(
+        source_url=f"https://www.youtube.com/watch?v={VIDEO_ID}",
+        stream_key="abc",
+        ingest_url="rtmp://a.rtmp.youtube.com/live2",
+        yt_dlp_format="best",
+        copy_mode=None,
+        video_bitrate="3000k",
+        audio_bitrate="160k",
+        x264_preset="veryfast",
+        live_from_start=False,
+        verbose=False,
+        info_cache=cache,
+    )
+    assert result.copy_mode is True
+    assert len(extractions) == 1
+    (cmd,) = commands
+    assert cmd[-2:] == ["--load-info-json", str(cache.path_for(VIDEO_ID))]
+
+
+def test_restream_without_cache_still_extracts_once(monkeypatch):
+    # 캐시가 없어도(restream 기본) 추출한 info 를 임시 파일로 넘기고 세션이 끝나면 지운다
+    extractions = []
+    loaded = []
+    build_ytdlp_cmd = S.build_ytdlp_cmd
+
+    def fake_extract_formats(source_url, yt_dlp_format, verbose, info=None):
+        extractions.append(source_url)
+        extracted = _info(time.time() + 3600)
+        return extracted, extracted["formats"]
+
+    def fake_build_ytdlp_cmd(**kwargs):
+        cmd = build_ytdlp_cmd(**kwargs)
+        assert cmd[-2] == "--load-info-json"
+        loaded.append((cmd[-1], os.path.exists(cmd[-1])))
+        return [sys.executable, "-c", "import sys; sys.stdout.buffer.write(b'a' * 1000)"]
+
+    monkeypatch.setattr(S, "ensure_binaries", lambda verbose=False: None)
+    monkeypatch.setattr(S, "extract_formats", fake_extract_formats)
+    monkeypatch.setattr(S, "build_ytdlp_cmd", fake_build_ytdlp_cmd)
+    monkeypatch.setattr(
+        S.StreamConfig,
+        "build_ffmpeg_cmd",
+        lambda self, **kwargs: [sys.executable, "-c", "import sys; sys.stdin.buffer.read()"],
+    )
+
+    result = S.restream_youtube(
+        source_url=f"https://www.youtube.com/watch?v={VIDEO_ID}",
+        stream_key="abc",
+        ingest_url="rtmp://a.rtmp.youtube.com/live2",
+        yt_dlp_format="best",
+        copy_mode=None,
+        video_bitrate="3000k",
+        audio_bitrate="160k",
+        x264_preset="veryfast",
+        live_from_start=False,
+        verbose=False,
+    )
+    assert result.copy_mode is True
+    assert len(extractions) == 1
+    ((path, existed),) = loaded
+    assert existed
+    assert not os.path.exists(path)
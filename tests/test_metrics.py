@@ -0,0 +1,158 @@
+import sys
+import time
+import types
+import urllib.error
+import urllib.request
+
+import pytest
+
+from youtube_dump import metrics as M
+from youtube_dump import streamer as S
+from youtube_dump import watcher as W
+from youtube_dump.progress import FfmpegProgress
+
+
+def test_render_counter_gauge_histogram():
+    registry = M.Registry()
+    polls = registry.counter("polls_total", "폴링", ("status",))
+    active = registry.gauge("active", "활성")
+    latency = registry.histogram("latency_seconds", "지연", buckets=(0.1, 1.0))
+
+    polls.inc(status="live")
+    polls.inc(2, status="offline")
+    active.inc()
+    active.inc()
+    active.dec()
+    for value in (0.05, 0.5, 0.5, 3.0):
+        latency.observe(value)
+
+    text = registry.render()
+    assert "# TYPE polls_total counter" in text
+    assert 'polls_total{status="live"} 1' in text
+    assert 'polls_total{status="offline"} 2' in text
+    assert "# TYPE active gauge\nactive 1" in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1"} 3' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 4' in text
+    assert "latency_seconds_sum 4.05" in text
+    assert "latency_seconds_count 4" in text
+    assert text.endswith("\n")
+
+
+def test_registry_returns_existing_metric_and_checks_labels():
+    registry = M.Registry()
+    counter = registry.counter("a_total", "a", ("kind",))
+    assert registry.counter("a_total", "a", ("kind",)) is counter
+    with pytest.raises(ValueError):
+        registry.gauge("a_total", "a")
+    with pytest.raises(ValueError):
+        counter.inc(other="x")
+
+
+def test_label_values_are_escaped():
+    registry = M.Registry()
+    registry.counter("e_total", "e", ("v",)).inc(v='a"b\\c')
+    assert 'e_total{v="a\\"b\\\\c"} 1' in registry.render()
+
+
+def test_metrics_server_serves_registry():
+    registry = M.Registry()
+    registry.counter("served_total", "s").inc()
+    server = M.start_metrics_server(0, registry=registry)
+    try:
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        with urllib.request.urlopen(f"{base}/metrics", timeout=5) as response:
+            assert response.headers["Content-Type"] == M.CONTENT_TYPE
+            assert "served_total 1" in response.read().decode()
+        with pytest.raises(urllib.error.HTTPError) as excinfo:
+            urllib.request.urlopen(f"{base}/", timeout=5)
+        assert excinfo.value.code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_detection_records_poll_metrics(monkeypatch):
+    started_at = time.time() - 42
+
+    class _FakeYDL:
+        def __init__(self, opts):
+            pass
+
+        def close(self):
+            pass
+
+        def extract_info(self, url, download=False):
+            if "@broken" in url:
+                raise RuntimeError("boom")
+            return {
+                "id": "VID",
+                "is_live": True,
+                "webpage_url": "https://www.youtube.com/watch?v=VID",
+                "release_timestamp": started_at,
+            }
+
+    monkeypatch.setattr(W, "yt_dlp", types.SimpleNamespace(YoutubeDL=_FakeYDL))
+    live = W.POLLS.value(status="live")
+    offline = W.POLLS.value(status="offline")
+    errors = W.EXTRACT_ERRORS.value()
+    polls = W.POLL_SECONDS.count(path="extract")
+    delays = W.DETECTION_DELAY.count()
+
+    with W.DetectionSession() as session:
+        session.detect("https://www.youtube.com/@a")
+        session.detect("https://www.youtube.com/@a")
+        session.detect("https://www.youtube.com/@broken")
+
+    assert W.POLLS.value(status="live") == live + 2
+    assert W.POLLS.value(status="offline") == offline + 1
+    assert W.EXTRACT_ERRORS.value() == errors + 1
+    assert W.POLL_SECONDS.count(path="extract") == polls + 3
+    # 같은 라이브를 다시 감지해도 감지 지연은 한 번만 기록
+    assert W.DETECTION_DELAY.count() == delays + 1
+
+
+def test_restream_records_session_metrics(monkeypatch):
+    monkeypatch.setattr(S, "ensure_binaries", lambda verbose=False: None)
+    monkeypatch.setattr(
+        S,
+        "build_ytdlp_cmd",
+        lambda **kwargs: [sys.executable, "-c", "import sys; sys.stdout.buffer.write(b'a' * 1000)"],
+    )
+    monkeypatch.setattr(
+        S.StreamConfig,
+        "build_ffmpeg_cmd",
+        lambda self: [sys.executable, "-c", "import sys; sys.stdin.buffer.read()"],
+    )
+    ended = S.SESSIONS.value(outcome="ended", mode="copy")
+    exits = S.FFMPEG_EXITS.value(code=0)
+    durations = S.SESSION_SECONDS.count()
+    relayed = S.RELAY_BYTES.value()
+
+    S.restream_youtube(
+        source_url="https://youtube.com/watch?v=LIVE",
+        stream_key="abc",
+        ingest_url="rtmp://a.rtmp.youtube.com/live2",
+        yt_dlp_format="best",
+        copy_mode=True,
+        video_bitrate="3000k",
+        audio_bitrate="160k",
+        x264_preset="veryfast",
+        live_from_start=False,
+        verbose=False,
+        relay=True,
+    )
+
+    assert S.SESSIONS.value(outcome="ended", mode="copy") == ended + 1
+    assert S.FFMPEG_EXITS.value(code=0) == exits + 1
+    assert S.SESSION_SECONDS.count() == durations + 1
+    assert S.RELAY_BYTES.value() == relayed + 1000
+    assert S.ACTIVE_SESSIONS.value() == 0
+
+
+def test_progress_metrics_count_output_bytes_across_restarts():
+    before = S.OUTPUT_BYTES.value()
+    callback = S._ProgressMetrics()
+    for size in (100, 300, 50):
+        callback(FfmpegProgress(total_size=size, speed=1.0))
+    assert S.OUTPUT_BYTES.value() == before + 350
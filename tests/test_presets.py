@@ -0,0 +1,172 @@
+import shutil
+import sys
+
+import pytest
+
+from youtube_dump import presets as P
+from youtube_dump import streamer as S
+from youtube_dump.progress import FfmpegProgress
+
+COSTS = {"ultrafast": 0.5, "superfast": 0.8, "veryfast": 1.2, "faster": 1.8, "fast": 2.5}
+
+
+def _calibration(costs=COSTS):
+    return P.Calibration(
+        width=1920,
+        height=1080,
+        fps=30,
+        video_bitrate="4500k",
+        cpu_count=8,
+        presets={
+            name: P.PresetMeasurement(preset=name, speed=8 / cost, cpu_per_second=cost)
+            for name, cost in costs.items()
+        }
+        | {"medium": P.PresetMeasurement(preset="medium", speed=2.0, cpu_per_second=3.5)},
+    )
+
+
+def _feed(session, speed, seconds):
+    for t in range(int(seconds) + 1):
+        session(FfmpegProgress(speed=speed, received_at=float(t)))
+
+
+def test_calibration_roundtrip(tmp_path):
+    path = _calibration().save(tmp_path / "calibration.json")
+    loaded = P.Calibration.load(path)
+    assert loaded.presets["fast"].cpu_per_second == 2.5
+    assert loaded.cost("medium", 540) == pytest.approx(3.5 / 4)
+
+    path.write_text("{", encoding="utf-8")
+    assert P.Calibration.load(path) is None
+    assert P.Calibration.load(tmp_path / "missing.json") is None
+
+
+def test_choice_splits_capacity_between_sessions():
+    # 8코어 * 0.75 = 6코어를 동시 세션끼리 나눈다
+    controller = P.PresetController(_calibration(), load=lambda: 0.0)
+    first = controller.start_session()
+    second = controller.start_session()
+    third = controller.start_session()
+    assert [s.choice.preset for s in (first, second, third)] == ["medium", "fast", "faster"]
+
+    controller.end_session(first)
+    controller.end_session(second)
+    controller.end_session(third)
+    assert controller.start_session().choice.preset == "medium"
+
+
+def test_external_load_reduces_budget():
+    controller = P.PresetController(_calibration(), load=lambda: 4.0)
+    assert controller.start_session().choice.preset == "faster"
+    busy = P.PresetController(_calibration(), load=lambda: 8.0)
+    assert busy.start_session().choice.preset == "ultrafast"
+
+
+def test_slow_sessions_step_down_then_scale():
+    controller = P.PresetController(load=lambda: 0.0, promote_after_seconds=30)
+    session = controller.start_session(P.AUTO_PRESET)
+    assert session.choice == P.PresetChoice("veryfast")
+
+    choices = []
+    for _ in range(4):
+        _feed(session, 0.8, 20)
+        controller.end_session(session)
+        session = controller.start_session(P.AUTO_PRESET)
+        choices.append(session.choice)
+    assert choices == [
+        P.PresetChoice("superfast"),
+        P.PresetChoice("ultrafast"),
+        P.PresetChoice("ultrafast", max_height=720),
+        P.PresetChoice("ultrafast", max_height=480),
+    ]
+
+    # 충분히 오래 건강하게 송출하면 한 단계씩 되돌린다
+    _feed(session, 1.0, 40)
+    controller.end_session(session)
+    assert controller.start_session().choice == P.PresetChoice("ultrafast", max_height=720)
+
+
+def test_copy_sessions_do_not_change_penalty():
+    controller = P.PresetController()
+    session = controller.start_session()
+    _feed(session, 0.5, 30)
+    controller.end_session(session, reencoded=False)
+    assert controller.penalty == 0
+
+
+def test_calibrate_measures_each_preset(monkeypatch):
+    clips = []
+    monkeypatch.setattr(P, "make_calibration_clip", lambda path, *args: clips.append(args))
+    monkeypatch.setattr(
+        P,
+        "measure_preset",
+        lambda clip, seconds, preset, bitrate: P.PresetMeasurement(preset, 2.0, COSTS[preset]),
+    )
+    seen = []
+    calibration = P.calibrate(
+        presets=("ultrafast", "fast"), seconds=5, width=1280, height=720, on_measured=seen.append
+    )
+    assert clips == [(5, 1280, 720, 30)]
+    assert [m.preset for m in seen] == ["ultrafast", "fast"]
+    assert calibration.cost("fast") == 2.5
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg 필요")
+def test_calibrate_with_ffmpeg():
+    calibration = P.calibrate(presets=("ultrafast",), seconds=1, width=320, height=180)
+    measured = calibration.presets["ultrafast"]
+    assert measured.speed > 0
+    assert measured.cpu_per_second > 0
+
+
+def test_restream_uses_controller_choice(monkeypatch):
+    controller = P.PresetController(_calibration(), load=lambda: 6.0)
+    commands = []
+    build_ffmpeg_cmd = S.StreamConfig.build_ffmpeg_cmd
+
+    def fake_build_ffmpeg_cmd(self, progress_url=None):
+        commands.append((self.x264_preset, self.max_height, build_ffmpeg_cmd(self, progress_url)))
+        return [sys.executable, "-c", "import sys; sys.stdin.buffer.read()"]
+
+    monkeypatch.setattr(S, "ensure_binaries", lambda verbose=False: None)
+    monkeypatch.setattr(
+        S, "build_ytdlp_cmd", lambda **kwargs: [sys.executable, "-c", "print('a' * 100)"]
+    )
+    monkeypatch.setattr(S.StreamConfig, "build_ffmpeg_cmd", fake_build_ffmpeg_cmd)
+
+    result = S.restream_youtube(
+        source_url="https://www.youtube.com/watch?v=LIVEID",
+        stream_key="abc",
+        ingest_url="rtmp://a.rtmp.youtube.com/live2",
+        yt_dlp_format="best",
+        copy_mode=False,
+        video_bitrate="3000k",
+        audio_bitrate="160k",
+        x264_preset=P.AUTO_PRESET,
+        live_from_start=False,
+        verbose=False,
+        preset_controller=controller,
+    )
+    ((preset, max_height, cmd),) = commands
+    assert (preset, max_height) == ("ultrafast", None)
+    assert cmd[cmd.index("-preset") + 1] == "ultrafast"
+    assert result.x264_preset == "ultrafast"
+    assert controller.start_session().choice.preset == "ultrafast"
+
+
+def test_max_height_adds_scale_filter():
+    cfg = S.StreamConfig(
+        ingest_url="rtmp://a/live2",
+        stream_key="k",
+        copy_mode=False,
+        video_bitrate="3000k",
+        audio_bitrate="160k",
+        x264_preset="ultrafast",
+        live_from_start=False,
+        verbose=False,
+        max_height=720,
+    )
+    cmd = cfg.build_ffmpeg_cmd()
+    assert cmd[cmd.index("-vf") + 1] == "scale=-2:'min(ih,720)'"
+    cfg.copy_mode = True
+    assert "-vf" not in cfg.build_ffmpeg_cmd()
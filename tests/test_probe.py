@@ -0,0 +1,116 @@
+import threading
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from youtube_dump import probe as P
+from youtube_dump import watcher as W
+
+OFFLINE_PAGE = (
+    b"""<html><head>
+<link rel="canonical" href="https://www.youtube.com/channel/UCoffline">
+</head><body>"""
+    + b"x" * 200_000
+)
+
+LIVE_PAGE = b"""<html><head>
+<link rel="canonical" href="https://www.youtube.com/watch?v=LIVEVIDEO01">
+</head><body><script>var ytInitialPlayerResponse = {"videoDetails":
+{"isLiveContent":true},"microformat":{"liveBroadcastDetails":{"isLiveNow":true}}};
+</script></body></html>"""
+
+UPCOMING_PAGE = b"""<html><head>
+<link rel="canonical" href="https://www.youtube.com/watch?v=UPCOMING001">
+</head><body><script>{"videoDetails":{"isUpcoming":true}}</script></body></html>"""
+
+PAGES = {
+    "/@offline/live": OFFLINE_PAGE,
+    "/@live/live": LIVE_PAGE,
+    "/@upcoming/live": UPCOMING_PAGE,
+    "/@consent/live": b"<html><body>Before you continue</body></html>",
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    requests: list = []
+
+    def do_GET(self):
+        type(self).requests.append((self.path, self.headers.get("If-None-Match")))
+        body = PAGES.get(self.path)
+        if body is None:
+            self.send_error(404)
+            return
+        etag = f'"{hash(body)}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    _Handler.requests = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_probe_classifies_pages(server):
+    probe = P.LiveProbe()
+    assert probe.probe(f"{server}/@offline/live").status == P.OFFLINE
+    live = probe.probe(f"{server}/@live/live")
+    assert live.status == P.LIVE
+    assert live.video_id == "LIVEVIDEO01"
+    assert probe.probe(f"{server}/@upcoming/live").status == P.UPCOMING
+    assert probe.probe(f"{server}/@consent/live").status == P.UNKNOWN
+    assert probe.probe(f"{server}/@missing/live").status == P.UNKNOWN
+    assert probe.stats.errors == 1
+
+
+def test_probe_sends_conditional_request(server):
+    probe = P.LiveProbe()
+    first = probe.probe(f"{server}/@offline/live")
+    second = probe.probe(f"{server}/@offline/live")
+    assert not first.not_modified
+    assert second.not_modified
+    assert second.status == P.OFFLINE
+    assert _Handler.requests[0][1] is None
+    assert _Handler.requests[1][1] is not None
+    assert probe.stats.not_modified == 1
+    assert probe.stats.offline == 2
+
+
+def test_detection_session_skips_extraction_when_offline(server, monkeypatch):
+    extracted = []
+
+    class _FakeYDL:
+        def __init__(self, opts):
+            pass
+
+        def extract_info(self, url, download=False):
+            extracted.append(url)
+            return {"is_live": True, "webpage_url": "https://www.youtube.com/watch?v=LIVEVIDEO01"}
+
+    monkeypatch.setattr(W, "yt_dlp", types.SimpleNamespace(YoutubeDL=_FakeYDL))
+
+    with W.DetectionSession(probe=P.LiveProbe()) as session:
+        for _ in range(3):
+            assert session.get_live_video_url(f"{server}/@offline") is None
+        assert session.get_live_video_url(f"{server}/@live").endswith("LIVEVIDEO01")
+
+    assert extracted == [f"{server}/@live/live"]
+    assert session.full_extractions == 1
+    assert session.avoided_extractions == 3
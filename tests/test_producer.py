@@ -0,0 +1,160 @@
+import os
+import subprocess
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import yt_dlp
+
+from youtube_dump import producer as P
+
+SEGMENTS = {f"/seg{i}.ts": bytes([i]) * 1000 for i in range(6)}
+# 여기 든 세그먼트는 처음 한 번 500 을 돌려준다 (재시도 확인용)
+FLAKY: set[str] = set()
+
+VOD_PLAYLIST = (
+    "#EXTM3U\n#EXT-X-TARGETDURATION:2\n#EXT-X-MEDIA-SEQUENCE:0\n"
+    + "".join(f"#EXTINF:2.0,\nseg{i}.ts\n" for i in range(6))
+    + "#EXT-X-ENDLIST\n"
+)
+LIVE_PLAYLIST = "#EXTM3U\n#EXT-X-TARGETDURATION:1\n#EXT-X-MEDIA-SEQUENCE:10\n" + "".join(
+    f"#EXTINF:1.0,\nseg{i}.ts\n" for i in range(6)
+)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/vod.m3u8":
+            body = VOD_PLAYLIST.encode()
+        elif self.path == "/live.m3u8":
+            body = LIVE_PLAYLIST.encode()
+        elif self.path == "/master.m3u8":
+            body = b"#EXTM3U\n#EXT-X-STREAM-INF:BANDWIDTH=100\nlow.m3u8\n"
+            body += b"#EXT-X-STREAM-INF:BANDWIDTH=900\nvod.m3u8\n"
+        elif self.path in SEGMENTS:
+            if self.path in FLAKY:
+                FLAKY.discard(self.path)
+                self.send_error(500)
+                return
+            body = SEGMENTS[self.path]
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _read_all(fd):
+    chunks = []
+    while chunk := os.read(fd, 65536):
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def test_parse_m3u8_media_and_master():
+    playlist = P.parse_m3u8(LIVE_PLAYLIST, "https://example.com/a/live.m3u8")
+    assert playlist.media_sequence == 10
+    assert playlist.target_duration == 1.0
+    assert playlist.segments[0] == (10, "https://example.com/a/seg0.ts")
+    assert playlist.segments[-1][0] == 15
+    assert not playlist.endlist
+
+    master = P.parse_m3u8('#EXT-X-STREAM-INF:BANDWIDTH=5,CODECS="x"\nhi.m3u8\n', "https://e/m")
+    assert master.variants == [(5, "https://e/hi.m3u8")]
+
+
+def test_select_formats_reuses_info():
+    info = {
+        "id": "x",
+        "title": "x",
+        "extractor": "generic",
+        "formats": [
+            {"format_id": "v", "url": "https://e/v", "vcodec": "avc1", "acodec": "none"},
+            {"format_id": "a", "url": "https://e/a", "vcodec": "none", "acodec": "mp4a"},
+            {"format_id": "b", "url": "https://e/b", "vcodec": "avc1", "acodec": "mp4a"},
+        ],
+    }
+    with yt_dlp.YoutubeDL({"quiet": True, "format": "b"}) as ydl:
+        assert [f["format_id"] for f in P.select_formats(info, ydl)] == ["b"]
+    with yt_dlp.YoutubeDL({"quiet": True, "format": "v+a"}) as ydl:
+        assert [f["format_id"] for f in P.select_formats(info, ydl)] == ["v", "a"]
+    with yt_dlp.YoutubeDL({"quiet": True, "format": "missing"}) as ydl:
+        assert P.select_formats(info, ydl) == []
+    # 원본 info 는 바뀌지 않는다
+    assert "requested_formats" not in info
+
+
+def test_unsupported_protocol_rejected():
+    with pytest.raises(P.UnsupportedSourceError):
+        P.InProcessProducer([{"url": "x", "protocol": "http_dash_segments"}])
+
+
+@pytest.mark.parametrize("path", ["/vod.m3u8", "/master.m3u8"])
+def test_inprocess_producer_streams_hls(server, path):
+    producer = P.InProcessProducer([{"url": server + path, "protocol": "m3u8_native"}])
+    (fd,) = producer.start()
+    data = _read_all(fd)
+    assert data == b"".join(SEGMENTS[f"/seg{i}.ts"] for i in range(6))
+    assert producer.wait() == 0
+    assert producer.bytes_written == len(data)
+    producer.close_read_fds()
+
+
+def test_inprocess_producer_retries_failed_segment(server):
+    # 세그먼트 하나가 한 번 실패해도 다시 받아 빠짐/중복 없이 이어서 쓴다
+    FLAKY.update({"/vod.m3u8", "/seg2.ts"})
+    producer = P.InProcessProducer([{"url": server + "/vod.m3u8", "protocol": "m3u8"}])
+    (fd,) = producer.start()
+    data = _read_all(fd)
+    assert data == b"".join(SEGMENTS[f"/seg{i}.ts"] for i in range(6))
+    assert producer.wait() == 0
+    producer.close_read_fds()
+
+
+def test_inprocess_producer_starts_live_at_edge_and_terminates(server):
+    producer = P.InProcessProducer([{"url": server + "/live.m3u8", "protocol": "m3u8"}])
+    (fd,) = producer.start()
+    expected = b"".join(SEGMENTS[f"/seg{i}.ts"] for i in range(3, 6))
+    received = b""
+    while len(received) < len(expected):
+        received += os.read(fd, 65536)
+    assert received == expected
+    assert producer.poll() is None
+    # 살아 있는 producer 를 기다리다 시간이 다 되면 실패(1)가 아니라 TimeoutExpired
+    with pytest.raises(subprocess.TimeoutExpired):
+        producer.wait(timeout=0.1)
+
+    producer.terminate()
+    assert producer.wait(timeout=5) == 0
+
+
+def test_url_expiry():
+    assert (
+        P.url_expiry("https://manifest.googlevideo.com/api/manifest/hls/expire/1700000000/ei/x")
+        == 1700000000.0
+    )
+    assert P.url_expiry("https://rr1.googlevideo.com/videoplayback?expire=1700000123&id=1") == (
+        1700000123.0
+    )
+    assert P.url_expiry("https://example.com/live.m3u8") is None
+
+
+def test_resolve_formats_rejects_dash():
+    info = {"url": "https://e/manifest.mpd", "protocol": "http_dash_segments"}
+    with pytest.raises(P.UnsupportedSourceError):
+        P.resolve_formats("https://youtube.com/watch?v=LIVE", "best", False, info)
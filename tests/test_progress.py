@@ -0,0 +1,139 @@
+import sys
+
+from youtube_dump import progress as PG
+from youtube_dump import streamer as S
+from youtube_dump import watchdog as WD
+
+SAMPLE = """frame=120
+fps=29.97
+stream_0_0_q=23.0
+bitrate=2987.4kbits/s
+total_size=1500000
+out_time_us=4000000
+out_time_ms=4000000
+out_time=00:00:04.000000
+dup_frames=1
+drop_frames=2
+speed=0.98x
+progress=continue
+frame=0
+fps=0.00
+bitrate=N/A
+total_size=N/A
+out_time_ms=0
+speed=N/A
+progress=end
+"""
+
+
+def test_parse_progress_blocks():
+    first, last = list(PG.parse_progress(SAMPLE.splitlines()))
+    assert first.frame == 120
+    assert first.fps == 29.97
+    assert first.bitrate_kbps == 2987.4
+    assert first.total_size == 1500000
+    assert first.out_time == 4.0
+    assert (first.dup_frames, first.drop_frames) == (1, 2)
+    assert first.speed == 0.98
+    assert not first.done
+
+    assert last.bitrate_kbps is None and last.total_size is None and last.speed is None
+    assert last.out_time_us == 0
+    assert last.done
+
+
+def _record(speed, at):
+    return PG.FfmpegProgress(speed=speed, received_at=at)
+
+
+def test_speed_alarm_fires_once_per_slow_period():
+    alerts = []
+    alarm = PG.SpeedAlarm(threshold=1.0, grace_seconds=5, on_alert=alerts.append)
+    for at, speed in [(0, 1.0), (1, 0.8), (3, 0.7), (5, 0.9), (6, 0.6), (7, 0.6)]:
+        alarm(_record(speed, at))
+    assert len(alerts) == 1 and alerts[0].speed == 0.6
+    alarm(_record(1.01, 8))
+    alarm(_record(0.5, 9))
+    assert alarm.alerts == 1
+    assert alarm.summary() == {"min_speed": 0.5, "slow_seconds": 6.0, "alerts": 1}
+
+
+def test_speed_alarm_default_ignores_healthy_live_jitter():
+    # -re 라이브 입력은 정상이어도 0.99x 근처에 머문다. 기본 기준으로는 경고하지 않는다
+    alerts = []
+    alarm = PG.SpeedAlarm(grace_seconds=5, on_alert=alerts.append)
+    for at in range(60):
+        alarm(_record(0.99 if at % 2 else 0.98, at))
+    assert alerts == []
+    assert alarm.summary()["slow_seconds"] == 0
+
+
+def test_build_ffmpeg_cmd_progress_pipe():
+    cfg = S.StreamConfig(
+        ingest_url="rtmp://a.rtmp.youtube.com/live2",
+        stream_key="key",
+        copy_mode=True,
+        video_bitrate="3000k",
+        audio_bitrate="160k",
+        x264_preset="veryfast",
+        live_from_start=False,
+        verbose=False,
+    )
+    assert "-progress" not in cfg.build_ffmpeg_cmd()
+    cmd = cfg.build_ffmpeg_cmd(progress_url="pipe:7")
+    assert cmd[cmd.index("-progress") + 1] == "pipe:7"
+    assert cmd.index("-progress") < cmd.index("-i")
+
+
+def test_watchdog_treats_collapsed_speed_as_stall():
+    now = [0.0]
+    dog = WD.StallWatchdog(WD.StallPolicy(stall_seconds=10, min_speed=0.1), clock=lambda: now[0])
+    dog.observe_speed(0.05)
+    now[0] = 5
+    assert not dog.observe(100)
+    now[0] = 10
+    # 바이트는 조금씩 들어와도 ffmpeg 가 거의 진행하지 못하면 멈춘 것으로 본다
+    assert dog.observe(200)
+    dog.observe_speed(1.0)
+    assert not dog.observe(300)
+
+
+# ffmpeg 대신: 받은 진행 파이프(pipe:N)에 두 블록을 쓰고 끝난다
+_FAKE_FFMPEG = """
+import os, sys
+fd = int(sys.argv[1].split(":")[1])
+os.write(fd, b"frame=10\\nspeed=0.5x\\nprogress=continue\\nframe=20\\nspeed=0.4x\\nprogress=end\\n")
+sys.stdin.buffer.read()
+"""
+
+
+def test_restream_delivers_progress_records(monkeypatch, tmp_path):
+    monkeypatch.setattr(S, "ensure_binaries", lambda verbose=False: None)
+    monkeypatch.setattr(
+        S, "build_ytdlp_cmd", lambda **kwargs: [sys.executable, "-c", "print('data')"]
+    )
+    monkeypatch.setattr(
+        S.StreamConfig,
+        "build_ffmpeg_cmd",
+        lambda self, progress_url=None: [sys.executable, "-c", _FAKE_FFMPEG, str(progress_url)],
+    )
+    records = []
+
+    result = S.restream_youtube(
+        source_url="https://youtube.com/watch?v=LIVE",
+        stream_key="abc",
+        ingest_url="rtmp://a.rtmp.youtube.com/live2",
+        yt_dlp_format="best",
+        copy_mode=True,
+        video_bitrate="3000k",
+        audio_bitrate="160k",
+        x264_preset="veryfast",
+        live_from_start=False,
+        verbose=False,
+        on_progress=records.append,
+        speed_alert=1.0,
+    )
+
+    assert [r.frame for r in records] == [10, 20]
+    assert records[-1].done
+    assert result.progress["min_speed"] == 0.5
@@ -0,0 +1,140 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+from youtube_dump import relay as R
+from youtube_dump import streamer as S
+
+
+def _read_all(fd: int) -> bytes:
+    chunks = []
+    while chunk := os.read(fd, 65536):
+        chunks.append(chunk)
+    os.close(fd)
+    return b"".join(chunks)
+
+
+@pytest.mark.parametrize("backend", R.RELAY_BACKENDS)
+def test_relay_copies_bytes(backend):
+    payload = os.urandom(300_000)
+    src_r, src_w = os.pipe()
+    relay, out_fd = R.start_relay(src_r, capacity=4096, backend=backend)
+
+    def _produce():
+        view = memoryview(payload)
+        while view:
+            view = view[os.write(src_w, view[:10_000]) :]
+        os.close(src_w)
+
+    producer = threading.Thread(target=_produce)
+    producer.start()
+    assert _read_all(out_fd) == payload
+    producer.join()
+    relay.join(timeout=5)
+    os.close(src_r)
+
+    stats = relay.snapshot()
+    assert stats.bytes_in == stats.bytes_out == len(payload)
+    assert stats.fill == 0
+
+
+def test_forward_splice_falls_back_for_regular_files(tmp_path):
+    src = tmp_path / "src.bin"
+    src.write_bytes(b"q" * 100_000)
+    dst = tmp_path / "dst.bin"
+    with open(src, "rb") as fin, open(dst, "wb") as fout:
+        stats = R.RelayStats()
+        assert R.forward(fin.fileno(), fout.fileno(), stats, backend="splice") == 100_000
+    assert dst.read_bytes() == src.read_bytes()
+    assert stats.bytes_out == 100_000
+
+
+def test_relay_rejects_unknown_backend():
+    with pytest.raises(ValueError):
+        R.Relay(0, 1, backend="mmap")
+
+
+def test_relay_attributes_waiting_to_slow_side():
+    # 소비자가 느리면 버퍼가 가득 차서 원본 읽기가 멈춘다
+    src_r, src_w = os.pipe()
+    relay, out_fd = R.start_relay(src_r, capacity=4096)
+    writer = threading.Thread(target=lambda: (os.write(src_w, b"x" * 4096 * 40), os.close(src_w)))
+    writer.start()
+    time.sleep(0.3)
+    assert relay.snapshot().fill == 4096
+    assert len(_read_all(out_fd)) == 4096 * 40
+    writer.join()
+    relay.join(timeout=5)
+    os.close(src_r)
+    slow_consumer = relay.snapshot()
+    assert slow_consumer.full_wait + slow_consumer.write_blocked > 0.2
+
+    # 원본이 느리면 버퍼가 비어 쓰기 쪽이 기다린다
+    src_r, src_w = os.pipe()
+    relay, out_fd = R.start_relay(src_r, capacity=4096)
+    reader = threading.Thread(target=_read_all, args=(out_fd,))
+    reader.start()
+    for _ in range(3):
+        time.sleep(0.1)
+        os.write(src_w, b"y" * 100)
+    os.close(src_w)
+    reader.join()
+    relay.join(timeout=5)
+    os.close(src_r)
+    slow_source = relay.snapshot()
+    assert slow_source.bytes_out == 300
+    assert slow_source.read_blocked + slow_source.empty_wait > 0.2
+    assert slow_source.full_wait == 0
+
+
+def test_relay_stops_when_consumer_closes():
+    src_r, src_w = os.pipe()
+    relay, out_fd = R.start_relay(src_r, capacity=4096)
+    os.close(out_fd)
+    os.write(src_w, b"z" * 1000)
+    os.close(src_w)
+    relay.join(timeout=5)
+    os.close(src_r)
+    assert not any(t.is_alive() for t in relay._threads)
+
+
+@pytest.mark.parametrize("backend", [True, "splice"])
+def test_restream_through_relay(monkeypatch, backend):
+    # yt-dlp/ffmpeg 대신 바이트를 쓰고 읽는 파이썬 프로세스로 실제 파이프를 구성한다
+    monkeypatch.setattr(S, "ensure_binaries", lambda verbose=False: None)
+    monkeypatch.setattr(
+        S,
+        "build_ytdlp_cmd",
+        lambda **kwargs: [
+            sys.executable,
+            "-c",
+            "import sys; sys.stdout.buffer.write(b'a' * 500000)",
+        ],
+    )
+    monkeypatch.setattr(
+        S.StreamConfig,
+        "build_ffmpeg_cmd",
+        lambda self: [
+            sys.executable,
+            "-c",
+            "import sys; assert len(sys.stdin.buffer.read()) == 500000",
+        ],
+    )
+    result = S.restream_youtube(
+        source_url="https://youtube.com/watch?v=LIVE",
+        stream_key="abc",
+        ingest_url="rtmp://a.rtmp.youtube.com/live2",
+        yt_dlp_format="best",
+        copy_mode=True,
+        video_bitrate="3000k",
+        audio_bitrate="160k",
+        x264_preset="veryfast",
+        live_from_start=False,
+        verbose=False,
+        relay=backend,
+    )
+    assert result.rc_consumer == 0
+    assert result.relay["bytes_in"] == result.relay["bytes_out"] == 500000
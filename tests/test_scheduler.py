@@ -0,0 +1,65 @@
+from youtube_dump import scheduler as S
+
+
+class _Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _scheduler(clock, **policy):
+    return S.PollScheduler(S.PollPolicy(**policy), clock=clock, rng=lambda: 0.5)
+
+
+def test_quiet_channel_backs_off_to_cap():
+    clock = _Clock()
+    sched = _scheduler(clock, base_interval=10, max_interval=60, backoff_factor=2)
+    delays = [sched.record("ch", "not_live") for _ in range(6)]
+    assert delays == [10, 20, 40, 60, 60, 60]
+    assert sched.next_poll_at("ch") == clock.now + 60
+
+
+def test_jitter_spreads_delay():
+    clock = _Clock()
+    low = S.PollScheduler(S.PollPolicy(base_interval=10, jitter=0.2), clock=clock, rng=lambda: 0)
+    high = S.PollScheduler(S.PollPolicy(base_interval=10, jitter=0.2), clock=clock, rng=lambda: 1)
+    assert low.record("ch", None) == 8
+    assert high.record("ch", None) == 12
+
+
+def test_upcoming_wakes_before_scheduled_start():
+    clock = _Clock()
+    sched = _scheduler(
+        clock, base_interval=10, max_interval=600, backoff_factor=10, lead_seconds=60
+    )
+    start = clock.now + 100
+    sched.record("ch", "not_live")
+    # 백오프는 100초지만 시작 60초 전(40초 후)에 깨어나야 한다
+    assert sched.record("ch", "is_upcoming", start) == 40
+
+
+def test_upcoming_polls_fast_around_start():
+    clock = _Clock()
+    sched = _scheduler(clock, fast_interval=3, lead_seconds=60, grace_seconds=300)
+    start = clock.now + 30
+    assert sched.record("ch", "is_upcoming", start) == 3
+    clock.now = start + 200
+    assert sched.record("ch", "is_upcoming", start) == 3
+    clock.now = start + 1000
+    assert sched.record("ch", "is_upcoming", start) == 15
+
+
+def test_reset_and_snapshot():
+    clock = _Clock()
+    sched = _scheduler(clock, base_interval=10, max_interval=60, backoff_factor=2)
+    for _ in range(4):
+        sched.record("ch", "not_live")
+    assert sched.reset("ch") == 10
+    assert sched.record("ch", "not_live") == 10
+
+    snapshot = sched.snapshot()
+    assert snapshot["ch"].quiet_streak == 1
+    assert snapshot["ch"].live_status == "not_live"
+    assert snapshot["ch"].next_poll_at == clock.now + 10
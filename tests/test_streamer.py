@@ -1,3 +1,6 @@
+import json
+import shutil
+import subprocess
 import sys
 
 import pytest
@@ -64,7 +67,7 @@ def test_build_ytdlp_cmd():
 
 
 class _FakePopen:
-    def __init__(self, args, stdout=None, stdin=None, stderr=None, bufsize=0):
+    def __init__(self, args, stdout=None, stdin=None, stderr=None, bufsize=0, **kwargs):
         self.args = args
         self._rc = 0
         self._terminated = False
@@ -143,3 +146,565 @@ def test_restream_failure_raises(monkeypatch):
             live_from_start=False,
             verbose=False,
         )
+
+
+def test_build_ffmpeg_cmd_multiple_inputs():
+    cfg = S.StreamConfig(
+        ingest_url="rtmp://a.rtmp.youtube.com/live2",
+        stream_key="key123",
+        copy_mode=True,
+        video_bitrate="3000k",
+        audio_bitrate="160k",
+        x264_preset="veryfast",
+        live_from_start=False,
+        verbose=False,
+        inputs=["pipe:5", "pipe:7"],
+    )
+    cmd = cfg.build_ffmpeg_cmd()
+    assert cmd.count("-i") == 2
+    assert cmd[cmd.index("pipe:7") + 1 :][:4] == ["-map", "0:v:0", "-map", "1:a:0"]
+
+
+class _FakeInProcess:
+    def __init__(self, fds):
+        self.read_fds = list(fds)
+        self.closed = False
+
+    def poll(self):
+        return 0
+
+    def wait(self, timeout=None):
+        return 0
+
+    def terminate(self):
+        pass
+
+    def kill(self):
+        pass
+
+    def close_read_fds(self):
+        self.closed = True
+
+
+@pytest.mark.parametrize("fds", [[11], [11, 12]])
+def test_restream_inprocess_producer(monkeypatch, fds):
+    monkeypatch.setattr(S, "ensure_binaries", lambda verbose=False: None)
+    fake = _FakeInProcess(fds)
+    received = {}
+
+    def _fake_start(**kwargs):
+        received.update(kwargs)
+        return fake
+
+    popen_calls = []
+
+    def _fake_popen(args, **kwargs):
+        popen_calls.append((args, kwargs))
+        return _FakePopen(args, stdin=kwargs.get("stdin"))
+
+    monkeypatch.setattr(S, "start_inprocess_producer", _fake_start)
+    monkeypatch.setattr(S.subprocess, "Popen", _fake_popen)
+
+    S.restream_youtube(
+        source_url="https://youtube.com/watch?v=LIVE",
+        stream_key="abc",
+        ingest_url="rtmp://a.rtmp.youtube.com/live2",
+        yt_dlp_format="best",
+        copy_mode=True,
+        video_bitrate="3000k",
+        audio_bitrate="160k",
+        x264_preset="veryfast",
+        live_from_start=False,
+        verbose=False,
+        producer_mode="inprocess",
+        info={"id": "LIVE"},
+    )
+
+    assert received["info"] == {"id": "LIVE"}
+    assert len(popen_calls) == 1
+    args, kwargs = popen_calls[0]
+    if len(fds) == 1:
+        assert kwargs["stdin"] == 11
+        assert "pipe:0" in args
+    else:
+        assert kwargs["pass_fds"] == (11, 12)
+        assert "pipe:11" in args and "pipe:12" in args
+    assert fake.closed
+
+
+def test_restream_inprocess_falls_back_to_subprocess(monkeypatch):
+    monkeypatch.setattr(S, "ensure_binaries", lambda verbose=False: None)
+    monkeypatch.setattr(S, "build_ytdlp_cmd", lambda **k: ["yt-dlp"])
+
+    def _unsupported(**kwargs):
+        raise S.UnsupportedSourceError("dash")
+
+    popen_calls = []
+
+    def _fake_popen(*args, **kwargs):
+        pop = _FakePopen(*args, **kwargs)
+        popen_calls.append(pop)
+        return pop
+
+    monkeypatch.setattr(S, "start_inprocess_producer", _unsupported)
+    monkeypatch.setattr(S.subprocess, "Popen", _fake_popen)
+
+    S.restream_youtube(
+        source_url="https://youtube.com/watch?v=LIVE",
+        stream_key="abc",
+        ingest_url="rtmp://a.rtmp.youtube.com/live2",
+        yt_dlp_format="best",
+        copy_mode=False,
+        video_bitrate="3000k",
+        audio_bitrate="160k",
+        x264_preset="veryfast",
+        live_from_start=True,
+        verbose=False,
+        producer_mode="inprocess",
+    )
+
+    assert popen_calls[0].args == ["yt-dlp"]
+    assert len(popen_calls) == 2
+
+
+def test_build_ffmpeg_cmd_remote_input_headers():
+    cfg = S.StreamConfig(
+        ingest_url="rtmp://a.rtmp.youtube.com/live2",
+        stream_key="key123",
+        copy_mode=True,
+        video_bitrate="3000k",
+        audio_bitrate="160k",
+        x264_preset="veryfast",
+        live_from_start=False,
+        verbose=False,
+        inputs=["https://manifest.googlevideo.com/index.m3u8"],
+        input_headers={"User-Agent": "UA"},
+    )
+    cmd = cfg.build_ffmpeg_cmd()
+    assert cmd[cmd.index("-headers") + 1] == "User-Agent: UA\r\n"
+    assert cmd.index("-headers") < cmd.index("https://manifest.googlevideo.com/index.m3u8")
+
+
+def _direct_kwargs(**overrides):
+    kwargs = dict(
+        source_url="https://youtube.com/watch?v=LIVE",
+        stream_key="abc",
+        ingest_url="rtmp://a.rtmp.youtube.com/live2",
+        yt_dlp_format="best",
+        copy_mode=True,
+        video_bitrate="3000k",
+        audio_bitrate="160k",
+        x264_preset="veryfast",
+        live_from_start=False,
+        verbose=False,
+        producer_mode="direct",
+    )
+    kwargs.update(overrides)
+    return kwargs
+
+
+def test_restream_direct_hands_manifest_to_ffmpeg(monkeypatch):
+    monkeypatch.setattr(S, "ensure_binaries", lambda verbose=False: None)
+    fmt = {"url": "https://e/live.m3u8", "protocol": "m3u8", "http_headers": {"X": "1"}}
+    monkeypatch.setattr(S, "resolve_formats", lambda *a, **k: ({"is_live": True}, [fmt]))
+
+    popen_calls = []
+
+    def _fake_popen(args, **kwargs):
+        popen_calls.append(args)
+        return _FakePopen(args)
+
+    monkeypatch.setattr(S.subprocess, "Popen", _fake_popen)
+
+    S.restream_youtube(**_direct_kwargs())
+
+    assert len(popen_calls) == 1
+    assert popen_calls[0][0] == "ffmpeg"
+    assert "https://e/live.m3u8" in popen_calls[0]
+
+
+def test_restream_direct_reresolves_expired_manifest(monkeypatch):
+    monkeypatch.setattr(S, "ensure_binaries", lambda verbose=False: None)
+    monkeypatch.setattr(S, "DIRECT_MAX_QUICK_FAILURES", 10)
+    now = S.time.time()
+    urls = iter([
+        f"https://e/expire/{int(now) - 10}/first.m3u8",
+        f"https://e/expire/{int(now) + 3600}/second.m3u8",
+    ])
+    resolves = []
+
+    def _fake_resolve(source_url, yt_dlp_format, verbose, info=None):
+        resolves.append(info)
+        return {"is_live": True}, [{"url": next(urls), "protocol": "m3u8"}]
+
+    monkeypatch.setattr(S, "resolve_formats", _fake_resolve)
+
+    popen_calls = []
+
+    def _fake_popen(args, **kwargs):
+        popen_calls.append(args)
+        return _FakePopen(args)
+
+    monkeypatch.setattr(S.subprocess, "Popen", _fake_popen)
+
+    S.restream_youtube(**_direct_kwargs(info={"id": "LIVE"}))
+
+    assert resolves == [{"id": "LIVE"}, None]
+    assert len(popen_calls) == 2
+    assert any(arg.endswith("second.m3u8") for arg in popen_calls[1])
+
+
+def test_copy_compatible():
+    h264_aac = {"vcodec": "avc1.64001F", "acodec": "mp4a.40.2"}
+    assert S.copy_compatible([h264_aac])
+    assert S.copy_compatible([
+        {"vcodec": "avc1.640028", "acodec": "none"},
+        {"vcodec": "none", "acodec": "mp4a.40.2"},
+    ])
+    assert not S.copy_compatible([{"vcodec": "vp09.00.40.08", "acodec": "opus"}])
+    assert not S.copy_compatible([{"vcodec": "avc1", "acodec": "opus"}])
+    assert not S.copy_compatible([])
+
+
+def test_copy_compatible_probes_unknown_codecs(monkeypatch):
+    monkeypatch.setattr(S, "probe_codecs", lambda url, headers=None: ("h264", "aac"))
+    assert S.copy_compatible([{"url": "https://e/live.m3u8"}])
+    monkeypatch.setattr(S, "probe_codecs", lambda url, headers=None: ("hevc", "aac"))
+    assert not S.copy_compatible([{"url": "https://e/live.m3u8"}])
+
+
+def test_decide_copy_mode():
+    assert S.decide_copy_mode(True, None, False) is True
+    assert S.decide_copy_mode(False, [{"vcodec": "avc1", "acodec": "mp4a"}], False) is False
+    assert S.decide_copy_mode(None, [{"vcodec": "avc1", "acodec": "mp4a"}], False) is True
+    assert S.decide_copy_mode(None, None, False) is False
+
+
+@pytest.mark.parametrize(
+    ("vcodec", "expected"), [("avc1.4d401f", "copy"), ("vp09.00.40.08", "libx264")]
+)
+def test_restream_auto_copy_uses_source_codecs(monkeypatch, vcodec, expected):
+    monkeypatch.setattr(S, "ensure_binaries", lambda verbose=False: None)
+    monkeypatch.setattr(S, "build_ytdlp_cmd", lambda **k: ["yt-dlp"])
+    info = {"id": "LIVE", "is_live": True}
+    fmt = {"url": "https://e/x.m3u8", "vcodec": vcodec, "acodec": "mp4a.40.2"}
+    monkeypatch.setattr(S, "extract_formats", lambda *a, **k: (info, [fmt]))
+
+    popen_calls = []
+
+    def _fake_popen(*args, **kwargs):
+        pop = _FakePopen(*args, **kwargs)
+        popen_calls.append(pop)
+        return pop
+
+    monkeypatch.setattr(S.subprocess, "Popen", _fake_popen)
+
+    S.restream_youtube(
+        source_url="https://youtube.com/watch?v=LIVE",
+        stream_key="abc",
+        ingest_url="rtmp://a.rtmp.youtube.com/live2",
+        yt_dlp_format="best",
+        copy_mode=None,
+        video_bitrate="3000k",
+        audio_bitrate="160k",
+        x264_preset="veryfast",
+        live_from_start=False,
+        verbose=False,
+        info=info,
+    )
+
+    ffmpeg_args = popen_calls[1].args
+    assert ffmpeg_args[ffmpeg_args.index("-c:v") + 1] == expected
+
+
+def test_classify_ffmpeg_failure():
+    assert S.classify_ffmpeg_failure(["[flv @ 0x1] Could not find tag for codec vp9"]) == "codec"
+    assert S.classify_ffmpeg_failure(["Non-monotonous DTS in output stream 0:1"]) == "timestamp"
+    assert S.classify_ffmpeg_failure(["rtmp://x: Connection refused"]) == "output"
+    assert S.classify_ffmpeg_failure(["something else"]) == "unknown"
+
+
+def test_classify_header_failure_by_cause():
+    # 헤더 쓰기 실패라도 원인이 연결 문제면 copy 재시도 대상(codec)이 아니다
+    for cause in ("Broken pipe", "Connection refused"):
+        line = f"Could not write header for output file #0 (incorrect codec parameters ?): {cause}"
+        assert S.classify_ffmpeg_failure([line]) == "output"
+    line = "Could not write header for output file #0 (incorrect codec parameters ?): Invalid data"
+    assert S.classify_ffmpeg_failure([line]) == "codec"
+
+
+_FAKE_PRODUCER = """
+import sys, time
+for _ in range(30):
+    sys.stdout.buffer.write(b"\\x47" * 188 * 10)
+    sys.stdout.buffer.flush()
+    time.sleep(0.05)
+"""
+
+_FAKE_FFMPEG = """
+import json
+import sys
+if "copy" in sys.argv:
+    sys.stderr.write("[flv @ 0x55] Could not find tag for codec vp9 in stream #0\\n")
+    sys.exit(1)
+total = 0
+while chunk := sys.stdin.buffer.read(4096):
+    total += len(chunk)
+sys.exit(0 if total else 3)
+"""
+
+
+def test_restream_falls_back_to_reencode_keeping_producer(monkeypatch, tmp_path):
+    monkeypatch.setattr(S, "ensure_binaries", lambda verbose=False: None)
+    producers = []
+
+    def _fake_ytdlp_cmd(**kwargs):
+        producers.append(kwargs)
+        return [sys.executable, "-c", _FAKE_PRODUCER]
+
+    original = S.StreamConfig.build_ffmpeg_cmd
+    monkeypatch.setattr(S, "build_ytdlp_cmd", _fake_ytdlp_cmd)
+    monkeypatch.setattr(
+        S.StreamConfig,
+        "build_ffmpeg_cmd",
+        lambda self: [sys.executable, "-c", _FAKE_FFMPEG, *original(self)],
+    )
+
+    log_path = tmp_path / "sessions.jsonl"
+    result = S.restream_youtube(
+        source_url="https://youtube.com/watch?v=LIVE",
+        stream_key="abc",
+        ingest_url="rtmp://a.rtmp.youtube.com/live2",
+        yt_dlp_format="best",
+        copy_mode=True,
+        video_bitrate="3000k",
+        audio_bitrate="160k",
+        x264_preset="veryfast",
+        live_from_start=False,
+        verbose=False,
+        session_log=log_path,
+    )
+
+    assert len(producers) == 1
+    assert result.fallbacks == 1
+    assert result.failure == "codec"
+    assert result.final_mode == "reencode"
+    assert result.rc_consumer == 0
+    record = json.loads(log_path.read_text(encoding="utf-8").splitlines()[0])
+    assert record["final_mode"] == "reencode"
+    assert record["requested_copy_mode"] is True
+
+
+def test_restream_does_not_fall_back_for_output_errors(monkeypatch):
+    monkeypatch.setattr(S, "ensure_binaries", lambda verbose=False: None)
+    monkeypatch.setattr(
+        S, "build_ytdlp_cmd", lambda **kwargs: [sys.executable, "-c", _FAKE_PRODUCER]
+    )
+    script = "import sys; sys.stderr.write('rtmp: Connection refused\\n'); sys.exit(1)"
+    monkeypatch.setattr(
+        S.StreamConfig, "build_ffmpeg_cmd", lambda self: [sys.executable, "-c", script]
+    )
+
+    with pytest.raises(RuntimeError):
+        S.restream_youtube(
+            source_url="https://youtube.com/watch?v=LIVE",
+            stream_key="abc",
+            ingest_url="rtmp://a.rtmp.youtube.com/live2",
+            yt_dlp_format="best",
+            copy_mode=True,
+            video_bitrate="3000k",
+            audio_bitrate="160k",
+            x264_preset="veryfast",
+            live_from_start=False,
+            verbose=False,
+        )
+
+
+def _config(**overrides):
+    kwargs = dict(
+        ingest_url="rtmp://a.rtmp.youtube.com/live2",
+        stream_key="key123",
+        copy_mode=False,
+        video_bitrate="3000k",
+        audio_bitrate="160k",
+        x264_preset="veryfast",
+        live_from_start=False,
+        verbose=False,
+    )
+    kwargs.update(overrides)
+    return S.StreamConfig(**kwargs)
+
+
+def test_output_spec():
+    assert S.output_spec("rtmp://b.rtmp.youtube.com/live2/k") == (
+        "flv",
+        "rtmp://b.rtmp.youtube.com/live2/k",
+        {},
+    )
+    assert S.output_spec("/archive/live.ts")[0] == "mpegts"
+    assert S.output_spec("/archive/live.mkv")[0] == "matroska"
+    assert S.output_spec("/archive/live.mp4")[2] == {"movflags": "+frag_keyframe+empty_moov"}
+    assert S.output_spec("null") == ("null", "-", {})
+
+
+def test_build_ffmpeg_cmd_single_extra_output_only():
+    cmd = _config(stream_key="", extra_outputs=["/archive/live.ts"]).build_ffmpeg_cmd()
+    assert cmd[-3:] == ["-f", "mpegts", "/archive/live.ts"]
+    assert "tee" not in cmd
+
+
+def test_build_ffmpeg_cmd_tee_fan_out():
+    cmd = _config(
+        extra_outputs=["rtmp://b.rtmp.youtube.com/live2/backup", "/archive/a|b.mp4"]
+    ).build_ffmpeg_cmd()
+    assert cmd.count("libx264") == 1
+    assert cmd[cmd.index("-f") + 1] == "tee"
+    assert ["-map", "0:v?", "-map", "0:a?"] == cmd[cmd.index("-map") : cmd.index("-map") + 4]
+    assert "+global_header" in cmd
+    slaves = cmd[-1].split("|[")
+    assert slaves[0] == "[f=flv:onfail=ignore]rtmp://a.rtmp.youtube.com/live2/key123"
+    assert slaves[1] == "f=flv:onfail=ignore]rtmp://b.rtmp.youtube.com/live2/backup"
+    assert slaves[2] == (
+        "f=mp4:onfail=ignore:movflags=+frag_keyframe+empty_moov]/archive/a\\|b.mp4"
+    )
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg 필요")
+def test_tee_keeps_writing_when_one_destination_fails(tmp_path):
+    source = subprocess.Popen(
+        [
+            "ffmpeg",
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-f",
+            "lavfi",
+            "-i",
+            "testsrc=duration=2:size=160x120:rate=15",
+            "-f",
+            "lavfi",
+            "-i",
+            "sine=duration=2",
+            "-c:v",
+            "libx264",
+            "-preset",
+            "ultrafast",
+            "-c:a",
+            "aac",
+            "-f",
+            "mpegts",
+            "pipe:1",
+        ],
+        stdout=subprocess.PIPE,
+    )
+    archive = tmp_path / "archive.ts"
+    cmd = _config(
+        stream_key="",
+        copy_mode=True,
+        extra_outputs=["rtmp://127.0.0.1:9/live/unreachable", str(archive), "null"],
+    ).build_ffmpeg_cmd()
+    cmd.remove("-re")
+    proc = subprocess.run(cmd, stdin=source.stdout, capture_output=True, timeout=60, check=False)
+    source.wait()
+    assert proc.returncode == 0, proc.stderr.decode("utf-8", "replace")[-2000:]
+    assert archive.stat().st_size > 0
+
+
+def test_parse_rendition():
+    assert S.parse_rendition("720p@2500k=rtmp://b/live2/k?a=b") == S.Rendition(
+        output="rtmp://b/live2/k?a=b", height=720, video_bitrate="2500k"
+    )
+    assert S.parse_rendition("audio@128k=./audio.m4a") == S.Rendition(
+        output="./audio.m4a", audio_bitrate="128k", audio_only=True
+    )
+    assert S.parse_rendition("source=./full.ts") == S.Rendition(output="./full.ts")
+    for bad in ("720p", "720=x", "hd@1k=x"):
+        with pytest.raises(ValueError):
+            S.parse_rendition(bad)
+
+
+def test_ladder_decodes_once_and_encodes_each_rendition():
+    cmd = _config(
+        renditions=[
+            S.parse_rendition("720p@2500k=rtmp://b/live2/k720"),
+            S.parse_rendition("audio@96k=./audio.m4a"),
+        ],
+    ).build_ffmpeg_cmd()
+    assert cmd.count("-i") == 1
+    graph = cmd[cmd.index("-filter_complex") + 1]
+    assert graph == "[0:v:0]split=2[s0][s1];[s1]scale=-2:'min(ih,720)'[v1]"
+    # 기본 출력 -> 720p -> 음성 전용 순서로 출력마다 코덱 옵션이 붙는다
+    assert [cmd[i + 1] for i, arg in enumerate(cmd) if arg == "-map"] == [
+        "[s0]",
+        "0:a:0?",
+        "[v1]",
+        "0:a:0?",
+        "0:a:0?",
+    ]
+    assert [cmd[i + 1] for i, arg in enumerate(cmd) if arg == "-b:v"] == ["3000k", "2500k"]
+    assert [cmd[i + 1] for i, arg in enumerate(cmd) if arg == "-b:a"] == ["160k", "160k", "96k"]
+    assert cmd.index("-vn") > cmd.index("rtmp://b/live2/k720")
+    assert cmd[-5:-2] == ["-f", "mp4", "-movflags"]
+    assert cmd[-1] == "./audio.m4a"
+
+
+def test_ladder_copies_main_output_in_copy_mode():
+    cmd = _config(
+        copy_mode=True,
+        stream_key="",
+        extra_outputs=["rtmp://a/live2/k", "./archive.ts"],
+        inputs=["pipe:3", "pipe:4"],
+        renditions=[S.parse_rendition("480p=rtmp://b/live2/k480")],
+    ).build_ffmpeg_cmd()
+    assert cmd[cmd.index("-filter_complex") + 1] == "[0:v:0]scale=-2:'min(ih,480)'[v0]"
+    # 기본 출력은 원본 그대로 복사하고, 새로 인코딩하는 것은 480p 하나뿐이다
+    main = cmd[cmd.index("-map") : cmd.index("-f")]
+    assert main == ["-map", "0:v:0?", "-map", "1:a:0?", "-c:v", "copy", "-c:a", "copy"]
+    assert cmd[cmd.index("-f") + 1] == "tee"
+    assert cmd.count("libx264") == 1
+    assert cmd[-1] == "rtmp://b/live2/k480"
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg 필요")
+def test_ladder_command_runs_with_ffmpeg(tmp_path):
+    source = subprocess.Popen(
+        [
+            "ffmpeg",
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-f",
+            "lavfi",
+            "-i",
+            "testsrc=duration=2:size=320x240:rate=15",
+            "-f",
+            "lavfi",
+            "-i",
+            "sine=duration=2",
+            "-c:v",
+            "libx264",
+            "-preset",
+            "ultrafast",
+            "-c:a",
+            "aac",
+            "-f",
+            "mpegts",
+            "pipe:1",
+        ],
+        stdout=subprocess.PIPE,
+    )
+    outputs = {name: tmp_path / name for name in ("main.ts", "small.ts", "audio.m4a")}
+    cmd = _config(
+        stream_key="",
+        x264_preset="ultrafast",
+        extra_outputs=[str(outputs["main.ts"])],
+        renditions=[
+            S.parse_rendition(f"120p@200k={outputs['small.ts']}"),
+            S.parse_rendition(f"audio@64k={outputs['audio.m4a']}"),
+        ],
+    ).build_ffmpeg_cmd()
+    cmd.remove("-re")
+    proc = subprocess.run(cmd, stdin=source.stdout, capture_output=True, timeout=60, check=False)
+    source.wait()
+    assert proc.returncode == 0, proc.stderr.decode("utf-8", "replace")[-2000:]
+    assert all(path.stat().st_size > 0 for path in outputs.values())
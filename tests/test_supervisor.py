@@ -0,0 +1,184 @@
+import threading
+
+import pytest
+
+from youtube_dump import streamer as S
+from youtube_dump import supervisor as SV
+from youtube_dump import watcher as W
+
+LIVE = W.Detection(live_video_url="https://www.youtube.com/watch?v=LIVEID")
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_backoff_grows_until_cap_and_resets_after_healthy_run():
+    supervisor = SV.RestartSupervisor(
+        SV.RestartPolicy(initial_delay=1, max_delay=5, max_restarts=100, healthy_seconds=60),
+        clock=_Clock(),
+    )
+    assert [supervisor.failed(1) for _ in range(5)] == [1, 2, 4, 5, 5]
+    # 오래 송출하다 끊긴 경우는 일시적인 실패로 보고 처음 대기 시간으로
+    assert supervisor.failed(120) == 1
+    assert supervisor.total_restarts == 6
+
+
+def test_restarts_are_limited_per_window():
+    clock = _Clock()
+    supervisor = SV.RestartSupervisor(
+        SV.RestartPolicy(initial_delay=1, max_delay=1, max_restarts=3, window_seconds=100),
+        clock=clock,
+    )
+    assert [supervisor.failed(0) for _ in range(3)] == [1, 1, 1]
+    # 창 안에서 3번을 다 썼으므로 첫 재시작(t=1)이 창을 벗어나는 t=101 까지 기다린다
+    assert supervisor.failed(0) == 101
+    clock.now = 300
+    assert supervisor.failed(0) == 1
+
+    supervisor.reset()
+    assert supervisor.failures == 0
+
+
+def test_supervise_restarts_while_live_then_returns_when_live_ended():
+    starts = []
+    detections = iter([LIVE, LIVE, W.Detection()])
+
+    def start(detection):
+        starts.append(detection.live_video_url)
+        raise RuntimeError("프로세스 종료 코드: yt-dlp=0, ffmpeg=1")
+
+    W.supervise_restream(
+        "https://www.youtube.com/@handle",
+        LIVE,
+        detect=lambda url: next(detections),
+        start=start,
+        policy=SV.RestartPolicy(initial_delay=0, max_delay=0),
+    )
+    # 첫 시도 + 라이브가 계속되는 동안 두 번 재시작, 세 번째 실패 후 라이브 종료 확인
+    assert len(starts) == 3
+
+
+def test_supervise_restarts_after_clean_end_while_still_live():
+    # 재생목록이 잠깐 끊겨 yt-dlp 가 정상 종료해도 라이브가 계속되면 폴링 간격을 기다리지 않고
+    # 바로 재감지해 backoff 후 재시작한다
+    starts = []
+    detections = iter([LIVE, W.Detection()])
+
+    W.supervise_restream(
+        "ch",
+        LIVE,
+        detect=lambda url: next(detections),
+        start=starts.append,
+        policy=SV.RestartPolicy(initial_delay=0, max_delay=0),
+    )
+    assert len(starts) == 2
+
+
+def test_supervise_does_not_retry_after_live_end_or_fatal_error():
+    detect_calls = []
+
+    def detect(url):
+        detect_calls.append(url)
+        return W.Detection()
+
+    W.supervise_restream("ch", LIVE, detect=detect, start=lambda d: None)
+    assert detect_calls == ["ch"]
+
+    def missing(detection):
+        raise S.MissingBinaryError("ffmpeg 없음")
+
+    with pytest.raises(S.MissingBinaryError):
+        W.supervise_restream("ch", LIVE, detect=detect, start=missing)
+    assert detect_calls == ["ch"]
+
+
+def test_supervise_stops_waiting_when_stop_event_is_set():
+    stop = threading.Event()
+    starts = []
+
+    def start(detection):
+        starts.append(detection)
+        stop.set()
+        raise RuntimeError("rtmp reset")
+
+    W.supervise_restream(
+        "ch",
+        LIVE,
+        detect=lambda url: LIVE,
+        start=start,
+        policy=SV.RestartPolicy(initial_delay=30),
+        stop_event=stop,
+    )
+    assert len(starts) == 1
+
+
+def test_watch_keeps_running_after_pipeline_failure(monkeypatch):
+    calls = {"restream": 0, "detect": 0}
+
+    def fake_detect_live(url, session):
+        calls["detect"] += 1
+        # 1: 라이브 감지, 2: 실패 후 재감지(아직 라이브), 3: 다시 실패 후 재감지(종료), 4: 폴링
+        return LIVE if calls["detect"] in {1, 2} else W.Detection()
+
+    def fake_restream_youtube(**kwargs):
+        calls["restream"] += 1
+        raise RuntimeError("프로세스 종료 코드: yt-dlp=0, ffmpeg=1")
+
+    monkeypatch.setattr(W, "detect_live", fake_detect_live)
+    monkeypatch.setattr(W, "restream_youtube", fake_restream_youtube)
+
+    W.watch_channel_and_restream(
+        channel_url="https://www.youtube.com/@handle",
+        stream_key="key",
+        ingest_url="rtmp://a.rtmp.youtube.com/live2",
+        yt_dlp_format="best",
+        copy_mode=False,
+        video_bitrate="3000k",
+        audio_bitrate="160k",
+        x264_preset="veryfast",
+        live_from_start=False,
+        verbose=False,
+        poll_interval_seconds=0.01,
+        max_checks=2,
+        restart_policy=SV.RestartPolicy(initial_delay=0),
+    )
+    assert calls["restream"] == 2
+    assert calls["detect"] == 4
+
+
+def test_watch_many_rechecks_on_detect_workers(monkeypatch):
+    # 세션 스레드의 재감지도 감지 풀에서 돌아 DetectionSession 이 워커 수를 넘지 않는다
+    threads = []
+    sessions = set()
+    calls = {"restream": 0}
+
+    def fake_detect_live(url, session):
+        threads.append(threading.current_thread().name)
+        sessions.add(id(session))
+        return LIVE if len(threads) <= 3 else W.Detection()
+
+    def fake_restream_youtube(**kwargs):
+        calls["restream"] += 1
+        raise RuntimeError("프로세스 종료 코드: yt-dlp=0, ffmpeg=1")
+
+    monkeypatch.setattr(W, "detect_live", fake_detect_live)
+    monkeypatch.setattr(W, "restream_youtube", fake_restream_youtube)
+
+    W.MultiChannelWatcher(
+        [W.ChannelConfig(channel_url="https://www.youtube.com/@a", stream_key="key-a")],
+        poll_interval_seconds=0.01,
+        max_detect_workers=1,
+        max_checks=2,
+        restart_policy=SV.RestartPolicy(initial_delay=0),
+    ).run()
+
+    # 폴링 -> (실패, 재감지) x3 -> 라이브 종료 -> 폴링
+    assert calls["restream"] == 3
+    assert len(threads) == 5
+    assert all(name.startswith("detect") for name in threads)
+    assert len(sessions) == 1
@@ -1,5 +1,10 @@
+import contextlib
+import json
+import threading
 import types
 
+import pytest
+
 from youtube_dump import watcher as W
 
 
@@ -69,19 +74,17 @@ def test_get_live_video_url_none_when_not_live(monkeypatch):
 def test_watch_triggers_restream_once(monkeypatch):
     calls = {"restream": 0}
 
-    def fake_get_live_video_url(url):
+    def fake_detect_live(url, session):
         state = calls.get("state", 0)
         calls["state"] = state + 1
-        return (
-            None
-            if state == 0
-            else ("https://www.youtube.com/watch?v=LIVEID" if state == 1 else None)
+        return W.Detection(
+            live_video_url="https://www.youtube.com/watch?v=LIVEID" if state == 1 else None
         )
 
     def fake_restream_youtube(**kwargs):
         calls["restream"] += 1
 
-    monkeypatch.setattr(W, "get_live_video_url", fake_get_live_video_url)
+    monkeypatch.setattr(W, "detect_live", fake_detect_live)
     monkeypatch.setattr(W, "restream_youtube", fake_restream_youtube)
 
     W.watch_channel_and_restream(
@@ -100,3 +103,240 @@ def test_watch_triggers_restream_once(monkeypatch):
     )
 
     assert calls["restream"] == 1
+
+
+def test_load_channel_configs(tmp_path, monkeypatch):
+    monkeypatch.setenv("KEY_B", "key-b")
+    path = tmp_path / "channels.json"
+    path.write_text(
+        json.dumps({
+            "defaults": {"copy_mode": True},
+            "channels": [
+                {"channel_url": "https://www.youtube.com/@a", "stream_key": "key-a"},
+                {"channel_url": "https://www.youtube.com/@b", "stream_key_env": "KEY_B"},
+            ],
+        }),
+        encoding="utf-8",
+    )
+
+    configs = W.load_channel_configs(path)
+    assert [c.stream_key for c in configs] == ["key-a", "key-b"]
+    assert all(c.copy_mode for c in configs)
+    assert configs[0].ingest_url == W.DEFAULT_INGEST_URL
+
+
+def test_load_channel_configs_rejects_unknown_keys(tmp_path):
+    path = tmp_path / "channels.json"
+    path.write_text(
+        json.dumps([{"channel_url": "https://www.youtube.com/@a", "stream_key": "k", "typo": 1}]),
+        encoding="utf-8",
+    )
+    with pytest.raises(ValueError):
+        W.load_channel_configs(path)
+
+
+def test_watch_many_live_does_not_block_other_channels(monkeypatch):
+    polls = {"a": 0, "b": 0}
+    release = threading.Event()
+    sessions = []
+
+    def fake_detect_live(url, session):
+        name = url.rsplit("@", 1)[1]
+        polls[name] += 1
+        if polls["b"] >= 3:
+            release.set()
+        # a 는 세션이 풀릴 때까지 라이브 (세션이 끝난 뒤 재감지하면 종료)
+        live = name == "a" and not release.is_set()
+        return W.Detection(live_video_url="https://www.youtube.com/watch?v=A" if live else None)
+
+    def fake_restream_youtube(**kwargs):
+        sessions.append(kwargs["stream_key"])
+        # 채널 b가 계속 폴링되는 동안 a의 세션은 블록된 상태로 남아 있어야 한다
+        assert release.wait(timeout=5)
+
+    monkeypatch.setattr(W, "detect_live", fake_detect_live)
+    monkeypatch.setattr(W, "restream_youtube", fake_restream_youtube)
+
+    W.watch_many_channels(
+        channels=[
+            W.ChannelConfig(channel_url="https://www.youtube.com/@a", stream_key="key-a"),
+            W.ChannelConfig(channel_url="https://www.youtube.com/@b", stream_key="key-b"),
+        ],
+        verbose=False,
+        poll_interval_seconds=0.01,
+        max_poll_interval_seconds=0.02,
+        max_detect_workers=2,
+        max_checks=3,
+    )
+
+    assert sessions.count("key-a") >= 1
+    assert "key-b" not in sessions
+    assert polls["b"] == 3
+
+
+def test_detection_session_reuses_and_recycles(monkeypatch):
+    created = []
+
+    class _FakeYDL:
+        def __init__(self, opts):
+            created.append(self)
+            self.closed = False
+
+        def close(self):
+            self.closed = True
+
+        def extract_info(self, url, download=False):
+            if url.endswith("@broken/live"):
+                raise RuntimeError("boom")
+            return {"is_live": True, "webpage_url": "https://www.youtube.com/watch?v=VID"}
+
+    monkeypatch.setattr(W, "yt_dlp", types.SimpleNamespace(YoutubeDL=_FakeYDL))
+
+    with W.DetectionSession(max_uses=3) as session:
+        for _ in range(3):
+            assert session.get_live_video_url("https://www.youtube.com/@a").endswith("VID")
+        assert len(created) == 1
+
+        session.get_live_video_url("https://www.youtube.com/@b")
+        assert len(created) == 2
+        assert created[0].closed
+        assert session.recycles == 1
+
+        assert session.get_live_video_url("https://www.youtube.com/@broken") is None
+        assert created[1].closed
+        session.get_live_video_url("https://www.youtube.com/@a")
+        assert len(created) == 3
+
+    assert created[2].closed
+
+
+def test_detection_session_reports_upcoming(monkeypatch):
+    class _FakeYDL:
+        def __init__(self, opts):
+            assert opts["ignore_no_formats_error"]
+
+        def extract_info(self, url, download=False):
+            return {"is_live": False, "live_status": "is_upcoming", "release_timestamp": 1700000000}
+
+    monkeypatch.setattr(W, "yt_dlp", types.SimpleNamespace(YoutubeDL=_FakeYDL))
+
+    with W.DetectionSession() as session:
+        detection = session.detect("https://www.youtube.com/@handle")
+    assert detection.live_video_url is None
+    assert detection.live_status == "is_upcoming"
+    assert detection.release_timestamp == 1700000000.0
+
+
+def test_load_channel_configs_archive_only(tmp_path):
+    path = tmp_path / "channels.json"
+    path.write_text(
+        json.dumps([
+            {
+                "channel_url": "https://www.youtube.com/@a",
+                "archive": {"directory": "/archive/a", "segment_seconds": 30, "container": "mp4"},
+            }
+        ]),
+        encoding="utf-8",
+    )
+    (config,) = W.load_channel_configs(path)
+    assert config.stream_key == ""
+    assert config.archive.directory == "/archive/a"
+    assert config.archive.container == "mp4"
+
+
+def test_load_channel_configs_renditions(tmp_path):
+    path = tmp_path / "channels.json"
+    entry = {"channel_url": "https://www.youtube.com/@a", "renditions": ["480p@1200k=/a.ts"]}
+    path.write_text(json.dumps([entry]), encoding="utf-8")
+    (config,) = W.load_channel_configs(path)
+    assert config.renditions == ["480p@1200k=/a.ts"]
+
+    entry["renditions"] = ["480p"]
+    path.write_text(json.dumps([entry]), encoding="utf-8")
+    with pytest.raises(ValueError, match="채널 #0"):
+        W.load_channel_configs(path)
+
+
+def test_watch_uses_per_live_ingest(monkeypatch):
+    lives = ["https://www.youtube.com/watch?v=LIVE1", None, "https://www.youtube.com/watch?v=LIVE2"]
+    events = []
+
+    def fake_detect_live(url, session):
+        return W.Detection(live_video_url=lives.pop(0) if lives else None)
+
+    def fake_restream_youtube(**kwargs):
+        events.append(("restream", kwargs["ingest_url"], kwargs["stream_key"]))
+
+    @contextlib.contextmanager
+    def ingest_for(detection):
+        key = detection.live_video_url[-5:]
+        events.append(("open", key))
+        yield "rtmp://ingest/live2", key
+        events.append(("close", key))
+
+    monkeypatch.setattr(W, "detect_live", fake_detect_live)
+    monkeypatch.setattr(W, "restream_youtube", fake_restream_youtube)
+
+    W.watch_channel_and_restream(
+        channel_url="https://www.youtube.com/@handle",
+        stream_key="",
+        ingest_url="",
+        yt_dlp_format="best",
+        copy_mode=False,
+        video_bitrate="3000k",
+        audio_bitrate="160k",
+        x264_preset="veryfast",
+        live_from_start=False,
+        verbose=False,
+        poll_interval_seconds=0.01,
+        max_checks=3,
+        ingest_for=ingest_for,
+    )
+    assert events == [
+        ("open", "LIVE1"),
+        ("restream", "rtmp://ingest/live2", "LIVE1"),
+        ("close", "LIVE1"),
+        ("open", "LIVE2"),
+        ("restream", "rtmp://ingest/live2", "LIVE2"),
+        ("close", "LIVE2"),
+    ]
+
+
+def test_watch_keeps_polling_when_ingest_setup_fails(monkeypatch):
+    # 방송 준비(Data API) 오류는 감시를 끝내지 않고 다음 폴링에서 다시 시도한다
+    events = []
+
+    def fake_detect_live(url, session):
+        # 송출이 한 번 끝난 뒤의 재감지부터는 라이브 종료
+        live = ("restream", "LIVE1") not in events
+        return W.Detection(live_video_url="https://www.youtube.com/watch?v=LIVE1" if live else None)
+
+    def fake_restream_youtube(**kwargs):
+        events.append(("restream", kwargs["stream_key"]))
+
+    @contextlib.contextmanager
+    def ingest_for(detection):
+        if not events:
+            events.append(("error",))
+            raise RuntimeError("quotaExceeded")
+        yield "rtmp://ingest/live2", "LIVE1"
+
+    monkeypatch.setattr(W, "detect_live", fake_detect_live)
+    monkeypatch.setattr(W, "restream_youtube", fake_restream_youtube)
+
+    W.watch_channel_and_restream(
+        channel_url="https://www.youtube.com/@handle",
+        stream_key="",
+        ingest_url="",
+        yt_dlp_format="best",
+        copy_mode=False,
+        video_bitrate="3000k",
+        audio_bitrate="160k",
+        x264_preset="veryfast",
+        live_from_start=False,
+        verbose=False,
+        poll_interval_seconds=0.01,
+        max_checks=2,
+        ingest_for=ingest_for,
+    )
+    assert events == [("error",), ("restream", "LIVE1")]
@@ -0,0 +1,162 @@
+import json
+import sys
+import time
+
+import pytest
+
+from youtube_dump import streamer as S
+from youtube_dump import watchdog as WD
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_watchdog_detects_stall_and_resets_after_healthy_period():
+    clock = _Clock()
+    dog = WD.StallWatchdog(
+        WD.StallPolicy(stall_seconds=10, max_restarts=2, healthy_seconds=60), clock=clock
+    )
+    clock.now = 5
+    assert not dog.observe(100)
+    clock.now = 14
+    assert not dog.observe(100)
+    clock.now = 15
+    assert dog.observe(100)
+
+    dog.restarted()
+    assert dog.restarts == 1 and not dog.exhausted
+    # 재시작 직후에는 다시 stall_seconds 만큼 기다린다
+    clock.now = 20
+    assert not dog.observe(100)
+    clock.now = 26
+    assert dog.observe(100)
+    dog.restarted()
+    assert dog.exhausted
+
+    clock.now = 30
+    assert not dog.observe(200)
+    clock.now = 100
+    assert not dog.observe(300)
+    assert dog.restarts == 0
+    assert dog.total_restarts == 2
+
+
+# 첫 producer 는 일부만 보내고 멈추고, 재시작된 producer 는 나머지를 보내고 끝난다
+_STALLING = (
+    "import sys, time; sys.stdout.buffer.write(b'a' * 1000); sys.stdout.flush(); time.sleep(60)"
+)
+_RESUMED = "import sys; sys.stdout.buffer.write(b'b' * 2000)"
+# yt-dlp FFmpegFD 처럼 stdout 을 물려받은 자식 프로세스가 파이프를 계속 쥐고 있는 producer
+_STALLING_WITH_CHILD = (
+    "import subprocess, sys, time; sys.stdout.buffer.write(b'a' * 1000); sys.stdout.flush(); "
+    "subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)']); time.sleep(60)"
+)
+# ffmpeg 대신: 한 번도 끊기지 않은 stdin 으로 두 producer 의 데이터를 모두 받아야 성공
+_CONSUMER = "import sys; data = sys.stdin.buffer.read(); assert data == b'a' * 1000 + b'b' * 2000"
+
+
+def _restream(**kwargs):
+    return S.restream_youtube(
+        source_url="https://youtube.com/watch?v=LIVE",
+        stream_key="abc",
+        ingest_url="rtmp://a.rtmp.youtube.com/live2",
+        yt_dlp_format="best",
+        copy_mode=True,
+        video_bitrate="3000k",
+        audio_bitrate="160k",
+        x264_preset="veryfast",
+        live_from_start=True,
+        verbose=False,
+        **kwargs,
+    )
+
+
+def test_restream_restarts_stalled_producer_keeping_ffmpeg(monkeypatch):
+    scripts = [_STALLING, _RESUMED]
+    calls = []
+
+    def _fake_ytdlp_cmd(**kwargs):
+        calls.append(kwargs)
+        return [sys.executable, "-c", scripts[len(calls) - 1]]
+
+    monkeypatch.setattr(S, "ensure_binaries", lambda verbose=False: None)
+    monkeypatch.setattr(S, "build_ytdlp_cmd", _fake_ytdlp_cmd)
+    monkeypatch.setattr(
+        S.StreamConfig, "build_ffmpeg_cmd", lambda self, **kwargs: [sys.executable, "-c", _CONSUMER]
+    )
+
+    result = _restream(stall_timeout=0.5)
+
+    assert result.rc_consumer == 0
+    assert result.producer_restarts == 1
+    assert result.relay["source_switches"] == 1
+    # 재시작은 라이브 엣지에서
+    assert calls[0]["live_from_start"] is True
+    assert calls[1]["live_from_start"] is False
+
+
+def test_restream_without_stall_timeout_has_no_relay(monkeypatch):
+    # 멈춤 감시는 켤 때만 relay 를 둔다 (기본 세션은 yt-dlp 와 ffmpeg 를 바로 잇는다)
+    monkeypatch.setattr(S, "ensure_binaries", lambda verbose=False: None)
+    monkeypatch.setattr(S, "build_ytdlp_cmd", lambda **kwargs: [sys.executable, "-c", _RESUMED])
+    monkeypatch.setattr(
+        S.StreamConfig,
+        "build_ffmpeg_cmd",
+        lambda self, **kwargs: [sys.executable, "-c", "import sys; sys.stdin.buffer.read()"],
+    )
+
+    result = _restream()
+
+    assert result.rc_consumer == 0
+    assert result.relay is None
+    assert result.producer_restarts == 0
+
+
+def test_restream_restart_kills_producer_children(monkeypatch):
+    # 부모만 죽이면 자식이 쥔 파이프가 EOF 가 되지 않아 relay 가 새 producer 로 넘어가지 못한다
+    scripts = [_STALLING_WITH_CHILD, _RESUMED]
+    calls = []
+
+    def _fake_ytdlp_cmd(**kwargs):
+        calls.append(kwargs)
+        return [sys.executable, "-c", scripts[len(calls) - 1]]
+
+    monkeypatch.setattr(S, "ensure_binaries", lambda verbose=False: None)
+    monkeypatch.setattr(S, "build_ytdlp_cmd", _fake_ytdlp_cmd)
+    monkeypatch.setattr(
+        S.StreamConfig, "build_ffmpeg_cmd", lambda self, **kwargs: [sys.executable, "-c", _CONSUMER]
+    )
+
+    started = time.monotonic()
+    result = _restream(stall_timeout=0.5)
+
+    assert result.rc_consumer == 0
+    assert result.producer_restarts == 1
+    assert result.relay["source_switches"] == 1
+    assert time.monotonic() - started < 30
+
+
+def test_restream_gives_up_after_max_restarts(monkeypatch, tmp_path):
+    monkeypatch.setattr(S, "ensure_binaries", lambda verbose=False: None)
+    monkeypatch.setattr(
+        S, "build_ytdlp_cmd", lambda **kwargs: [sys.executable, "-c", "import time; time.sleep(60)"]
+    )
+    monkeypatch.setattr(
+        S.StreamConfig,
+        "build_ffmpeg_cmd",
+        lambda self, **kwargs: [sys.executable, "-c", "import sys; sys.stdin.buffer.read()"],
+    )
+    monkeypatch.setattr(S, "StallPolicy", lambda stall_seconds: WD.StallPolicy(stall_seconds, 1))
+
+    log = tmp_path / "sessions.jsonl"
+    with pytest.raises(RuntimeError):
+        _restream(stall_timeout=0.3, session_log=log)
+
+    record = json.loads(log.read_text(encoding="utf-8"))
+    assert record["failure"] == "stall"
+    assert record["producer_restarts"] == 1
@@ -0,0 +1,224 @@
+import datetime as dt
+import threading
+
+import pytest
+from google.oauth2.credentials import Credentials
+
+from youtube_dump import youtube_api as API
+
+
+class _Call:
+    def __init__(self, result):
+        self._result = result
+
+    def execute(self):
+        if isinstance(self._result, Exception):
+            raise self._result
+        return self._result
+
+
+class _FakeBatch:
+    def __init__(self, service, callback):
+        service.batches += 1
+        self._callback = callback
+        self._requests = []
+
+    def add(self, request, request_id):
+        self._requests.append((request_id, request))
+
+    def execute(self):
+        for request_id, request in self._requests:
+            self._callback(request_id, *_result(request))
+
+
+def _result(request):
+    try:
+        return request.execute(), None
+    except Exception as exc:  # noqa: BLE001
+        return None, exc
+
+
+class _FakeResource:
+    def __init__(self, service, kind):
+        self._service = service
+        self._kind = kind
+
+    def list(self, **kwargs):
+        self._service.calls.append((self._kind, "list", kwargs))
+        return _Call({"items": list(self._service.streams)})
+
+    def list_next(self, request, resp):
+        return None
+
+    def insert(self, **kwargs):
+        self._service.calls.append((self._kind, "insert", kwargs))
+        if self._kind == "liveStreams":
+            item = _stream(f"s{len(self._service.streams) + 1}", kwargs["body"]["snippet"]["title"])
+            self._service.streams.append(item)
+            return _Call(item)
+        return _Call({"id": f"b{len(self._service.calls)}"})
+
+    def bind(self, **kwargs):
+        self._service.calls.append((self._kind, "bind", kwargs))
+        if self._service.fail_bind:
+            return _Call(RuntimeError("bind"))
+        return _Call({"id": kwargs["id"], "status": {"lifeCycleStatus": "ready"}})
+
+    def delete(self, **kwargs):
+        self._service.calls.append((self._kind, "delete", kwargs))
+        return _Call("")
+
+
+class _FakeService:
+    def __init__(self, streams=()):
+        self.streams = list(streams)
+        self.calls = []
+        self.batches = 0
+        self.fail_bind = False
+
+    def new_batch_http_request(self, callback):
+        return _FakeBatch(self, callback)
+
+    def liveStreams(self):  # noqa: N802
+        return _FakeResource(self, "liveStreams")
+
+    def liveBroadcasts(self):  # noqa: N802
+        return _FakeResource(self, "liveBroadcasts")
+
+    def count(self, kind, method):
+        return sum(1 for k, m, _ in self.calls if (k, m) == (kind, method))
+
+
+def _stream(stream_id, title, status="ready"):
+    return {
+        "id": stream_id,
+        "snippet": {"title": title},
+        "cdn": {
+            "ingestionInfo": {
+                "ingestionAddress": "rtmp://a/live2",
+                "streamName": f"key-{stream_id}",
+            }
+        },
+        "status": {"streamStatus": status},
+        "contentDetails": {"isReusable": True},
+    }
+
+
+def test_reuses_existing_stream_and_only_inserts_broadcast():
+    service = _FakeService([_stream("s1", "youtube-dump:default:1"), _stream("x", "other")])
+    pool = API.StreamPool(service=service)
+
+    assert API.create_stream_and_broadcast("a", pool=pool) == ("rtmp://a/live2", "key-s1")
+    assert service.count("liveStreams", "insert") == 0
+    assert service.count("liveBroadcasts", "insert") == 1
+    ((_, _, bind),) = [c for c in service.calls if c[1] == "bind"]
+    assert bind["streamId"] == "s1"
+
+
+def test_inserts_stream_when_pool_is_busy():
+    service = _FakeService([_stream("s1", "youtube-dump:default:1", status="active")])
+    pool = API.StreamPool(service=service)
+
+    first = pool.acquire()
+    second = pool.acquire()
+    assert (first.stream_id, second.stream_id) == ("s2", "s3")
+    titles = [
+        c[2]["body"]["snippet"]["title"]
+        for c in service.calls
+        if c[:2] == ("liveStreams", "insert")
+    ]
+    assert titles == ["youtube-dump:default:2", "youtube-dump:default:3"]
+    # 목록은 처음 한 번만 읽는다
+    assert service.count("liveStreams", "list") == 1
+
+    pool.release(first)
+    assert pool.acquire() is first
+
+
+def test_failed_bind_returns_stream_to_pool():
+    service = _FakeService([_stream("s1", "youtube-dump:default:1")])
+    service.fail_bind = True
+    pool = API.StreamPool(service=service)
+
+    with pytest.raises(API.BroadcastError):
+        API.create_stream_and_broadcast("a", pool=pool)
+    assert pool.acquire().stream_id == "s1"
+    # 바인딩하지 못한 broadcast 는 지운다
+    assert service.count("liveBroadcasts", "delete") == 1
+
+
+def test_acquire_many_inserts_missing_streams_in_one_batch():
+    service = _FakeService([_stream("s1", "youtube-dump:default:1")])
+    pool = API.StreamPool(service=service)
+
+    streams = pool.acquire_many(4)
+    assert [s.stream_id for s in streams] == ["s1", "s2", "s3", "s4"]
+    assert service.count("liveStreams", "insert") == 3
+    assert service.batches == 1
+
+
+def test_build_service_is_cached_and_refreshes_in_place(monkeypatch, tmp_path):
+    built = []
+
+    class _Creds:
+        valid = True
+        refresh_token = "r"
+        refreshed = 0
+
+        def refresh(self, request):
+            self.refreshed += 1
+            self.valid = True
+
+        def to_json(self):
+            return "{}"
+
+    creds = _Creds()
+    monkeypatch.setattr(API, "DEFAULT_TOKEN_FILE", str(tmp_path / "token.json"))
+    monkeypatch.setattr(API, "_load_credentials", lambda token_path: creds)
+    monkeypatch.setattr(API, "build", lambda *args, **kwargs: built.append(kwargs) or object())
+    API.reset_service()
+    try:
+        service = API.build_service()
+        assert API.build_service() is service
+        (kwargs,) = built
+        assert kwargs["static_discovery"] is True
+
+        creds.valid = False
+        assert API.build_service() is service
+        assert creds.refreshed == 1
+        assert (tmp_path / "token.json").read_text() == "{}"
+    finally:
+        API.reset_service()
+
+
+def test_build_service_uses_http_per_thread(monkeypatch, tmp_path):
+    # 캐시된 서비스를 여러 스레드가 써도 요청마다 호출한 스레드의 http 를 쓴다
+    creds = Credentials(token="t")
+    monkeypatch.setattr(API, "DEFAULT_TOKEN_FILE", str(tmp_path / "token.json"))
+    monkeypatch.setattr(API, "_load_credentials", lambda token_path: creds)
+    API.reset_service()
+    try:
+        service = API.build_service()
+
+        def _http():
+            return service.liveBroadcasts().list(part="id", mine=True).http
+
+        main = _http()
+        assert _http() is main
+        assert main.credentials is creds
+        other = []
+        thread = threading.Thread(target=lambda: other.append(_http()))
+        thread.start()
+        thread.join()
+        assert other[0] is not main
+        assert other[0].credentials is creds
+    finally:
+        API.reset_service()
+
+
+def test_broadcast_title():
+    info = {"title": "노래 <방송>", "channel": "채널"}
+    assert API.broadcast_title(info) == "[채널] 노래 방송"
+    assert len(API.broadcast_title({"title": "x" * 200})) == API.MAX_TITLE_LENGTH
+    now = dt.datetime(2026, 1, 2, 3, 4, 5)
+    assert API.broadcast_title(None, now=now) == "Archive 2026-01-02 03:04:05"
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+# container -> (segment muxer 의 segment_format, 확장자)
+ARCHIVE_CONTAINERS = {"ts": ("mpegts", ".ts"), "mp4": ("mp4", ".mp4")}
+INDEX_NAME = "index.json"
+# ffmpeg segment muxer 의 strftime 파일 이름 (로컬 시각, 세그먼트 시작 시점)
+SEGMENT_TIME_FORMAT = "%Y%m%d-%H%M%S"
+_SEGMENT_RE = re.compile(r"^(\d{8}-\d{6})\.(ts|mp4)$")
+
+
+@dataclass
+class ArchiveConfig:
+    directory: str
+    segment_seconds: float = 60.0
+    container: str = "ts"
+    # 보존 한도. 넘으면 오래된 세그먼트부터 지운다 (None 이면 제한 없음)
+    max_bytes: int | None = None
+    max_age_seconds: float | None = None
+
+    def __post_init__(self) -> None:
+        if self.container not in ARCHIVE_CONTAINERS:
+            raise ValueError(f"지원하지 않는 아카이브 컨테이너: {self.container}")
+        if self.segment_seconds <= 0:
+            raise ValueError("segment_seconds 는 0보다 커야 합니다.")
+
+    def output_spec(self) -> tuple[str, str, dict[str, str]]:
+        # streamer.output_spec 과 같은 (muxer, URL, muxer 옵션) 형태
+        segment_format, ext = ARCHIVE_CONTAINERS[self.container]
+        options = {
+            "segment_time": f"{self.segment_seconds:g}",
+            "segment_format": segment_format,
+            "reset_timestamps": "1",
+            "strftime": "1",
+        }
+        if segment_format == "mp4":
+            # 세그먼트가 쓰이는 도중에 끊겨도 읽을 수 있도록 fragmented MP4
+            options["segment_format_options"] = "movflags=+frag_keyframe+empty_moov"
+        return "segment", os.path.join(self.directory, SEGMENT_TIME_FORMAT + ext), options
+
+
+@dataclass
+class Segment:
+    path: str
+    started_at: float
+    size: int
+    complete: bool = True
+
+
+def scan_segments(directory: str | os.PathLike) -> list[Segment]:
+    # 파일 이름(시작 시각) 순. 기록 중이면 마지막 세그먼트는 아직 쓰이는 중이다
+    segments: list[Segment] = []
+    try:
+        entries = list(os.scandir(directory))
+    except FileNotFoundError:
+        return segments
+    for entry in entries:
+        match = _SEGMENT_RE.match(entry.name)
+        if not match or not entry.is_file():
+            continue
+        try:
+            size = entry.stat().st_size
+        except FileNotFoundError:
+            continue
+        started_at = time.mktime(time.strptime(match.group(1), SEGMENT_TIME_FORMAT))
+        segments.append(Segment(entry.path, started_at, size))
+    segments.sort(key=lambda s: (s.started_at, s.path))
+    return segments
+
+
+def apply_retention(
+    segments: list[Segment],
+    max_bytes: int | None,
+    max_age_seconds: float | None,
+    now: float,
+) -> tuple[list[Segment], list[Segment]]:
+    # (남길 것, 지울 것). 쓰이는 중인 세그먼트는 한도를 넘어도 지우지 않는다
+    kept = list(segments)
+    removed: list[Segment] = []
+    total = sum(s.size for s in kept)
+    while kept and kept[0].complete:
+        oldest = kept[0]
+        too_old = max_age_seconds is not None and now - oldest.started_at > max_age_seconds
+        too_big = max_bytes is not None and total > max_bytes
+        if not (too_old or too_big):
+            break
+        removed.append(kept.pop(0))
+        total -= oldest.size
+    return kept, removed
+
+
+def write_index(directory: str | os.PathLike, segments: list[Segment]) -> None:
+    # 업로드 작업이 읽는 색인. 부분적으로 쓰인 파일을 읽지 않도록 교체는 원자적으로
+    path = Path(directory) / INDEX_NAME
+    tmp = path.with_suffix(".json.tmp")
+    records = [{**asdict(s), "path": os.path.basename(s.path)} for s in segments]
+    tmp.write_text(
+        json.dumps({"updated_at": time.time(), "segments": records}, ensure_ascii=False),
+        encoding="utf-8",
+    )
+    os.replace(tmp, path)
+
+
+def list_segments(directory: str | os.PathLike, complete_only: bool = True) -> list[Segment]:
+    # 색인에 기록된 세그먼트 목록 (path 는 절대 경로로 돌려준다)
+    path = Path(directory) / INDEX_NAME
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return []
+    segments = [
+        Segment(**{**record, "path": str(Path(directory) / record["path"])})
+        for record in data.get("segments", [])
+    ]
+    return [s for s in segments if s.complete or not complete_only]
+
+
+class ArchiveRecorder:
+    # ffmpeg segment muxer 가 세그먼트를 쓰는 동안 보존 한도를 적용하고 색인을 갱신한다.
+    # 디렉터리를 훑어 상태를 다시 만들기 때문에 메모리 사용은 남아 있는 세그먼트 수에만 비례한다.
+
+    def __init__(
+        self,
+        config: ArchiveConfig,
+        interval: float | None = None,
+        clock: Callable[[], float] = time.time,
+        verbose: bool = False,
+    ) -> None:
+        self.config = config
+        self.interval = interval if interval is not None else min(config.segment_seconds, 30.0)
+        self.verbose = verbose
+        self._clock = clock
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self.removed_count = 0
+
+    def __enter__(self) -> ArchiveRecorder:
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        os.makedirs(self.config.directory, exist_ok=True)
+        self.refresh(recording=True)
+        self._thread = threading.Thread(target=self._loop, name="archive", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        # ffmpeg 가 끝났으므로 마지막 세그먼트도 완료된 것으로 기록
+        self.refresh(recording=False)
+
+    def refresh(self, recording: bool = True) -> list[Segment]:
+        with self._lock:
+            segments = scan_segments(self.config.directory)
+            if recording and segments:
+                segments[-1].complete = False
+            kept, removed = apply_retention(
+                segments, self.config.max_bytes, self.config.max_age_seconds, self._clock()
+            )
+            for segment in removed:
+                self._remove(segment)
+            self.removed_count += len(removed)
+            write_index(self.config.directory, kept)
+            return kept
+
+    def segments(self) -> list[Segment]:
+        return list_segments(self.config.directory)
+
+    def _remove(self, segment: Segment) -> None:
+        try:
+            os.remove(segment.path)
+        except FileNotFoundError:
+            pass
+        except OSError as exc:
+            if self.verbose:
+                print(f"세그먼트 삭제 실패: {segment.path}: {exc}", file=sys.stderr)
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._refresh_quietly()
+
+    def _refresh_quietly(self) -> None:
+        # 디스크 오류 등으로 색인 갱신이 실패해도 기록(ffmpeg)은 계속된다
+        try:
+            self.refresh(recording=True)
+        except Exception as exc:
+            if self.verbose:
+                print(f"아카이브 색인 갱신 실패: {exc}", file=sys.stderr)
@@ -1,29 +1,181 @@
 from __future__ import annotations
 
-import datetime as dt
+import contextlib
+import json
+import os
 import sys
+import threading
+from http import HTTPStatus
+from pathlib import Path
 
 import click
 from dotenv import load_dotenv
 
-from . import watcher
-from .streamer import restream_youtube
-from .youtube_api import create_stream_and_broadcast, login as yt_login, logout as yt_logout
+from . import metrics, presets, watcher
+from .archive import ArchiveConfig
+from .daemon import (
+    DEFAULT_PORT,
+    DEFAULT_REENCODE_CORES,
+    JobDaemon,
+    call_control_api,
+    default_cpu_budget,
+    default_token_path,
+    read_control_token,
+    start_control_server,
+    write_control_token,
+)
+from .infocache import InfoCache
+from .progress import DEFAULT_SPEED_ALERT
+from .relay import RELAY_BACKENDS
+from .streamer import (
+    MissingBinaryError,
+    Rendition,
+    ensure_binaries,
+    parse_rendition,
+    restream_youtube,
+)
+from .supervisor import RestartPolicy
 
 
 def _load_env() -> None:
     load_dotenv(override=False)
 
 
+def _archive_options(func):  # type: ignore[no-untyped-def]
+    # restream / watch / watch-oauth 공통 로컬 기록 옵션
+    options = [
+        click.option(
+            "--archive-dir",
+            type=click.Path(file_okay=False),
+            default=None,
+            help="지정하면 스트림을 이 디렉터리에 일정 길이 세그먼트로 함께 기록",
+        ),
+        click.option(
+            "--segment-seconds", default=60.0, show_default=True, help="세그먼트 길이(초)"
+        ),
+        click.option(
+            "--archive-format",
+            type=click.Choice(["ts", "mp4"]),
+            default="ts",
+            show_default=True,
+            help="세그먼트 컨테이너 (mp4 는 fragmented MP4)",
+        ),
+        click.option(
+            "--retain-hours", type=float, default=None, help="이보다 오래된 세그먼트 삭제"
+        ),
+        click.option(
+            "--retain-gb", type=float, default=None, help="전체 크기가 넘으면 오래된 것부터 삭제"
+        ),
+    ]
+    for option in reversed(options):
+        func = option(func)
+    return func
+
+
+def _parse_renditions(ctx, param, values):  # type: ignore[no-untyped-def]
+    try:
+        return [parse_rendition(value) for value in values]
+    except ValueError as exc:
+        raise click.BadParameter(str(exc)) from exc
+
+
+_rendition_option = click.option(
+    "--rendition",
+    "renditions",
+    multiple=True,
+    callback=_parse_renditions,
+    help="같은 디코딩 결과로 함께 인코딩할 추가 출력 (예: 720p@2500k=URL, audio@128k=./audio.m4a, 반복 가능)",
+)
+
+
+def _archive_config(
+    archive_dir: str | None,
+    segment_seconds: float,
+    archive_format: str,
+    retain_hours: float | None,
+    retain_gb: float | None,
+) -> ArchiveConfig | None:
+    if not archive_dir:
+        return None
+    return ArchiveConfig(
+        directory=archive_dir,
+        segment_seconds=segment_seconds,
+        container=archive_format,
+        max_bytes=int(retain_gb * 1024**3) if retain_gb is not None else None,
+        max_age_seconds=retain_hours * 3600 if retain_hours is not None else None,
+    )
+
+
+def _restart_options(func):  # type: ignore[no-untyped-def]
+    # watch / watch-many / watch-oauth 공통: 라이브 중 송출 실패 시 재시작 정책과 재시작용 info 캐시
+    options = [
+        click.option(
+            "--restart-delay",
+            default=1.0,
+            show_default=True,
+            help="송출 실패 후 첫 재시작까지 대기(초). 연속 실패마다 두 배",
+        ),
+        click.option(
+            "--restart-max-delay", default=60.0, show_default=True, help="재시작 대기 상한(초)"
+        ),
+        click.option(
+            "--max-restarts",
+            default=10,
+            show_default=True,
+            help="--restart-window 동안 허용하는 재시작 횟수 (넘으면 창이 빌 때까지 대기)",
+        ),
+        click.option(
+            "--restart-window", default=600.0, show_default=True, help="재시작 횟수를 세는 구간(초)"
+        ),
+        click.option(
+            "--info-cache/--no-info-cache",
+            default=True,
+            show_default=True,
+            help="감지한 라이브 정보를 디스크에 캐시해 재시작 시 yt-dlp 추출을 생략 "
+            "(위치: YOUTUBE_DUMP_CACHE_DIR, 기본 ~/.cache/youtube_dump/info)",
+        ),
+    ]
+    for option in reversed(options):
+        func = option(func)
+    return func
+
+
+def _restart_policy(
+    restart_delay: float, restart_max_delay: float, max_restarts: int, restart_window: float
+) -> RestartPolicy:
+    return RestartPolicy(
+        initial_delay=restart_delay,
+        max_delay=restart_max_delay,
+        max_restarts=max_restarts,
+        window_seconds=restart_window,
+    )
+
+
 @click.group()
-def cli() -> None:
+@click.option(
+    "--metrics-port",
+    type=int,
+    default=None,
+    help="지정하면 127.0.0.1:<port>/metrics 로 Prometheus 메트릭 노출 "
+    "(환경변수 YOUTUBE_DUMP_METRICS_PORT 사용 가능)",
+)
+def cli(metrics_port: int | None) -> None:
     _load_env()
+    # .env 값도 반영되도록 _load_env 뒤에 환경변수를 읽는다
+    if metrics_port is None and os.environ.get("YOUTUBE_DUMP_METRICS_PORT"):
+        metrics_port = int(os.environ["YOUTUBE_DUMP_METRICS_PORT"])
+    if metrics_port is not None:
+        server = metrics.start_metrics_server(metrics_port)
+        click.echo(f"메트릭: http://127.0.0.1:{server.server_address[1]}/metrics", err=True)
 
 
 @cli.command(help="YouTube OAuth 로그인(토큰 저장)")
 @click.option("--client-secrets", default="client_secret.json", show_default=True)
 @click.option("--token", default="token.json", show_default=True)
 def login(client_secrets: str, token: str) -> None:
+    # google API 클라이언트는 무거워서 쓰는 명령에서만 import 한다
+    from .youtube_api import login as yt_login  # noqa: PLC0415
+
     yt_login(client_secrets_path=client_secrets, token_path=token)
     click.echo("로그인 완료")
 
@@ -31,10 +183,65 @@ def login(client_secrets: str, token: str) -> None:
 @cli.command(help="YouTube OAuth 로그아웃(토큰 삭제)")
 @click.option("--token", default="token.json", show_default=True)
 def logout(token: str) -> None:
+    from .youtube_api import logout as yt_logout  # noqa: PLC0415
+
     yt_logout(token_path=token)
     click.echo("로그아웃 완료")
 
 
+@cli.command(help="x264 preset 별 인코딩 비용을 재서 --preset auto 가 쓰도록 저장합니다.")
+@click.option("--seconds", default=10.0, show_default=True, help="합성 클립 길이(초)")
+@click.option("--size", default="1920x1080", show_default=True, help="합성 클립 해상도")
+@click.option("--fps", default=30, show_default=True)
+@click.option("--video-bitrate", default="4500k", show_default=True)
+@click.option(
+    "--preset",
+    "preset_names",
+    multiple=True,
+    type=click.Choice(presets.X264_PRESETS),
+    help="잴 preset (반복 지정, 기본: 전부)",
+)
+@click.option(
+    "--out", default=None, help="저장 경로 (기본: ~/.cache/youtube_dump/calibration.json)"
+)
+def calibrate(
+    seconds: float,
+    size: str,
+    fps: int,
+    video_bitrate: str,
+    preset_names: tuple[str, ...],
+    out: str | None,
+) -> None:
+    try:
+        width, height = (int(v) for v in size.lower().split("x"))
+    except ValueError as exc:
+        raise click.BadParameter("WIDTHxHEIGHT 형식이어야 합니다.", param_hint="--size") from exc
+    try:
+        ensure_binaries()
+    except MissingBinaryError as exc:
+        click.echo(f"오류: {exc}", err=True)
+        sys.exit(1)
+    cpu_count = os.cpu_count() or 1
+
+    def _echo(measured: presets.PresetMeasurement) -> None:
+        sessions = cpu_count / measured.cpu_per_second if measured.cpu_per_second else 0
+        click.echo(
+            f"{measured.preset:>10}: {measured.speed:6.2f}x, "
+            f"{measured.cpu_per_second:5.2f}코어/세션, 실시간 세션 약 {sessions:.1f}개"
+        )
+
+    calibration = presets.calibrate(
+        presets=preset_names or presets.X264_PRESETS,
+        seconds=seconds,
+        width=width,
+        height=height,
+        fps=fps,
+        video_bitrate=video_bitrate,
+        on_measured=_echo,
+    )
+    click.echo(f"저장: {calibration.save(out)}")
+
+
 @cli.command(help="다른 유튜브 라이브를 내 채널로 재송출합니다.")
 @click.argument("source_url", type=str)
 @click.option(
@@ -56,40 +263,104 @@ def logout(token: str) -> None:
 @click.option(
     "--copy/--reencode",
     "copy_mode",
-    default=False,
-    show_default=True,
-    help="코덱 복사 시도 여부 (기본: 재인코딩)",
+    default=None,
+    help="코덱 복사 여부 (기본: 소스 코덱을 보고 자동 판별)",
 )
 @click.option("--video-bitrate", default="3000k", show_default=True)
 @click.option("--audio-bitrate", default="160k", show_default=True)
-@click.option("--preset", default="veryfast", show_default=True, help="x264 preset")
+@click.option(
+    "--preset",
+    default="veryfast",
+    show_default=True,
+    help="x264 preset (auto: calibrate 결과와 인코딩 속도로 세션마다 자동 선택)",
+)
 @click.option(
     "--live-from-start/--live-edge",
     default=False,
     show_default=True,
     help="라이브 시작 시점부터 재생",
 )
+@click.option(
+    "--producer",
+    "producer_mode",
+    type=click.Choice(["subprocess", "inprocess", "direct"]),
+    default="subprocess",
+    show_default=True,
+    help="소스 수신 방식 (inprocess: 이 프로세스에서 수신, direct: ffmpeg 가 매니페스트를 직접 수신)",
+)
+@click.option(
+    "--extra-output",
+    "extra_outputs",
+    multiple=True,
+    help="추가 출력(RTMP URL 또는 파일 경로, 반복 가능). 한 번 인코딩해 tee 로 함께 보냄",
+)
+@click.option(
+    "--session-log",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="세션 결과(최종 copy/reencode 모드 등)를 JSON Lines 로 덧붙일 파일",
+)
+@click.option(
+    "--relay",
+    type=click.Choice(RELAY_BACKENDS),
+    is_flag=False,
+    flag_value="ring",
+    default=None,
+    help="yt-dlp 와 ffmpeg 사이에 계측용 relay 를 둠 (값 생략 시 ring, splice 는 복사 없이 전달)",
+)
+@click.option(
+    "--stall-timeout",
+    type=float,
+    default=None,
+    help="원본에서 이 시간(초) 동안 데이터가 없으면 ffmpeg 연결은 유지한 채 yt-dlp 만 재시작 "
+    "(relay 를 켠다, 권장 30, 기본: 끔)",
+)
+@click.option(
+    "--speed-alert",
+    type=float,
+    default=DEFAULT_SPEED_ALERT,
+    show_default=True,
+    help="ffmpeg 인코딩 속도가 이 배속 미만으로 10초 넘게 이어지면 경고 (0: 끔)",
+)
+@_rendition_option
+@_archive_options
 @click.option("--verbose/--quiet", default=False, show_default=True)
 def restream(
     source_url: str,
     stream_key: str | None,
     ingest_url: str,
     fmt: str,
-    copy_mode: bool,
+    copy_mode: bool | None,
     video_bitrate: str,
     audio_bitrate: str,
     preset: str,
     live_from_start: bool,
+    producer_mode: str,
+    extra_outputs: tuple[str, ...],
+    renditions: list[Rendition],
+    session_log: str | None,
+    relay: str | None,
+    stall_timeout: float | None,
+    speed_alert: float,
+    archive_dir: str | None,
+    segment_seconds: float,
+    archive_format: str,
+    retain_hours: float | None,
+    retain_gb: float | None,
     verbose: bool,
 ) -> None:
-    if not stream_key:
-        click.echo("환경변수 YOUTUBE_STREAM_KEY 또는 --stream-key 옵션이 필요합니다.", err=True)
+    archive = _archive_config(archive_dir, segment_seconds, archive_format, retain_hours, retain_gb)
+    if not stream_key and archive is None and not renditions:
+        click.echo(
+            "환경변수 YOUTUBE_STREAM_KEY 또는 --stream-key 옵션(또는 --archive-dir, --rendition)이 필요합니다.",
+            err=True,
+        )
         sys.exit(2)
 
     try:
         restream_youtube(
             source_url=source_url,
-            stream_key=stream_key,
+            stream_key=stream_key or "",
             ingest_url=ingest_url,
             yt_dlp_format=fmt,
             copy_mode=copy_mode,
@@ -98,6 +369,14 @@ def restream(
             x264_preset=preset,
             live_from_start=live_from_start,
             verbose=verbose,
+            session_log=session_log,
+            extra_outputs=list(extra_outputs),
+            renditions=renditions,
+            archive=archive,
+            relay=relay,
+            stall_timeout=stall_timeout or None,
+            speed_alert=speed_alert or None,
+            producer_mode=producer_mode,
         )
     except KeyboardInterrupt:
         click.echo("중단됨")
@@ -115,36 +394,124 @@ def restream(
 )
 @click.option("--ingest-url", default="rtmp://a.rtmp.youtube.com/live2", show_default=True)
 @click.option("--format", "fmt", default="bestvideo+bestaudio/best", show_default=True)
-@click.option("--copy/--reencode", "copy_mode", default=False, show_default=True)
+@click.option("--copy/--reencode", "copy_mode", default=None, help="기본: 자동 판별")
 @click.option("--video-bitrate", default="3000k", show_default=True)
 @click.option("--audio-bitrate", default="160k", show_default=True)
-@click.option("--preset", default="veryfast", show_default=True)
+@click.option(
+    "--preset",
+    default="veryfast",
+    show_default=True,
+    help="x264 preset (auto: calibrate 결과와 인코딩 속도로 세션마다 자동 선택)",
+)
 @click.option("--live-from-start/--live-edge", default=False, show_default=True)
+@click.option(
+    "--producer",
+    "producer_mode",
+    type=click.Choice(["subprocess", "inprocess", "direct"]),
+    default="subprocess",
+    show_default=True,
+    help="소스 수신 방식 (inprocess: 이 프로세스에서 수신, direct: ffmpeg 가 매니페스트를 직접 수신)",
+)
+@click.option(
+    "--extra-output",
+    "extra_outputs",
+    multiple=True,
+    help="추가 출력(RTMP URL 또는 파일 경로, 반복 가능). 한 번 인코딩해 tee 로 함께 보냄",
+)
+@click.option(
+    "--session-log",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="세션 결과(최종 copy/reencode 모드 등)를 JSON Lines 로 덧붙일 파일",
+)
+@click.option(
+    "--relay",
+    type=click.Choice(RELAY_BACKENDS),
+    is_flag=False,
+    flag_value="ring",
+    default=None,
+    help="yt-dlp 와 ffmpeg 사이에 계측용 relay 를 둠 (값 생략 시 ring, splice 는 복사 없이 전달)",
+)
+@click.option(
+    "--stall-timeout",
+    type=float,
+    default=None,
+    help="원본에서 이 시간(초) 동안 데이터가 없으면 ffmpeg 연결은 유지한 채 yt-dlp 만 재시작 "
+    "(relay 를 켠다, 권장 30, 기본: 끔)",
+)
+@click.option(
+    "--speed-alert",
+    type=float,
+    default=DEFAULT_SPEED_ALERT,
+    show_default=True,
+    help="ffmpeg 인코딩 속도가 이 배속 미만으로 10초 넘게 이어지면 경고 (0: 끔)",
+)
+@_rendition_option
+@_archive_options
+@_restart_options
 @click.option("--verbose/--quiet", default=False, show_default=True)
-@click.option("--interval", "poll_interval", default=15.0, show_default=True, help="폴링 간격(초)")
+@click.option(
+    "--interval", "poll_interval", default=15.0, show_default=True, help="기본 폴링 간격(초)"
+)
+@click.option(
+    "--max-interval",
+    "max_poll_interval",
+    default=180.0,
+    show_default=True,
+    help="조용한 채널의 최대 폴링 간격(초)",
+)
+@click.option(
+    "--probe/--no-probe",
+    default=True,
+    show_default=True,
+    help="전체 추출 전에 /live 페이지로 가볍게 라이브 여부를 확인",
+)
 @click.option("--max-checks", default=None, type=int, help="테스트/디버깅용 최대 폴링 횟수")
 def watch(
     channel_url: str,
     stream_key: str | None,
     ingest_url: str,
     fmt: str,
-    copy_mode: bool,
+    copy_mode: bool | None,
     video_bitrate: str,
     audio_bitrate: str,
     preset: str,
     live_from_start: bool,
+    producer_mode: str,
+    extra_outputs: tuple[str, ...],
+    renditions: list[Rendition],
+    session_log: str | None,
+    relay: str | None,
+    stall_timeout: float | None,
+    speed_alert: float,
+    archive_dir: str | None,
+    segment_seconds: float,
+    archive_format: str,
+    retain_hours: float | None,
+    retain_gb: float | None,
+    restart_delay: float,
+    restart_max_delay: float,
+    max_restarts: int,
+    restart_window: float,
+    info_cache: bool,
     verbose: bool,
     poll_interval: float,
+    max_poll_interval: float,
+    probe: bool,
     max_checks: int | None,
 ) -> None:
-    if not stream_key:
-        click.echo("환경변수 YOUTUBE_STREAM_KEY 또는 --stream-key 옵션이 필요합니다.", err=True)
+    archive = _archive_config(archive_dir, segment_seconds, archive_format, retain_hours, retain_gb)
+    if not stream_key and archive is None and not renditions:
+        click.echo(
+            "환경변수 YOUTUBE_STREAM_KEY 또는 --stream-key 옵션(또는 --archive-dir, --rendition)이 필요합니다.",
+            err=True,
+        )
         sys.exit(2)
 
     try:
         watcher.watch_channel_and_restream(
             channel_url=channel_url,
-            stream_key=stream_key,
+            stream_key=stream_key or "",
             ingest_url=ingest_url,
             yt_dlp_format=fmt,
             copy_mode=copy_mode,
@@ -153,8 +520,95 @@ def watch(
             x264_preset=preset,
             live_from_start=live_from_start,
             verbose=verbose,
+            session_log=session_log,
+            extra_outputs=list(extra_outputs),
+            renditions=renditions,
+            archive=archive,
+            relay=relay,
+            stall_timeout=stall_timeout or None,
+            speed_alert=speed_alert or None,
+            producer_mode=producer_mode,
+            poll_interval_seconds=poll_interval,
+            max_poll_interval_seconds=max_poll_interval,
+            max_checks=max_checks,
+            probe=probe,
+            restart_policy=_restart_policy(
+                restart_delay, restart_max_delay, max_restarts, restart_window
+            ),
+            info_cache=InfoCache() if info_cache else None,
+        )
+    except KeyboardInterrupt:
+        click.echo("중단됨")
+    except Exception as exc:  # noqa: BLE001
+        if verbose:
+            raise
+        click.echo(f"오류: {exc}", err=True)
+        sys.exit(1)
+
+
+@cli.command(name="watch-many", help="여러 채널을 한 프로세스에서 동시에 감시하여 재송출합니다.")
+@click.argument("config_path", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--interval", "poll_interval", default=15.0, show_default=True, help="기본 폴링 간격(초)"
+)
+@click.option(
+    "--max-interval",
+    "max_poll_interval",
+    default=180.0,
+    show_default=True,
+    help="조용한 채널의 최대 폴링 간격(초)",
+)
+@click.option("--workers", default=4, show_default=True, help="동시 감지 작업 수")
+@click.option(
+    "--session-log",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="세션 결과(최종 copy/reencode 모드 등)를 JSON Lines 로 덧붙일 파일",
+)
+@click.option("--verbose/--quiet", default=False, show_default=True)
+@click.option(
+    "--probe/--no-probe",
+    default=True,
+    show_default=True,
+    help="전체 추출 전에 /live 페이지로 가볍게 라이브 여부를 확인",
+)
+@click.option("--max-checks", default=None, type=int, help="테스트/디버깅용 채널별 최대 폴링 횟수")
+@_restart_options
+def watch_many(
+    config_path: str,
+    poll_interval: float,
+    max_poll_interval: float,
+    workers: int,
+    session_log: str | None,
+    verbose: bool,
+    probe: bool,
+    max_checks: int | None,
+    restart_delay: float,
+    restart_max_delay: float,
+    max_restarts: int,
+    restart_window: float,
+    info_cache: bool,
+) -> None:
+    try:
+        channels = watcher.load_channel_configs(config_path)
+    except (OSError, ValueError) as exc:
+        click.echo(f"설정 오류: {exc}", err=True)
+        sys.exit(2)
+
+    try:
+        watcher.watch_many_channels(
+            channels=channels,
+            verbose=verbose,
+            session_log=session_log,
             poll_interval_seconds=poll_interval,
+            max_poll_interval_seconds=max_poll_interval,
+            max_detect_workers=workers,
             max_checks=max_checks,
+            probe=probe,
+            restart_policy=_restart_policy(
+                restart_delay, restart_max_delay, max_restarts, restart_window
+            ),
+            info_cache=InfoCache() if info_cache else None,
         )
     except KeyboardInterrupt:
         click.echo("중단됨")
@@ -169,34 +623,134 @@ def watch(
 @click.argument("channel_url", type=str)
 @click.option("--privacy", default="private", show_default=True)
 @click.option("--format", "fmt", default="bestvideo+bestaudio/best", show_default=True)
-@click.option("--copy/--reencode", "copy_mode", default=False, show_default=True)
+@click.option("--copy/--reencode", "copy_mode", default=None, help="기본: 자동 판별")
 @click.option("--video-bitrate", default="3000k", show_default=True)
 @click.option("--audio-bitrate", default="160k", show_default=True)
-@click.option("--preset", default="veryfast", show_default=True)
+@click.option(
+    "--preset",
+    default="veryfast",
+    show_default=True,
+    help="x264 preset (auto: calibrate 결과와 인코딩 속도로 세션마다 자동 선택)",
+)
 @click.option("--live-from-start/--live-edge", default=False, show_default=True)
+@click.option(
+    "--producer",
+    "producer_mode",
+    type=click.Choice(["subprocess", "inprocess", "direct"]),
+    default="subprocess",
+    show_default=True,
+    help="소스 수신 방식 (inprocess: 이 프로세스에서 수신, direct: ffmpeg 가 매니페스트를 직접 수신)",
+)
+@click.option(
+    "--extra-output",
+    "extra_outputs",
+    multiple=True,
+    help="추가 출력(RTMP URL 또는 파일 경로, 반복 가능). 한 번 인코딩해 tee 로 함께 보냄",
+)
+@click.option(
+    "--session-log",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="세션 결과(최종 copy/reencode 모드 등)를 JSON Lines 로 덧붙일 파일",
+)
+@click.option(
+    "--relay",
+    type=click.Choice(RELAY_BACKENDS),
+    is_flag=False,
+    flag_value="ring",
+    default=None,
+    help="yt-dlp 와 ffmpeg 사이에 계측용 relay 를 둠 (값 생략 시 ring, splice 는 복사 없이 전달)",
+)
+@click.option(
+    "--stall-timeout",
+    type=float,
+    default=None,
+    help="원본에서 이 시간(초) 동안 데이터가 없으면 ffmpeg 연결은 유지한 채 yt-dlp 만 재시작 "
+    "(relay 를 켠다, 권장 30, 기본: 끔)",
+)
+@click.option(
+    "--speed-alert",
+    type=float,
+    default=DEFAULT_SPEED_ALERT,
+    show_default=True,
+    help="ffmpeg 인코딩 속도가 이 배속 미만으로 10초 넘게 이어지면 경고 (0: 끔)",
+)
+@_rendition_option
+@_archive_options
+@_restart_options
 @click.option("--verbose/--quiet", default=False, show_default=True)
-@click.option("--interval", "poll_interval", default=15.0, show_default=True, help="폴링 간격(초)")
+@click.option(
+    "--interval", "poll_interval", default=15.0, show_default=True, help="기본 폴링 간격(초)"
+)
+@click.option(
+    "--max-interval",
+    "max_poll_interval",
+    default=180.0,
+    show_default=True,
+    help="조용한 채널의 최대 폴링 간격(초)",
+)
+@click.option(
+    "--probe/--no-probe",
+    default=True,
+    show_default=True,
+    help="전체 추출 전에 /live 페이지로 가볍게 라이브 여부를 확인",
+)
 @click.option("--max-checks", default=None, type=int, help="테스트/디버깅용 최대 폴링 횟수")
+@click.option(
+    "--stream-pool",
+    default="default",
+    show_default=True,
+    help="재사용할 liveStream 풀 이름 (같은 채널로 동시에 여러 프로세스를 돌리면 다르게 지정)",
+)
 def watch_oauth(
     channel_url: str,
     privacy: str,
     fmt: str,
-    copy_mode: bool,
+    copy_mode: bool | None,
     video_bitrate: str,
     audio_bitrate: str,
     preset: str,
     live_from_start: bool,
+    producer_mode: str,
+    extra_outputs: tuple[str, ...],
+    renditions: list[Rendition],
+    session_log: str | None,
+    relay: str | None,
+    stall_timeout: float | None,
+    speed_alert: float,
+    archive_dir: str | None,
+    segment_seconds: float,
+    archive_format: str,
+    retain_hours: float | None,
+    retain_gb: float | None,
+    restart_delay: float,
+    restart_max_delay: float,
+    max_restarts: int,
+    restart_window: float,
+    info_cache: bool,
     verbose: bool,
     poll_interval: float,
+    max_poll_interval: float,
+    probe: bool,
     max_checks: int | None,
+    stream_pool: str,
 ) -> None:
+    from . import youtube_api  # noqa: PLC0415
+
+    archive = _archive_config(archive_dir, segment_seconds, archive_format, retain_hours, retain_gb)
+    broadcasts = youtube_api.LiveBroadcasts(
+        youtube_api.BroadcastManager(youtube_api.default_stream_pool(stream_pool)),
+        privacy_status=privacy,
+        verbose=verbose,
+    )
     try:
-        title = dt.datetime.now().strftime("Archive %Y-%m-%d %H:%M:%S")
-        ingest_url, stream_key = create_stream_and_broadcast(title=title, privacy_status=privacy)
+        # 인증은 시작할 때 확인하고, 방송은 라이브가 감지될 때마다 원본 제목으로 만든다
+        youtube_api.build_service()
+        broadcasts.prewarm()
         watcher.watch_channel_and_restream(
             channel_url=channel_url,
-            stream_key=stream_key,
-            ingest_url=ingest_url,
+            stream_key="",
+            ingest_url="",
             yt_dlp_format=fmt,
             copy_mode=copy_mode,
             video_bitrate=video_bitrate,
@@ -204,8 +758,25 @@ def watch_oauth(
             x264_preset=preset,
             live_from_start=live_from_start,
             verbose=verbose,
+            session_log=session_log,
+            extra_outputs=list(extra_outputs),
+            renditions=renditions,
+            archive=archive,
+            relay=relay,
+            stall_timeout=stall_timeout or None,
+            speed_alert=speed_alert or None,
+            producer_mode=producer_mode,
             poll_interval_seconds=poll_interval,
+            max_poll_interval_seconds=max_poll_interval,
             max_checks=max_checks,
+            probe=probe,
+            restart_policy=_restart_policy(
+                restart_delay, restart_max_delay, max_restarts, restart_window
+            ),
+            info_cache=InfoCache() if info_cache else None,
+            ingest_for=lambda detection: broadcasts.session(
+                youtube_api.broadcast_title(detection.info)
+            ),
         )
     except KeyboardInterrupt:
         click.echo("중단됨")
@@ -214,6 +785,191 @@ def watch_oauth(
             raise
         click.echo(f"오류: {exc}", err=True)
         sys.exit(1)
+    finally:
+        broadcasts.close()
+
+
+@cli.command(
+    name="daemon",
+    help="송출 작업(restream/watch)을 받아 호스트 CPU/대역폭 예산 안에서 실행하는 daemon 을 띄웁니다.",
+)
+@click.option("--host", default="127.0.0.1", show_default=True, help="제어 API 주소")
+@click.option("--port", default=DEFAULT_PORT, show_default=True, help="제어 API 포트")
+@click.option(
+    "--cpu-budget",
+    type=float,
+    default=None,
+    help="동시에 실행하는 작업이 쓸 수 있는 코어 수 (기본: 코어 수의 75%)",
+)
+@click.option(
+    "--bandwidth-mbps", type=float, default=None, help="동시 작업 대역폭 상한 (기본: 제한 없음)"
+)
+@click.option(
+    "--reencode-cores",
+    default=DEFAULT_REENCODE_CORES,
+    show_default=True,
+    help="calibrate 결과가 없을 때 1080p 재인코딩 작업 하나의 예상 코어 수",
+)
+@click.option(
+    "--interval", "poll_interval", default=15.0, show_default=True, help="기본 폴링 간격(초)"
+)
+@click.option(
+    "--max-interval",
+    "max_poll_interval",
+    default=180.0,
+    show_default=True,
+    help="조용한 채널의 최대 폴링 간격(초)",
+)
+@click.option(
+    "--session-log",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="세션 결과(최종 copy/reencode 모드 등)를 JSON Lines 로 덧붙일 파일",
+)
+@click.option(
+    "--token-file",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="제어 API 토큰을 쓸 파일 (기본: ~/.config/youtube_dump/daemon.token, 권한 0600)",
+)
+@click.option("--verbose/--quiet", default=False, show_default=True)
+@_restart_options
+def daemon(
+    host: str,
+    port: int,
+    cpu_budget: float | None,
+    bandwidth_mbps: float | None,
+    reencode_cores: float,
+    poll_interval: float,
+    max_poll_interval: float,
+    session_log: str | None,
+    token_file: Path | None,
+    verbose: bool,
+    restart_delay: float,
+    restart_max_delay: float,
+    max_restarts: int,
+    restart_window: float,
+    info_cache: bool,
+) -> None:
+    token_file = token_file or default_token_path()
+    try:
+        token = write_control_token(token_file)
+    except OSError as exc:
+        click.echo(f"제어 API 토큰 파일을 쓸 수 없습니다({token_file}): {exc}", err=True)
+        sys.exit(1)
+    calibration = presets.Calibration.load()
+    jobs = JobDaemon(
+        cpu_budget=cpu_budget if cpu_budget is not None else default_cpu_budget(calibration),
+        bandwidth_mbps=bandwidth_mbps,
+        calibration=calibration,
+        reencode_cores=reencode_cores,
+        verbose=verbose,
+        session_log=session_log,
+        poll_interval_seconds=poll_interval,
+        max_poll_interval_seconds=max_poll_interval,
+        restart_policy=_restart_policy(
+            restart_delay, restart_max_delay, max_restarts, restart_window
+        ),
+        info_cache=InfoCache() if info_cache else None,
+    )
+    try:
+        server = start_control_server(jobs, port=port, host=host, token=token)
+    except OSError as exc:
+        click.echo(f"제어 API 를 열 수 없습니다({host}:{port}): {exc}", err=True)
+        sys.exit(1)
+    bandwidth = f"{bandwidth_mbps:g}Mbps" if bandwidth_mbps is not None else "대역폭 제한 없음"
+    click.echo(
+        f"daemon: http://{host}:{server.server_address[1]}/jobs "
+        f"(예산 {jobs.cpu_budget:.2f}코어, {bandwidth}, 토큰 {token_file})",
+        err=True,
+    )
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        click.echo("중단됨")
+    finally:
+        server.shutdown()
+        server.server_close()
+        jobs.close()
+        with contextlib.suppress(OSError):
+            token_file.unlink()
+
+
+@cli.group(help="실행 중인 daemon 에 작업을 제출/조회/취소합니다.")
+@click.option("--host", default="127.0.0.1", show_default=True, help="daemon 제어 API 주소")
+@click.option("--port", default=DEFAULT_PORT, show_default=True, help="daemon 제어 API 포트")
+@click.option(
+    "--token-file",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="daemon 이 쓴 제어 API 토큰 파일 (기본: ~/.config/youtube_dump/daemon.token)",
+)
+@click.pass_context
+def job(ctx: click.Context, host: str, port: int, token_file: Path | None) -> None:
+    ctx.obj = {"host": host, "port": port, "token_file": token_file or default_token_path()}
+
+
+def _call_daemon(target: dict, method: str, path: str, payload: dict | None = None) -> dict:
+    try:
+        token = read_control_token(target["token_file"])
+    except OSError as exc:
+        click.echo(f"제어 API 토큰을 읽을 수 없습니다({target['token_file']}): {exc}", err=True)
+        sys.exit(1)
+    try:
+        status, body = call_control_api(
+            method, path, payload, host=target["host"], port=target["port"], token=token
+        )
+    except OSError as exc:
+        click.echo(f"daemon 에 연결할 수 없습니다: {exc}", err=True)
+        sys.exit(1)
+    if status >= HTTPStatus.BAD_REQUEST:
+        click.echo(f"오류: {body.get('error', status)}", err=True)
+        sys.exit(1)
+    return body
+
+
+def _echo_job(item: dict) -> None:
+    line = f"#{item['id']} {item['state']:<10} {item['kind']:<8} "
+    line += f"{item['cores']:.2f}코어 {item['mbps']:.1f}Mbps {item['url']}"
+    if item.get("error"):
+        line += f" ({item['error']})"
+    click.echo(line)
+
+
+@job.command(
+    name="submit",
+    help='작업 JSON(파일 또는 -)을 제출합니다. 예: {"kind": "watch", "url": "...", "stream_key": "..."} '
+    "(나머지 항목은 watch-many 채널 설정과 같음)",
+)
+@click.argument("spec", type=click.File("r", encoding="utf-8"))
+@click.pass_obj
+def job_submit(target: dict, spec) -> None:  # type: ignore[no-untyped-def]
+    try:
+        payload = json.load(spec)
+    except ValueError as exc:
+        click.echo(f"작업 JSON 오류: {exc}", err=True)
+        sys.exit(2)
+    _echo_job(_call_daemon(target, "POST", "/jobs", payload))
+
+
+@job.command(name="list", help="작업 목록과 예산 사용량을 보여 줍니다.")
+@click.pass_obj
+def job_list(target: dict) -> None:
+    body = _call_daemon(target, "GET", "/jobs")
+    budget, used = body["budget"], body["used"]
+    limit = f"{budget['mbps']:g}" if budget["mbps"] is not None else "-"
+    click.echo(
+        f"사용 중: {used['cores']:.2f}/{budget['cores']:.2f}코어, {used['mbps']:.1f}/{limit}Mbps"
+    )
+    for item in body["jobs"]:
+        _echo_job(item)
+
+
+@job.command(name="cancel", help="대기 중인 작업은 취소하고, 실행 중인 작업은 송출을 끝냅니다.")
+@click.argument("job_id")
+@click.pass_obj
+def job_cancel(target: dict, job_id: str) -> None:
+    _echo_job(_call_daemon(target, "DELETE", f"/jobs/{job_id}"))
 
 
 def main() -> None:
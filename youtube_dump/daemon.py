@@ -0,0 +1,511 @@
+from __future__ import annotations
+
+import contextlib
+import hmac
+import itertools
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from . import metrics
+from .infocache import InfoCache
+from .presets import DEFAULT_PRESET, X264_PRESETS, Calibration
+from .streamer import parse_rendition, restream_youtube
+from .supervisor import RestartPolicy
+from .watcher import ChannelConfig, parse_channel_config, watch_channel_and_restream
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+# 한 호스트의 송출 작업(restream/watch)을 한 프로세스에서 받아 CPU/대역폭 예산 안에서만 동시에 돌린다.
+# 작업마다 예상 비용(코어 수, Mbps)을 계산해 남은 예산에 들어가면 바로 시작하고, 아니면 대기열에 두었다가
+# 다른 작업이 끝날 때 제출 순서대로(들어가는 작업은 앞질러) 시작한다. 제어는 localhost HTTP API 로 한다.
+
+DEFAULT_PORT = 8765
+# 제어 API 토큰 파일 경로를 바꾸는 환경변수 (기본: ~/.config/youtube_dump/daemon.token)
+CONTROL_TOKEN_ENV = "YOUTUBE_DUMP_DAEMON_TOKEN_FILE"
+JOB_KINDS = ("restream", "watch")
+JOB_STATES = ("queued", "running", "cancelling", "done", "failed", "cancelled")
+_FINISHED_STATES = ("done", "failed", "cancelled")
+# copy 세션은 디멀티플렉스/먹싱만 하므로 거의 들지 않는다
+COPY_CORES = 0.1
+AUDIO_CORES = 0.05
+# 보정 결과(calibrate)가 없을 때 1080p 재인코딩 세션 하나가 쓰는 코어 수 (veryfast 기준 대략값)
+DEFAULT_REENCODE_CORES = 2.0
+# 송출 작업에 내줄 코어 비율 (preset 자동 선택과 같은 기준)
+DEFAULT_HEADROOM = 0.75
+
+DAEMON_JOBS = metrics.REGISTRY.gauge(
+    "youtube_dump_daemon_jobs", "상태별 daemon 작업 수", ("state",)
+)
+DAEMON_BUDGET_USED = metrics.REGISTRY.gauge(
+    "youtube_dump_daemon_budget_used",
+    "실행 중인 작업이 차지한 예산 (cores: 코어 수, mbps: 대역폭)",
+    ("resource",),
+)
+
+
+@dataclass(frozen=True)
+class JobCost:
+    cores: float
+    mbps: float
+
+
+def default_cpu_budget(calibration: Calibration | None = None) -> float:
+    cpu_count = (calibration.cpu_count if calibration is not None else None) or os.cpu_count() or 1
+    return cpu_count * DEFAULT_HEADROOM
+
+
+def _mbps(bitrate: str) -> float:
+    # ffmpeg 비트레이트 표기 ("3000k", "6M", "128000")
+    text = bitrate.strip().lower()
+    scale = {"k": 1e-3, "m": 1.0}.get(text[-1:], 1e-6)
+    try:
+        return float(text.rstrip("km")) * scale
+    except ValueError:
+        return 0.0
+
+
+def _is_network(output: str) -> bool:
+    return "://" in output and not output.startswith("file:")
+
+
+def _encode_cores(
+    preset: str, height: int | None, calibration: Calibration | None, fallback: float
+) -> float:
+    # auto 는 컨트롤러가 처음 고르는 기본 preset 비용으로 본다
+    name = preset if preset in X264_PRESETS else DEFAULT_PRESET
+    cost = calibration.cost(name, height) if calibration is not None else None
+    if cost is None:
+        scale = min(height, 1080) / 1080 if height else 1.0
+        cost = fallback * scale * scale
+    return cost
+
+
+def estimate_cost(
+    config: ChannelConfig,
+    calibration: Calibration | None = None,
+    reencode_cores: float = DEFAULT_REENCODE_CORES,
+) -> JobCost:
+    # 자동 판별(copy_mode=None)은 재인코딩으로 끝날 수 있으므로 재인코딩 비용으로 본다.
+    # 대역폭은 원본 수신 + 네트워크 출력마다 송신 (파일 출력은 넣지 않는다)
+    video, audio = _mbps(config.video_bitrate), _mbps(config.audio_bitrate)
+    outputs = [*config.extra_outputs]
+    if config.stream_key:
+        outputs.append(config.ingest_url)
+    mbps = (video + audio) * (1 + sum(1 for output in outputs if _is_network(output)))
+    if config.copy_mode:
+        cores = COPY_CORES
+    else:
+        cores = _encode_cores(config.x264_preset, None, calibration, reencode_cores)
+    for rendition in map(parse_rendition, config.renditions):
+        if rendition.audio_only:
+            cores += AUDIO_CORES
+            bits = _mbps(rendition.audio_bitrate or config.audio_bitrate)
+        else:
+            cores += _encode_cores(
+                config.x264_preset, rendition.height, calibration, reencode_cores
+            )
+            bits = _mbps(rendition.video_bitrate or config.video_bitrate) + audio
+        if _is_network(rendition.output):
+            mbps += bits
+    return JobCost(cores=cores, mbps=mbps)
+
+
+@dataclass
+class Job:
+    job_id: str
+    kind: str
+    config: ChannelConfig
+    cost: JobCost
+    state: str = "queued"
+    error: str | None = None
+    submitted_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    stop: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    def to_dict(self) -> dict:
+        # 스트림 키는 응답에 넣지 않는다
+        return {
+            "id": self.job_id,
+            "kind": self.kind,
+            "url": self.config.channel_url,
+            "state": self.state,
+            "cores": round(self.cost.cores, 3),
+            "mbps": round(self.cost.mbps, 3),
+            "error": self.error,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobDaemon:
+    # 작업 하나가 예외로 끝나도 그 작업만 failed 로 남기고 daemon 과 다른 작업은 계속 돈다.
+    # watch 작업은 라이브가 없을 때도 송출 비용을 예약해 둔다 (라이브가 시작되면 바로 송출해야 하므로)
+
+    def __init__(
+        self,
+        cpu_budget: float,
+        bandwidth_mbps: float | None = None,
+        calibration: Calibration | None = None,
+        reencode_cores: float = DEFAULT_REENCODE_CORES,
+        verbose: bool = False,
+        session_log: str | None = None,
+        poll_interval_seconds: float = 15.0,
+        max_poll_interval_seconds: float = 180.0,
+        restart_policy: RestartPolicy | None = None,
+        info_cache: InfoCache | None = None,
+        runners: dict[str, Callable[[Job], object]] | None = None,
+        keep_finished: int = 100,
+    ) -> None:
+        self.cpu_budget = cpu_budget
+        self.bandwidth_mbps = bandwidth_mbps
+        self.calibration = calibration
+        self.reencode_cores = reencode_cores
+        self.verbose = verbose
+        self.session_log = session_log
+        self.poll_interval_seconds = poll_interval_seconds
+        self.max_poll_interval_seconds = max_poll_interval_seconds
+        self.restart_policy = restart_policy
+        self.info_cache = info_cache
+        self.runners = (
+            runners
+            if runners is not None
+            else {"restream": self._run_restream, "watch": self._run_watch}
+        )
+        self.keep_finished = keep_finished
+        self._jobs: dict[str, Job] = {}
+        self._threads: dict[str, threading.Thread] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def submit(self, spec: dict) -> Job:
+        # {"kind": "restream" | "watch", "url": ..., 나머지는 watch-many 채널 설정과 같은 항목}
+        entry = dict(spec)
+        kind = entry.pop("kind", None)
+        if kind not in JOB_KINDS:
+            raise ValueError(f"작업 종류는 {', '.join(JOB_KINDS)} 중 하나여야 합니다: {kind}")
+        if "url" in entry:
+            entry["channel_url"] = entry.pop("url")
+        config = parse_channel_config(entry, "작업")
+        cost = estimate_cost(config, self.calibration, self.reencode_cores)
+        if not self._fits(cost, JobCost(0.0, 0.0)):
+            raise ValueError(
+                f"작업 비용({cost.cores:.2f}코어, {cost.mbps:.1f}Mbps)이 호스트 예산보다 큽니다."
+            )
+        with self._lock:
+            job = Job(job_id=str(next(self._ids)), kind=kind, config=config, cost=cost)
+            self._jobs[job.job_id] = job
+            self._prune()
+        self._admit()
+        return job
+
+    def jobs(self) -> list[Job]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Job | None:
+        # 대기 중이면 바로 취소, 실행 중이면 세션을 끝내도록 알리고 스레드가 끝나면 cancelled
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.state in _FINISHED_STATES:
+                return job
+            if job.state == "queued":
+                job.state = "cancelled"
+                job.finished_at = time.time()
+            else:
+                job.state = "cancelling"
+                job.stop.set()
+        self._update_metrics()
+        return job
+
+    def usage(self) -> JobCost:
+        with self._lock:
+            return self._used()
+
+    def close(self, timeout: float | None = 30.0) -> None:
+        for job in self.jobs():
+            self.cancel(job.job_id)
+        with self._lock:
+            threads = list(self._threads.values())
+        for thread in threads:
+            thread.join(timeout)
+
+    def _used(self) -> JobCost:
+        running = [job for job in self._jobs.values() if job.job_id in self._threads]
+        return JobCost(
+            cores=sum(job.cost.cores for job in running),
+            mbps=sum(job.cost.mbps for job in running),
+        )
+
+    def _fits(self, cost: JobCost, used: JobCost) -> bool:
+        if used.cores + cost.cores > self.cpu_budget + 1e-9:
+            return False
+        return self.bandwidth_mbps is None or used.mbps + cost.mbps <= self.bandwidth_mbps + 1e-9
+
+    def _admit(self) -> None:
+        with self._lock:
+            used = self._used()
+            for job in self._jobs.values():
+                if job.state != "queued" or not self._fits(job.cost, used):
+                    continue
+                job.state = "running"
+                job.started_at = time.time()
+                used = JobCost(used.cores + job.cost.cores, used.mbps + job.cost.mbps)
+                thread = threading.Thread(
+                    target=self._run, args=(job,), name=f"job:{job.job_id}", daemon=True
+                )
+                self._threads[job.job_id] = thread
+                thread.start()
+        self._update_metrics()
+
+    def _run(self, job: Job) -> None:
+        if self.verbose:
+            print(f"작업 시작 #{job.job_id}({job.kind}): {job.config.channel_url}", file=sys.stderr)
+        state, error = "done", None
+        try:
+            self.runners[job.kind](job)
+        except Exception as exc:  # noqa: BLE001
+            # 작업 하나의 실패가 daemon 을 멈추지 않도록 여기서 삼킨다
+            state, error = "failed", str(exc) or type(exc).__name__
+            print(f"작업 실패 #{job.job_id}: {error}", file=sys.stderr)
+        with self._lock:
+            job.state = "cancelled" if job.stop.is_set() else state
+            job.error = error
+            job.finished_at = time.time()
+            self._threads.pop(job.job_id, None)
+        self._admit()
+
+    def _prune(self) -> None:
+        finished = [job for job in self._jobs.values() if job.state in _FINISHED_STATES]
+        for job in finished[: max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[job.job_id]
+
+    def _update_metrics(self) -> None:
+        jobs = self.jobs()
+        for state in JOB_STATES:
+            DAEMON_JOBS.set(sum(1 for job in jobs if job.state == state), state=state)
+        used = self.usage()
+        DAEMON_BUDGET_USED.set(used.cores, resource="cores")
+        DAEMON_BUDGET_USED.set(used.mbps, resource="mbps")
+
+    def _run_restream(self, job: Job) -> None:
+        config = job.config
+        restream_youtube(
+            source_url=config.channel_url,
+            stream_key=config.stream_key,
+            ingest_url=config.ingest_url,
+            yt_dlp_format=config.yt_dlp_format,
+            copy_mode=config.copy_mode,
+            video_bitrate=config.video_bitrate,
+            audio_bitrate=config.audio_bitrate,
+            x264_preset=config.x264_preset,
+            live_from_start=config.live_from_start,
+            verbose=self.verbose,
+            stop_event=job.stop,
+            producer_mode=config.producer_mode,
+            session_log=self.session_log,
+            extra_outputs=config.extra_outputs,
+            archive=config.archive,
+            relay=config.relay,
+            stall_timeout=config.stall_timeout,
+            speed_alert=config.speed_alert,
+            info_cache=self.info_cache,
+            renditions=[parse_rendition(spec) for spec in config.renditions],
+        )
+
+    def _run_watch(self, job: Job) -> None:
+        config = job.config
+        watch_channel_and_restream(
+            channel_url=config.channel_url,
+            stream_key=config.stream_key,
+            ingest_url=config.ingest_url,
+            yt_dlp_format=config.yt_dlp_format,
+            copy_mode=config.copy_mode,
+            video_bitrate=config.video_bitrate,
+            audio_bitrate=config.audio_bitrate,
+            x264_preset=config.x264_preset,
+            live_from_start=config.live_from_start,
+            verbose=self.verbose,
+            poll_interval_seconds=self.poll_interval_seconds,
+            max_poll_interval_seconds=self.max_poll_interval_seconds,
+            producer_mode=config.producer_mode,
+            session_log=self.session_log,
+            extra_outputs=config.extra_outputs,
+            archive=config.archive,
+            relay=config.relay,
+            stall_timeout=config.stall_timeout,
+            speed_alert=config.speed_alert,
+            restart_policy=self.restart_policy,
+            info_cache=self.info_cache,
+            renditions=[parse_rendition(spec) for spec in config.renditions],
+            stop_event=job.stop,
+        )
+
+
+def default_token_path() -> Path:
+    if os.environ.get(CONTROL_TOKEN_ENV):
+        return Path(os.environ[CONTROL_TOKEN_ENV])
+    base = os.environ.get("XDG_CONFIG_HOME") or os.path.join(os.path.expanduser("~"), ".config")
+    return Path(base) / "youtube_dump" / "daemon.token"
+
+
+def write_control_token(path: Path | None = None) -> str:
+    # daemon 을 띄울 때마다 새 토큰을 만들어 소유자만 읽을 수 있는 파일(0600)에 쓴다.
+    # 기존 파일(다른 권한이거나 심볼릭 링크일 수 있음)은 지우고 O_EXCL 로 새로 만든다
+    path = path or default_token_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    token = secrets.token_urlsafe(32)
+    with contextlib.suppress(FileNotFoundError):
+        path.unlink()
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as fp:
+        fp.write(token + "\n")
+    return token
+
+
+def read_control_token(path: Path | None = None) -> str:
+    return (path or default_token_path()).read_text(encoding="utf-8").strip()
+
+
+def start_control_server(
+    daemon: JobDaemon,
+    port: int = DEFAULT_PORT,
+    host: str = "127.0.0.1",
+    token: str | None = None,
+) -> ThreadingHTTPServer:
+    # GET /jobs, POST /jobs, GET /jobs/<id>, DELETE /jobs/<id> (JSON). 종료는 server.shutdown()
+    # 브라우저가 보낸 요청(Origin 헤더)은 거절하고, token 이 있으면 모든 요청에
+    # "Authorization: Bearer <token>" 을 요구한다. POST/DELETE 는 application/json 만 받는다
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # noqa: PLC0415
+
+    expected = f"Bearer {token}".encode() if token is not None else None
+
+    class _Handler(BaseHTTPRequestHandler):
+        def _allowed(self, *, write: bool) -> bool:
+            if "Origin" in self.headers:
+                self._send(HTTPStatus.FORBIDDEN, {"error": "브라우저 요청은 받지 않습니다."})
+                return False
+            given = self.headers.get("Authorization", "").encode("utf-8")
+            if expected is not None and not hmac.compare_digest(given, expected):
+                self._send(HTTPStatus.UNAUTHORIZED, {"error": "제어 API 토큰이 맞지 않습니다."})
+                return False
+            content_type = self.headers.get("Content-Type", "").split(";", 1)[0].strip()
+            if write and content_type.lower() != "application/json":
+                self._send(
+                    HTTPStatus.UNSUPPORTED_MEDIA_TYPE,
+                    {"error": "Content-Type 은 application/json 이어야 합니다."},
+                )
+                return False
+            return True
+
+        def _send(self, status: HTTPStatus, payload: dict) -> None:
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _job_id(self) -> str | None:
+            path = self.path.split("?", 1)[0].rstrip("/")
+            prefix, _, job_id = path.rpartition("/")
+            return job_id if prefix == "/jobs" and job_id else None
+
+        def do_GET(self) -> None:
+            if not self._allowed(write=False):
+                return
+            if self.path.split("?", 1)[0].rstrip("/") == "/jobs":
+                used = daemon.usage()
+                self._send(
+                    HTTPStatus.OK,
+                    {
+                        "jobs": [job.to_dict() for job in daemon.jobs()],
+                        "budget": {"cores": daemon.cpu_budget, "mbps": daemon.bandwidth_mbps},
+                        "used": {"cores": used.cores, "mbps": used.mbps},
+                    },
+                )
+                return
+            job_id = self._job_id()
+            job = daemon.get(job_id) if job_id else None
+            if job is None:
+                self._send(HTTPStatus.NOT_FOUND, {"error": "작업이 없습니다."})
+                return
+            self._send(HTTPStatus.OK, job.to_dict())
+
+        def do_POST(self) -> None:
+            if not self._allowed(write=True):
+                return
+            if self.path.split("?", 1)[0].rstrip("/") != "/jobs":
+                self._send(HTTPStatus.NOT_FOUND, {"error": "작업이 없습니다."})
+                return
+            try:
+                spec = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)))
+                if not isinstance(spec, dict):
+                    raise ValueError("작업은 JSON 객체여야 합니다.")
+                job = daemon.submit(spec)
+            except ValueError as exc:
+                self._send(HTTPStatus.BAD_REQUEST, {"error": str(exc)})
+                return
+            self._send(HTTPStatus.CREATED, job.to_dict())
+
+        def do_DELETE(self) -> None:
+            if not self._allowed(write=True):
+                return
+            job_id = self._job_id()
+            job = daemon.cancel(job_id) if job_id else None
+            if job is None:
+                self._send(HTTPStatus.NOT_FOUND, {"error": "작업이 없습니다."})
+                return
+            self._send(HTTPStatus.OK, job.to_dict())
+
+        def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+            pass
+
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="daemon-api", daemon=True)
+    thread.start()
+    return server
+
+
+def call_control_api(
+    method: str,
+    path: str,
+    payload: dict | None = None,
+    *,
+    port: int = DEFAULT_PORT,
+    host: str = "127.0.0.1",
+    token: str | None = None,
+    timeout: float = 10.0,
+) -> tuple[int, dict]:
+    # job 명령에서 쓰는 클라이언트. 오류 응답도 (상태 코드, 본문) 으로 돌려준다
+    import urllib.error  # noqa: PLC0415
+    import urllib.request  # noqa: PLC0415
+
+    data = json.dumps(payload).encode("utf-8") if payload is not None else None
+    headers = {"Content-Type": "application/json"}
+    if token is not None:
+        headers["Authorization"] = f"Bearer {token}"
+    request = urllib.request.Request(
+        f"http://{host}:{port}{path}", data=data, method=method, headers=headers
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, json.loads(response.read() or b"{}")
+    except urllib.error.HTTPError as exc:
+        return exc.code, json.loads(exc.read() or b"{}")
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import re
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+from . import metrics
+from .producer import url_expiry
+
+# 감지기가 추출한 info dict 를 영상 id 별 JSON 파일로 남겨 두고, 재시작 시 producer(yt-dlp)가
+# --load-info-json 으로 다시 추출하지 않고 바로 받도록 한다. 파일은 yt-dlp 가 읽는 형식 그대로다.
+
+CACHE_DIR_ENV = "YOUTUBE_DUMP_CACHE_DIR"
+# 서명 URL 만료 이만큼 전부터는 쓰지 않는다 (받는 도중 만료되지 않도록)
+DEFAULT_MARGIN_SECONDS = 600.0
+# URL 에 만료 시각이 없으면 저장 후 이 시간까지만 쓴다
+DEFAULT_MAX_AGE_SECONDS = 1800.0
+_VIDEO_ID_RE = re.compile(r"(?:[?&]v=|youtu\.be/|/live/|/shorts/)([\w-]{11})")
+_SAFE_ID_RE = re.compile(r"[\w-]+")
+
+CACHE_LOOKUPS = metrics.REGISTRY.counter(
+    "youtube_dump_info_cache_lookups_total", "info 캐시 조회 결과 (hit, miss, expired)", ("result",)
+)
+
+
+def default_cache_dir() -> Path:
+    if os.environ.get(CACHE_DIR_ENV):
+        return Path(os.environ[CACHE_DIR_ENV])
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "youtube_dump" / "info"
+
+
+def video_id_from_url(url: str) -> str | None:
+    match = _VIDEO_ID_RE.search(url)
+    return match.group(1) if match else None
+
+
+def info_expiry(info: dict) -> float | None:
+    # 포맷 URL/매니페스트 URL 중 가장 먼저 만료되는 시각
+    urls = [info.get("url"), info.get("manifest_url")]
+    for fmt in info.get("formats") or []:
+        urls += [fmt.get("url"), fmt.get("manifest_url")]
+    expiries = [e for e in (url_expiry(u) for u in urls if isinstance(u, str)) if e is not None]
+    return min(expiries) if expiries else None
+
+
+@dataclass
+class CachedInfo:
+    path: Path
+    info: dict
+    expires_at: float
+
+
+class InfoCache:
+    # 여러 watcher 프로세스가 같은 디렉터리를 써도 되도록 쓰기는 임시 파일 + os.replace 로만 하고,
+    # 읽다가 사라지거나 깨진 파일은 없는 것으로 취급한다.
+    # 파일 mtime 을 만료 시각으로 맞춰 두므로 만료 판단과 정리는 stat 만으로 한다.
+
+    def __init__(
+        self,
+        directory: str | os.PathLike | None = None,
+        margin_seconds: float = DEFAULT_MARGIN_SECONDS,
+        max_age_seconds: float = DEFAULT_MAX_AGE_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.directory = Path(directory) if directory is not None else default_cache_dir()
+        self.margin_seconds = margin_seconds
+        self.max_age_seconds = max_age_seconds
+        self._clock = clock
+
+    def path_for(self, video_id: str) -> Path:
+        return self.directory / f"{video_id}.info.json"
+
+    def get(self, video_id: str | None) -> CachedInfo | None:
+        if not video_id or not _SAFE_ID_RE.fullmatch(video_id):
+            return None
+        path = self.path_for(video_id)
+        try:
+            expires_at = path.stat().st_mtime
+            if expires_at <= self._clock():
+                CACHE_LOOKUPS.inc(result="expired")
+                path.unlink()
+                return None
+            info = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            CACHE_LOOKUPS.inc(result="miss")
+            return None
+        if not isinstance(info, dict):
+            CACHE_LOOKUPS.inc(result="miss")
+            return None
+        CACHE_LOOKUPS.inc(result="hit")
+        return CachedInfo(path=path, info=info, expires_at=expires_at)
+
+    def put(self, info: dict) -> Path | None:
+        video_id = info.get("id")
+        now = self._clock()
+        expiry = info_expiry(info)
+        expires_at = expiry - self.margin_seconds if expiry else now + self.max_age_seconds
+        if not video_id or not _SAFE_ID_RE.fullmatch(str(video_id)) or expires_at <= now:
+            return None
+        import yt_dlp  # noqa: PLC0415
+
+        # --write-info-json 과 같은 형태로 저장해야 --load-info-json 이 읽을 수 있다
+        data = json.dumps(yt_dlp.YoutubeDL.sanitize_info(info), ensure_ascii=False)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=f".{video_id}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fp:
+                fp.write(data)
+            os.utime(tmp, (now, expires_at))
+            path = self.path_for(str(video_id))
+            os.replace(tmp, path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp)
+            raise
+        self.prune()
+        return path
+
+    def prune(self) -> int:
+        # 만료된 항목을 지우고 지운 개수를 돌려준다
+        removed = 0
+        now = self._clock()
+        for path in self.directory.glob("*.info.json"):
+            with contextlib.suppress(OSError):
+                if path.stat().st_mtime <= now:
+                    path.unlink()
+                    removed += 1
+        return removed
@@ -0,0 +1,300 @@
+from __future__ import annotations
+
+import json
+import os
+import resource
+import socket
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from . import metrics
+from .progress import FfmpegProgress
+
+# x264 preset 을 호스트 용량에 맞춰 고른다. calibrate 명령이 preset 별로 합성 클립을 인코딩해
+# "실시간 1초당 CPU 초"(= 실시간 인코딩에 필요한 코어 수)를 재서 저장해 두면, 세션을 시작할 때마다
+# 남은 코어를 동시 세션 수로 나눈 몫에 들어가는 가장 느린(화질 좋은) preset 을 쓴다.
+# 실제 세션에서 speed 가 1.0x 아래로 떨어지면 다음 세션(재시작 포함)부터 한 단계씩 빠른 preset 으로,
+# 가장 빠른 preset 으로도 부족하면 해상도를 낮춘다.
+
+AUTO_PRESET = "auto"
+DEFAULT_PRESET = "veryfast"
+# 빠른 것부터. 라이브 재송출에서는 medium 보다 느린 preset 은 지연만 늘어 쓰지 않는다
+X264_PRESETS = ("ultrafast", "superfast", "veryfast", "faster", "fast", "medium")
+# 가장 빠른 preset 으로도 못 따라갈 때 쓰는 최대 높이 (한 단계씩)
+FALLBACK_HEIGHTS = (720, 480)
+CALIBRATION_ENV = "YOUTUBE_DUMP_CALIBRATION"
+
+PRESET_CHOICES = metrics.REGISTRY.counter(
+    "youtube_dump_x264_preset_choices_total", "세션 시작 시 고른 x264 preset", ("preset",)
+)
+
+
+def default_calibration_path() -> Path:
+    if os.environ.get(CALIBRATION_ENV):
+        return Path(os.environ[CALIBRATION_ENV])
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "youtube_dump" / "calibration.json"
+
+
+@dataclass
+class PresetMeasurement:
+    preset: str
+    # 합성 클립 길이 / 인코딩에 걸린 시간 (제한 없이 돌렸을 때 배속)
+    speed: float
+    # 클립 1초를 인코딩하는 데 쓴 CPU 초 (실시간 세션 하나가 차지하는 코어 수)
+    cpu_per_second: float
+
+
+@dataclass
+class Calibration:
+    width: int
+    height: int
+    fps: int
+    video_bitrate: str
+    cpu_count: int
+    presets: dict[str, PresetMeasurement] = field(default_factory=dict)
+    host: str = field(default_factory=socket.gethostname)
+    created_at: float = field(default_factory=time.time)
+
+    def cost(self, preset: str, height: int | None = None) -> float | None:
+        # 실시간 세션 하나에 필요한 코어 수. 높이를 낮추면 픽셀 수에 비례해 줄어든다고 본다
+        measured = self.presets.get(preset)
+        if measured is None:
+            return None
+        scale = min(height, self.height) / self.height if height else 1.0
+        return measured.cpu_per_second * scale * scale
+
+    def save(self, path: str | os.PathLike | None = None) -> Path:
+        target = Path(path) if path is not None else default_calibration_path()
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(json.dumps(asdict(self), indent=2) + "\n", encoding="utf-8")
+        return target
+
+    @classmethod
+    def load(cls, path: str | os.PathLike | None = None) -> Calibration | None:
+        # 없거나 깨진 파일은 보정 없음으로 취급한다
+        source = Path(path) if path is not None else default_calibration_path()
+        try:
+            data = json.loads(source.read_text(encoding="utf-8"))
+            data["presets"] = {
+                name: PresetMeasurement(**item) for name, item in data["presets"].items()
+            }
+            return cls(**data)
+        except (OSError, ValueError, TypeError, KeyError, AttributeError):
+            return None
+
+
+def make_calibration_clip(path: str, seconds: float, width: int, height: int, fps: int) -> None:
+    # 원본 라이브와 비슷하게 H.264/AAC MPEG-TS 로 만든다 (세션처럼 디코딩 비용도 포함되도록)
+    subprocess.run(
+        [
+            "ffmpeg",
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-y",
+            "-f",
+            "lavfi",
+            "-i",
+            f"testsrc2=size={width}x{height}:rate={fps}:duration={seconds}",
+            "-f",
+            "lavfi",
+            "-i",
+            f"sine=frequency=440:sample_rate=48000:duration={seconds}",
+            "-c:v",
+            "libx264",
+            "-preset",
+            "ultrafast",
+            "-crf",
+            "18",
+            "-c:a",
+            "aac",
+            "-f",
+            "mpegts",
+            path,
+        ],
+        check=True,
+    )
+
+
+def measure_preset(clip: str, seconds: float, preset: str, video_bitrate: str) -> PresetMeasurement:
+    # 세션과 같은 인코딩 옵션으로 클립을 제한 없이(-re 없이) 인코딩해 걸린 시간과 CPU 를 잰다
+    cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-i", clip]
+    cmd += ["-c:v", "libx264", "-preset", preset, "-b:v", video_bitrate]
+    cmd += ["-c:a", "aac", "-b:a", "128k", "-f", "null", "-"]
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    started = time.perf_counter()
+    subprocess.run(cmd, check=True)
+    wall = time.perf_counter() - started
+    after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu = after.ru_utime - usage.ru_utime + after.ru_stime - usage.ru_stime
+    return PresetMeasurement(preset=preset, speed=seconds / wall, cpu_per_second=cpu / seconds)
+
+
+def calibrate(
+    presets: tuple[str, ...] = X264_PRESETS,
+    seconds: float = 10.0,
+    width: int = 1920,
+    height: int = 1080,
+    fps: int = 30,
+    video_bitrate: str = "4500k",
+    on_measured: Callable[[PresetMeasurement], None] | None = None,
+) -> Calibration:
+    calibration = Calibration(
+        width=width,
+        height=height,
+        fps=fps,
+        video_bitrate=video_bitrate,
+        cpu_count=os.cpu_count() or 1,
+    )
+    with tempfile.TemporaryDirectory() as workdir:
+        clip = os.path.join(workdir, "calibration.ts")
+        make_calibration_clip(clip, seconds, width, height, fps)
+        for preset in presets:
+            measured = measure_preset(clip, seconds, preset, video_bitrate)
+            calibration.presets[preset] = measured
+            if on_measured is not None:
+                on_measured(measured)
+    return calibration
+
+
+def scale_filter(max_height: int) -> str:
+    # 원본이 더 작으면 그대로 둔다. 폭은 비율 유지(짝수)
+    return f"scale=-2:'min(ih,{max_height})'"
+
+
+@dataclass(frozen=True)
+class PresetChoice:
+    preset: str
+    max_height: int | None = None
+    # 예상 코어 사용량 (보정 결과가 없으면 None)
+    cost: float | None = None
+
+
+class PresetSession:
+    # 세션 하나의 선택과 관측. on_progress 콜백으로 붙여 speed 를 모은다
+
+    def __init__(self, choice: PresetChoice, slow_speed: float) -> None:
+        self.choice = choice
+        self.slow_speed = slow_speed
+        self.speeds: list[float] = []
+        self.slow_seconds = 0.0
+        self.seconds = 0.0
+        self._last: float | None = None
+
+    def __call__(self, record: FfmpegProgress) -> None:
+        if record.speed is None or record.done:
+            return
+        now = record.received_at
+        if self._last is not None:
+            self.seconds += now - self._last
+            if record.speed < self.slow_speed:
+                self.slow_seconds += now - self._last
+        self._last = now
+        self.speeds.append(record.speed)
+
+    @property
+    def median_speed(self) -> float | None:
+        return statistics.median(self.speeds) if self.speeds else None
+
+
+class PresetController:
+    # 보정 결과(preset 별 코어 사용량)와 실제 세션의 speed 로 세션마다 preset 을 고른다.
+    # 한 프로세스의 세션(watch-many 포함)이 같은 컨트롤러를 공유해야 동시 세션 수를 안다.
+
+    def __init__(
+        self,
+        calibration: Calibration | None = None,
+        cpu_count: int | None = None,
+        headroom: float = 0.75,
+        max_preset: str = "medium",
+        slow_speed: float = 0.97,
+        slow_grace_seconds: float = 10.0,
+        promote_after_seconds: float = 600.0,
+        load: Callable[[], float] | None = None,
+    ) -> None:
+        self.calibration = calibration
+        self.cpu_count = (
+            cpu_count or (calibration.cpu_count if calibration else os.cpu_count()) or 1
+        )
+        self.headroom = headroom
+        self.ladder = X264_PRESETS[: X264_PRESETS.index(max_preset) + 1]
+        self.slow_speed = slow_speed
+        self.slow_grace_seconds = slow_grace_seconds
+        self.promote_after_seconds = promote_after_seconds
+        self._load = load if load is not None else _load_average
+        # 보정 선택보다 몇 단계 더 빠르게 갈지 (느린 세션마다 +1, 충분히 건강한 세션마다 -1)
+        self.penalty = 0
+        self._active: list[PresetSession] = []
+        self._lock = threading.Lock()
+
+    def start_session(self, requested: str = AUTO_PRESET) -> PresetSession:
+        with self._lock:
+            session = PresetSession(self._choose(requested), self.slow_speed)
+            self._active.append(session)
+        PRESET_CHOICES.inc(preset=session.choice.preset)
+        return session
+
+    def end_session(self, session: PresetSession, reencoded: bool = True) -> None:
+        with self._lock:
+            if session in self._active:
+                self._active.remove(session)
+            if not reencoded or not session.speeds:
+                return
+            if session.slow_seconds >= self.slow_grace_seconds:
+                self.penalty = min(self.penalty + 1, len(self.ladder) - 1 + len(FALLBACK_HEIGHTS))
+            elif session.seconds >= self.promote_after_seconds and self.penalty > 0:
+                self.penalty -= 1
+
+    def _choose(self, requested: str) -> PresetChoice:
+        # 보정이 없으면 요청한 preset (auto 면 기본값) 에서 penalty 만큼 빠르게
+        base = requested if requested in self.ladder else DEFAULT_PRESET
+        if self.calibration is not None:
+            share = self._share()
+            fitting = [
+                p
+                for p in self.ladder
+                if (cost := self.calibration.cost(p)) is not None and cost <= share
+            ]
+            base = fitting[-1] if fitting else self.ladder[0]
+        index = self.ladder.index(base) - self.penalty
+        max_height = None
+        if index < 0:
+            max_height = FALLBACK_HEIGHTS[min(-index, len(FALLBACK_HEIGHTS)) - 1]
+            index = 0
+        preset = self.ladder[index]
+        cost = self.calibration.cost(preset, max_height) if self.calibration else None
+        return PresetChoice(preset=preset, max_height=max_height, cost=cost)
+
+    def _share(self) -> float:
+        # 이 세션이 쓸 수 있는 코어: (전체 * headroom - 다른 프로세스 부하) / 동시 세션 수
+        ours = sum(s.choice.cost or 0.0 for s in self._active)
+        external = max(0.0, self._load() - ours)
+        budget = self.cpu_count * self.headroom - external
+        return max(0.0, budget) / (len(self._active) + 1)
+
+
+def _load_average() -> float:
+    try:
+        return os.getloadavg()[0]
+    except OSError:
+        return 0.0
+
+
+_shared_lock = threading.Lock()
+_shared: PresetController | None = None
+
+
+def shared_controller() -> PresetController:
+    # x264_preset="auto" 세션이 함께 쓰는 프로세스 전역 컨트롤러 (보정 파일은 처음 한 번 읽는다)
+    global _shared  # noqa: PLW0603
+    with _shared_lock:
+        if _shared is None:
+            _shared = PresetController(Calibration.load())
+        return _shared
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import re
+import threading
+from dataclasses import dataclass
+from http import HTTPStatus
+
+PROBE_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/124.0 Safari/537.36"
+    ),
+    "Accept-Language": "en-US,en;q=0.8",
+    # EU 동의 페이지로 리다이렉트되지 않도록
+    "Cookie": "SOCS=CAI; CONSENT=YES+",
+}
+
+_CANONICAL_RE = re.compile(rb'<link\s+rel="canonical"\s+href="([^"]+)"')
+_WATCH_ID_RE = re.compile(r"[?&]v=([\w-]{11})")
+_LIVE_NOW_RE = re.compile(rb'"isLiveNow"\s*:\s*true')
+_UPCOMING_RE = re.compile(rb'"isUpcoming"\s*:\s*true')
+
+OFFLINE = "offline"
+LIVE = "live"
+UPCOMING = "upcoming"
+UNKNOWN = "unknown"
+
+
+@dataclass
+class ProbeResult:
+    status: str
+    video_id: str | None = None
+    not_modified: bool = False
+
+    @property
+    def live_likely(self) -> bool:
+        # 판단이 애매하면 전체 추출로 넘긴다 (오탐보다 미탐이 비싸다)
+        return self.status != OFFLINE
+
+
+@dataclass
+class ProbeStats:
+    probes: int = 0
+    offline: int = 0
+    not_modified: int = 0
+    errors: int = 0
+
+
+@dataclass
+class _Validator:
+    etag: str | None
+    last_modified: str | None
+    result: ProbeResult
+
+
+class LiveProbe:
+    # 채널 /live 페이지를 조건부 GET 으로 가져와 canonical 링크와 라이브 표식만 본다.
+    # 오프라인 채널의 /live 는 채널 페이지를 canonical 로 가리키므로 head 부분만 읽고 끝난다.
+
+    def __init__(
+        self,
+        timeout: float = 10.0,
+        max_bytes: int = 2 * 1024 * 1024,
+        chunk_size: int = 64 * 1024,
+    ) -> None:
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.stats = ProbeStats()
+        self._validators: dict[str, _Validator] = {}
+        self._lock = threading.Lock()
+
+    def probe(self, live_url: str) -> ProbeResult:
+        # urllib.request 는 ssl/http.client/email 까지 끌고 와서 실제로 폴링할 때 불러온다
+        import urllib.error  # noqa: PLC0415
+        import urllib.request  # noqa: PLC0415
+
+        headers = dict(PROBE_HEADERS)
+        with self._lock:
+            self.stats.probes += 1
+            cached = self._validators.get(live_url)
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        request = urllib.request.Request(live_url, headers=headers)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as resp:
+                result = self._parse(resp)
+                etag = resp.headers.get("ETag")
+                last_modified = resp.headers.get("Last-Modified")
+        except urllib.error.HTTPError as exc:
+            if exc.code == HTTPStatus.NOT_MODIFIED and cached is not None:
+                with self._lock:
+                    self.stats.not_modified += 1
+                    if not cached.result.live_likely:
+                        self.stats.offline += 1
+                return ProbeResult(cached.result.status, cached.result.video_id, True)
+            with self._lock:
+                self.stats.errors += 1
+            return ProbeResult(UNKNOWN)
+        except Exception:
+            with self._lock:
+                self.stats.errors += 1
+            return ProbeResult(UNKNOWN)
+
+        with self._lock:
+            if etag or last_modified:
+                self._validators[live_url] = _Validator(etag, last_modified, result)
+            else:
+                self._validators.pop(live_url, None)
+            if not result.live_likely:
+                self.stats.offline += 1
+        return result
+
+    def _parse(self, resp) -> ProbeResult:  # type: ignore[no-untyped-def]
+        buf = bytearray()
+        canonical: str | None = None
+        while len(buf) < self.max_bytes:
+            chunk = resp.read(self.chunk_size)
+            if not chunk:
+                break
+            buf += chunk
+            if canonical is None:
+                match = _CANONICAL_RE.search(buf)
+                if match:
+                    canonical = match.group(1).decode("utf-8", "replace").replace("&amp;", "&")
+                    if "/watch" not in canonical:
+                        return ProbeResult(OFFLINE)
+            if canonical is not None:
+                if _LIVE_NOW_RE.search(buf):
+                    return ProbeResult(LIVE, _video_id(canonical))
+                if _UPCOMING_RE.search(buf):
+                    return ProbeResult(UPCOMING, _video_id(canonical))
+
+        if canonical is None:
+            return ProbeResult(UNKNOWN)
+        # watch 페이지지만 표식을 못 찾음: 라이브일 수 있으므로 전체 추출 대상
+        return ProbeResult(LIVE, _video_id(canonical))
+
+
+def _video_id(canonical: str) -> str | None:
+    match = _WATCH_ID_RE.search(canonical)
+    return match.group(1) if match else None
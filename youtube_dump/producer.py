@@ -0,0 +1,353 @@
+from __future__ import annotations
+
+import contextlib
+import copy
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from urllib.parse import urljoin
+
+HLS_PROTOCOLS = ("m3u8", "m3u8_native")
+HTTP_PROTOCOLS = ("http", "https")
+CHUNK_SIZE = 64 * 1024
+# 라이브 HLS 를 처음 받을 때 라이브 엣지에서 이만큼의 세그먼트 앞부터 시작
+LIVE_EDGE_SEGMENTS = 3
+# 세그먼트/플레이리스트 하나를 받다 실패하면 다시 받는 횟수 (yt-dlp fragment_retries 기본값과 같음)
+FRAGMENT_RETRIES = 10
+FRAGMENT_RETRY_MAX_DELAY = 5.0
+
+
+class UnsupportedSourceError(RuntimeError):
+    pass
+
+
+@dataclass
+class HlsPlaylist:
+    media_sequence: int = 0
+    target_duration: float = 6.0
+    segments: list[tuple[int, str]] = field(default_factory=list)
+    init_url: str | None = None
+    endlist: bool = False
+    variants: list[tuple[int, str]] = field(default_factory=list)
+
+
+def parse_m3u8(text: str, base_url: str) -> HlsPlaylist:  # noqa: PLR0912
+    playlist = HlsPlaylist()
+    sequence: int | None = None
+    bandwidth: int | None = None
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+        if line.startswith("#EXT-X-MEDIA-SEQUENCE:"):
+            playlist.media_sequence = int(line.split(":", 1)[1])
+        elif line.startswith("#EXT-X-TARGETDURATION:"):
+            playlist.target_duration = float(line.split(":", 1)[1])
+        elif line.startswith("#EXT-X-ENDLIST"):
+            playlist.endlist = True
+        elif line.startswith("#EXT-X-MAP:"):
+            for attr in line.split(":", 1)[1].split(","):
+                if attr.startswith("URI="):
+                    playlist.init_url = urljoin(base_url, attr[4:].strip('"'))
+        elif line.startswith("#EXT-X-STREAM-INF:"):
+            bandwidth = 0
+            for attr in line.split(":", 1)[1].split(","):
+                if attr.startswith("BANDWIDTH="):
+                    bandwidth = int(attr[10:])
+        elif line.startswith("#"):
+            continue
+        elif bandwidth is not None:
+            playlist.variants.append((bandwidth, urljoin(base_url, line)))
+            bandwidth = None
+        else:
+            if sequence is None:
+                sequence = playlist.media_sequence
+            playlist.segments.append((sequence, urljoin(base_url, line)))
+            sequence += 1
+    return playlist
+
+
+def select_formats(info: dict, ydl) -> list[dict]:  # type: ignore[no-untyped-def]
+    # 감지 단계에서 추출한 info dict 에 ydl 의 "format" 표현식을 다시 적용한다 (네트워크 없음).
+    # 포맷 선택은 yt-dlp 의 process_ie_result 가 하고, info 는 고치지 않도록 복사해서 넘긴다
+    from yt_dlp.utils import ExtractorError  # noqa: PLC0415
+
+    if not info.get("formats"):
+        return [info] if info.get("url") else []
+    try:
+        chosen = ydl.process_ie_result(copy.deepcopy(info), download=False)
+    except ExtractorError:
+        # 요청한 포맷이 없음
+        return []
+    return list(chosen.get("requested_formats") or [chosen])
+
+
+class InProcessProducer:
+    # 별도 yt-dlp 인터프리터 없이 이 프로세스에서 포맷 URL 을 받아 파이프에 쓴다.
+    # 포맷 하나당 스레드 하나, 파이프 하나. Popen 과 같은 poll/wait/terminate/kill 을 제공해
+    # ProcessPair 에 그대로 넣을 수 있다.
+
+    def __init__(
+        self,
+        formats: list[dict],
+        ydl=None,  # type: ignore[no-untyped-def]
+        live_from_start: bool = False,
+        verbose: bool = False,
+    ) -> None:
+        if not formats:
+            raise UnsupportedSourceError("선택된 포맷이 없습니다.")
+        for fmt in formats:
+            protocol = fmt.get("protocol") or "https"
+            if protocol not in HLS_PROTOCOLS + HTTP_PROTOCOLS:
+                raise UnsupportedSourceError(
+                    f"in-process 모드가 지원하지 않는 프로토콜: {protocol}"
+                )
+        self.formats = formats
+        self.live_from_start = live_from_start
+        self.verbose = verbose
+        self.returncode: int | None = None
+        self.bytes_written = 0
+        self._ydl = ydl
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._threads: list[threading.Thread] = []
+        self._errors: list[BaseException] = []
+        self.read_fds: list[int] = []
+
+    def start(self) -> list[int]:
+        if self._ydl is None:
+            import yt_dlp  # noqa: PLC0415
+
+            self._ydl = yt_dlp.YoutubeDL({"quiet": True, "nocheckcertificate": True})
+        for fmt in self.formats:
+            read_fd, write_fd = os.pipe()
+            self.read_fds.append(read_fd)
+            thread = threading.Thread(
+                target=self._pump, args=(fmt, write_fd), name="producer", daemon=True
+            )
+            self._threads.append(thread)
+            thread.start()
+        return list(self.read_fds)
+
+    # Popen 호환 인터페이스
+
+    def poll(self) -> int | None:
+        if any(t.is_alive() for t in self._threads):
+            return None
+        if self.returncode is None:
+            self.returncode = 1 if self._errors else 0
+        return self.returncode
+
+    def wait(self, timeout: float | None = None) -> int:
+        # Popen.wait 처럼 제한 시간 안에 끝나지 않으면 TimeoutExpired 를 던진다 (멈춤과 실패를 구분)
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        for thread in self._threads:
+            thread.join(max(deadline - time.monotonic(), 0) if deadline is not None else None)
+        rc = self.poll()
+        if rc is None:
+            raise subprocess.TimeoutExpired("in-process producer", timeout or 0)
+        return rc
+
+    def terminate(self) -> None:
+        self._stop.set()
+        # 쓰기 중 블록된 스레드가 EPIPE 로 깨어나도록 읽기 끝을 닫는다
+        self.close_read_fds()
+
+    def kill(self) -> None:
+        self.terminate()
+
+    def close_read_fds(self) -> None:
+        fds, self.read_fds = self.read_fds, []
+        for fd in fds:
+            with contextlib.suppress(OSError):
+                os.close(fd)
+
+    def _pump(self, fmt: dict, write_fd: int) -> None:
+        try:
+            with os.fdopen(write_fd, "wb", buffering=0) as out:
+                if (fmt.get("protocol") or "https") in HLS_PROTOCOLS:
+                    self._pump_hls(fmt, out)
+                else:
+                    self._pump_http(fmt["url"], fmt, out)
+        except (BrokenPipeError, ValueError, OSError) as exc:
+            if not self._stop.is_set():
+                self._errors.append(exc)
+        except Exception as exc:
+            self._errors.append(exc)
+            if self.verbose:
+                print(f"producer 오류: {exc}", file=sys.stderr)
+
+    def _open(self, url: str, fmt: dict):  # type: ignore[no-untyped-def]
+        from yt_dlp.networking import Request  # noqa: PLC0415
+
+        return self._ydl.urlopen(Request(url, headers=fmt.get("http_headers") or {}))
+
+    def _write(self, out, data: bytes) -> None:  # type: ignore[no-untyped-def]
+        view = memoryview(data)
+        while view:
+            written = out.write(view)
+            view = view[written:]
+        with self._lock:
+            self.bytes_written += len(data)
+
+    def _pump_http(self, url: str, fmt: dict, out) -> None:  # type: ignore[no-untyped-def]
+        resp = self._open(url, fmt)
+        try:
+            while not self._stop.is_set():
+                chunk = resp.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                self._write(out, chunk)
+        finally:
+            resp.close()
+
+    def _read(self, url: str, fmt: dict) -> tuple[bytes | None, Exception | None]:
+        try:
+            resp = self._open(url, fmt)
+            try:
+                return resp.read(), None
+            finally:
+                resp.close()
+        except Exception as exc:
+            return None, exc
+
+    def _read_retrying(self, url: str, fmt: dict) -> bytes | None:
+        # 조각 하나의 일시적인 HTTP 오류로 송출 전체가 끝나지 않도록 몇 번 다시 받는다.
+        # 조각은 다 받은 뒤에 한 번에 쓰므로 재시도해도 출력이 중복되지 않는다. 중단되면 None
+        delay = 0.5
+        for attempt in range(FRAGMENT_RETRIES + 1):
+            data, error = self._read(url, fmt)
+            if error is None:
+                return data
+            if attempt == FRAGMENT_RETRIES:
+                raise error
+            if self.verbose:
+                print(
+                    f"조각 받기 실패({attempt + 1}/{FRAGMENT_RETRIES}), 재시도: {error}",
+                    file=sys.stderr,
+                )
+            if self._stop.wait(delay):
+                return None
+            delay = min(delay * 2, FRAGMENT_RETRY_MAX_DELAY)
+        return None
+
+    def _fetch_playlist(self, url: str, fmt: dict) -> HlsPlaylist | None:
+        data = self._read_retrying(url, fmt)
+        if data is None:
+            return None
+        return parse_m3u8(data.decode("utf-8", "replace"), url)
+
+    def _write_segment(self, url: str, fmt: dict, out) -> bool:  # type: ignore[no-untyped-def]
+        data = self._read_retrying(url, fmt)
+        if data is None:
+            return False
+        self._write(out, data)
+        return True
+
+    def _pump_hls(self, fmt: dict, out) -> None:  # type: ignore[no-untyped-def]
+        url = fmt["url"]
+        playlist = self._fetch_playlist(url, fmt)
+        if playlist is not None and playlist.variants:
+            url = max(playlist.variants)[1]
+            playlist = self._fetch_playlist(url, fmt)
+
+        last_sequence: int | None = None
+        init_written: str | None = None
+        while playlist is not None and not self._stop.is_set():
+            segments = playlist.segments
+            if last_sequence is None and not playlist.endlist and not self.live_from_start:
+                segments = segments[-LIVE_EDGE_SEGMENTS:]
+            if playlist.init_url and playlist.init_url != init_written:
+                if not self._write_segment(playlist.init_url, fmt, out):
+                    return
+                init_written = playlist.init_url
+            for sequence, segment_url in segments:
+                if last_sequence is not None and sequence <= last_sequence:
+                    continue
+                if self._stop.is_set() or not self._write_segment(segment_url, fmt, out):
+                    return
+                last_sequence = sequence
+            if playlist.endlist:
+                return
+            if self._stop.wait(max(playlist.target_duration / 2, 0.5)):
+                return
+            playlist = self._fetch_playlist(url, fmt)
+
+
+def start_inprocess_producer(
+    source_url: str,
+    yt_dlp_format: str,
+    live_from_start: bool,
+    verbose: bool,
+    info: dict | None = None,
+) -> InProcessProducer:
+    import yt_dlp  # noqa: PLC0415
+
+    ydl = yt_dlp.YoutubeDL({
+        "quiet": not verbose,
+        "nocheckcertificate": True,
+        "format": yt_dlp_format,
+    })
+    if info is None:
+        # 감지 결과가 없으면 여기서 한 번만 추출 (인터프리터를 새로 띄우지 않는다)
+        info = ydl.extract_info(source_url, download=False)
+    if not isinstance(info, dict):
+        raise UnsupportedSourceError("info dict 를 얻지 못했습니다.")
+    producer = InProcessProducer(
+        select_formats(info, ydl),
+        ydl=ydl,
+        live_from_start=live_from_start,
+        verbose=verbose,
+    )
+    producer.start()
+    return producer
+
+
+DIRECT_PROTOCOLS = HLS_PROTOCOLS + HTTP_PROTOCOLS
+_EXPIRE_RE = re.compile(r"(?:/expire/|[?&]expire=)(\d+)")
+
+
+def url_expiry(url: str) -> float | None:
+    # googlevideo 서명 URL 의 만료 시각(epoch 초). 없으면 None
+    match = _EXPIRE_RE.search(url)
+    return float(match.group(1)) if match else None
+
+
+def extract_formats(
+    source_url: str,
+    yt_dlp_format: str,
+    verbose: bool,
+    info: dict | None = None,
+) -> tuple[dict, list[dict]]:
+    # info 가 없으면 추출하고, 지정한 포맷 표현식으로 고른 포맷 목록을 돌려준다
+    import yt_dlp  # noqa: PLC0415
+
+    params = {"quiet": not verbose, "nocheckcertificate": True, "format": yt_dlp_format}
+    with yt_dlp.YoutubeDL(params) as ydl:
+        if info is None:
+            info = ydl.extract_info(source_url, download=False)
+        if not isinstance(info, dict):
+            raise UnsupportedSourceError("info dict 를 얻지 못했습니다.")
+        formats = select_formats(info, ydl)
+    if not formats:
+        raise UnsupportedSourceError("선택된 포맷이 없습니다.")
+    return info, formats
+
+
+def resolve_formats(
+    source_url: str,
+    yt_dlp_format: str,
+    verbose: bool,
+    info: dict | None = None,
+) -> tuple[dict, list[dict]]:
+    # ffmpeg 에 직접 넘길 수 있는 포맷 URL 을 얻는다
+    info, formats = extract_formats(source_url, yt_dlp_format, verbose, info)
+    for fmt in formats:
+        protocol = fmt.get("protocol") or "https"
+        if protocol not in DIRECT_PROTOCOLS:
+            raise UnsupportedSourceError(f"direct 모드가 지원하지 않는 프로토콜: {protocol}")
+    return info, formats
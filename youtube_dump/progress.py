@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import contextlib
+import os
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+
+# ffmpeg -progress 는 key=value 줄을 모아 progress=continue|end 줄로 한 블록을 끝낸다
+
+# -re 로 라이브를 받으면 정상이어도 speed 가 1.0x 근처나 살짝 아래에서 오르내리므로 여유를 둔다
+DEFAULT_SPEED_ALERT = 0.95
+
+
+@dataclass
+class FfmpegProgress:
+    frame: int | None = None
+    fps: float | None = None
+    bitrate_kbps: float | None = None
+    total_size: int | None = None
+    out_time_us: int | None = None
+    dup_frames: int = 0
+    drop_frames: int = 0
+    speed: float | None = None
+    done: bool = False
+    received_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def out_time(self) -> float | None:
+        return self.out_time_us / 1e6 if self.out_time_us is not None else None
+
+    @classmethod
+    def from_fields(cls, fields: dict[str, str]) -> FfmpegProgress:
+        return cls(
+            frame=_number(fields.get("frame"), int),
+            fps=_number(fields.get("fps"), float),
+            bitrate_kbps=_number(fields.get("bitrate", "").removesuffix("kbits/s"), float),
+            total_size=_number(fields.get("total_size"), int),
+            # 오래된 ffmpeg 는 out_time_ms 에도 마이크로초를 쓴다
+            out_time_us=_number(fields.get("out_time_us") or fields.get("out_time_ms"), int),
+            dup_frames=_number(fields.get("dup_frames"), int) or 0,
+            drop_frames=_number(fields.get("drop_frames"), int) or 0,
+            speed=_number(fields.get("speed", "").removesuffix("x"), float),
+            done=fields.get("progress") == "end",
+        )
+
+
+def _number(value: str | None, kind: type) -> int | float | None:  # type: ignore[type-arg]
+    if value is None:
+        return None
+    try:
+        return kind(value.strip())
+    except ValueError:
+        # "N/A" 등
+        return None
+
+
+def parse_progress(lines: Iterable[str | bytes]) -> Iterator[FfmpegProgress]:
+    fields: dict[str, str] = {}
+    for raw in lines:
+        line = (raw.decode("utf-8", "replace") if isinstance(raw, bytes) else raw).strip()
+        key, sep, value = line.partition("=")
+        if not sep:
+            continue
+        fields[key] = value
+        if key == "progress":
+            yield FfmpegProgress.from_fields(fields)
+            fields = {}
+
+
+class ProgressReader:
+    # -progress pipe:N 의 읽기 끝을 스레드에서 파싱해 레코드마다 콜백을 부른다.
+    # 콜백 예외는 읽기를 멈추지 않는다 (ffmpeg 가 진행 파이프에 막히면 안 된다)
+
+    def __init__(
+        self,
+        read_fd: int,
+        callbacks: list[Callable[[FfmpegProgress], None]] | None = None,
+    ) -> None:
+        self.callbacks = list(callbacks or [])
+        self.latest: FfmpegProgress | None = None
+        self.records = 0
+        self._read_fd = read_fd
+        self._thread = threading.Thread(target=self._run, name="ffmpeg-progress", daemon=True)
+        self._thread.start()
+
+    def join(self, timeout: float | None = 2.0) -> None:
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        with contextlib.suppress(OSError), os.fdopen(self._read_fd, "rb") as stream:
+            for record in parse_progress(stream):
+                self.latest = record
+                self.records += 1
+                for callback in self.callbacks:
+                    self._call(callback, record)
+
+    @staticmethod
+    def _call(callback: Callable[[FfmpegProgress], None], record: FfmpegProgress) -> None:
+        try:
+            callback(record)
+        except Exception as exc:
+            print(f"progress 콜백 오류: {exc}", file=sys.stderr)
+
+
+class SpeedAlarm:
+    # 인코딩 speed 가 threshold 미만으로 grace_seconds 넘게 이어지면 한 번 경고한다.
+    # 1.0x 미만이 계속되면 실시간을 못 따라가는 것(호스트 과부하)이다.
+
+    def __init__(
+        self,
+        threshold: float = DEFAULT_SPEED_ALERT,
+        grace_seconds: float = 10.0,
+        on_alert: Callable[[FfmpegProgress], None] | None = None,
+    ) -> None:
+        self.threshold = threshold
+        self.grace_seconds = grace_seconds
+        self.on_alert = on_alert
+        self.min_speed: float | None = None
+        self.slow_seconds = 0.0
+        self.alerts = 0
+        self._slow_since: float | None = None
+        self._last: float | None = None
+        self._alerted = False
+
+    def __call__(self, record: FfmpegProgress) -> None:
+        if record.speed is None or record.done:
+            return
+        now = record.received_at
+        if self.min_speed is None or record.speed < self.min_speed:
+            self.min_speed = record.speed
+        if record.speed >= self.threshold:
+            self._slow_since = self._last = None
+            self._alerted = False
+            return
+        if self._slow_since is None:
+            self._slow_since = now
+        else:
+            self.slow_seconds += now - (self._last or now)
+        self._last = now
+        if not self._alerted and now - self._slow_since >= self.grace_seconds:
+            self._alerted = True
+            self.alerts += 1
+            if self.on_alert is not None:
+                self.on_alert(record)
+
+    def summary(self) -> dict:
+        return {
+            "min_speed": self.min_speed,
+            "slow_seconds": round(self.slow_seconds, 3),
+            "alerts": self.alerts,
+        }
@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+import contextlib
+import errno
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass
+
+DEFAULT_CAPACITY = 8 * 1024 * 1024
+DEFAULT_CHUNK_SIZE = 256 * 1024
+# ring: 링 버퍼 + 읽기/쓰기 스레드 (대기 시간을 양쪽으로 나눠 잰다)
+# splice: 커널 안에서 파이프 간 이동 (사용자 공간 복사 없음, 리눅스 전용)
+# copy: 재사용 버퍼 하나로 readv/write (splice 를 쓸 수 없을 때)
+RELAY_BACKENDS = ("ring", "splice", "copy")
+SPLICE_AVAILABLE = hasattr(os, "splice")
+
+
+@dataclass
+class RelayStats:
+    bytes_in: int = 0
+    bytes_out: int = 0
+    fill: int = 0
+    capacity: int = 0
+    elapsed: float = 0.0
+    # 읽기/쓰기 시스템 콜에서 블록된 시간: 원본(yt-dlp)이 느린지, 소비자(ffmpeg)가 느린지
+    read_blocked: float = 0.0
+    write_blocked: float = 0.0
+    # 버퍼가 가득 차 원본 읽기를 멈춘 시간 (인제스트 쪽 back-pressure)
+    full_wait: float = 0.0
+    # 버퍼가 비어 쓰기를 멈춘 시간 (원본 다운로드 지연)
+    empty_wait: float = 0.0
+    # replace_source 로 원본을 바꿔 이어 읽은 횟수
+    source_switches: int = 0
+
+    @property
+    def rate_in(self) -> float:
+        return self.bytes_in / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def rate_out(self) -> float:
+        return self.bytes_out / self.elapsed if self.elapsed > 0 else 0.0
+
+    def describe(self) -> str:
+        return (
+            f"in {self.rate_in * 8 / 1e6:.2f} Mbps, out {self.rate_out * 8 / 1e6:.2f} Mbps, "
+            f"버퍼 {self.fill * 100 // max(self.capacity, 1)}%, "
+            f"원본 대기 {self.read_blocked + self.empty_wait:.1f}s, "
+            f"소비자 대기 {self.write_blocked + self.full_wait:.1f}s"
+        )
+
+
+def forward(
+    src_fd: int,
+    dst_fd: int,
+    stats: RelayStats | None = None,
+    backend: str = "splice",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> int:
+    # 현재 스레드에서 src 가 EOF 가 될 때까지 옮기고 옮긴 바이트 수를 돌려준다
+    stats = stats if stats is not None else RelayStats()
+    if backend == "splice" and SPLICE_AVAILABLE:
+        try:
+            return _forward_splice(src_fd, dst_fd, stats, chunk_size)
+        except OSError as exc:
+            # 양쪽 다 파이프가 아니면 EINVAL: 첫 호출에서 실패하므로 옮긴 바이트는 없다
+            if exc.errno != errno.EINVAL or stats.bytes_out:
+                raise
+    return _forward_copy(src_fd, dst_fd, stats, chunk_size)
+
+
+def _forward_splice(src_fd: int, dst_fd: int, stats: RelayStats, chunk_size: int) -> int:
+    # splice 는 원본/소비자 어느 쪽에서 블록됐는지 구분할 수 없어 대기 시간은 기록하지 않는다
+    total = 0
+    while moved := os.splice(src_fd, dst_fd, chunk_size):
+        total += moved
+        stats.bytes_in += moved
+        stats.bytes_out += moved
+    return total
+
+
+def _forward_copy(src_fd: int, dst_fd: int, stats: RelayStats, chunk_size: int) -> int:
+    buf = bytearray(chunk_size)
+    view = memoryview(buf)
+    total = 0
+    while True:
+        started = time.monotonic()
+        got = os.readv(src_fd, [buf])
+        stats.read_blocked += time.monotonic() - started
+        if not got:
+            return total
+        stats.bytes_in += got
+        started = time.monotonic()
+        offset = 0
+        while offset < got:
+            offset += os.write(dst_fd, view[offset:got])
+        stats.write_blocked += time.monotonic() - started
+        stats.bytes_out += got
+        total += got
+
+
+class Relay:
+    # producer 의 출력 fd 와 ffmpeg 의 stdin 사이에서 바이트를 옮기며 처리량과 대기 시간을 잰다.
+    # ring 백엔드의 버퍼는 처음에 한 번 할당한 ring buffer 하나를 memoryview 로 잘라 쓰므로
+    # 청크마다 할당이 없다. 읽기 스레드는 빈 구간에 readv 로 채우고, 쓰기 스레드는 찬 구간을
+    # write 로 내보낸다. splice/copy 백엔드는 스레드 하나에서 forward() 로 옮긴다.
+
+    def __init__(
+        self,
+        src_fd: int,
+        dst_fd: int,
+        capacity: int = DEFAULT_CAPACITY,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        report_interval: float | None = None,
+        backend: str = "ring",
+    ) -> None:
+        if backend not in RELAY_BACKENDS:
+            raise ValueError(f"알 수 없는 relay 백엔드: {backend}")
+        self.backend = backend
+        self.src_fd = src_fd
+        self.dst_fd = dst_fd
+        self.capacity = capacity
+        self.chunk_size = min(chunk_size, capacity)
+        self.report_interval = report_interval
+        self._buf = bytearray(capacity if backend == "ring" else 0)
+        self._view = memoryview(self._buf)
+        self._head = 0
+        self._size = 0
+        self._eof = False
+        self._closed = False
+        self._next_src: int | None = None
+        self._cond = threading.Condition()
+        self._stats = RelayStats(capacity=capacity if backend == "ring" else 0)
+        self._started = 0.0
+        self._threads: list[threading.Thread] = []
+
+    def start(self) -> Relay:
+        self._started = time.monotonic()
+        targets = [self._fill, self._drain] if self.backend == "ring" else [self._forward]
+        if self.report_interval:
+            targets.append(self._report)
+        for target in targets:
+            thread = threading.Thread(target=target, name=f"relay{target.__name__}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+        return self
+
+    def close(self) -> None:
+        # 대기 중인 스레드를 깨운다. 읽기 시스템 콜에서 블록된 스레드는 원본이 끝나야 빠져나온다
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def replace_source(self, src_fd: int) -> None:
+        # 현재 원본이 EOF 가 되면 이 fd 에서 이어 읽는다. 소비자 쪽 파이프는 그대로 유지되므로
+        # ffmpeg 는 끊기지 않는다. 반드시 기존 원본을 종료하기 전에 호출한다
+        with self._cond:
+            self._next_src = src_fd
+
+    def _switch_source(self) -> bool:
+        # self._cond 를 잡은 상태에서 호출
+        if self._next_src is None:
+            return False
+        self.src_fd, self._next_src = self._next_src, None
+        self._stats.source_switches += 1
+        return True
+
+    def join(self, timeout: float | None = None) -> None:
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def snapshot(self) -> RelayStats:
+        with self._cond:
+            stats = RelayStats(**vars(self._stats))
+            stats.fill = self._size
+        stats.elapsed = time.monotonic() - self._started if self._started else 0.0
+        return stats
+
+    def _fill(self) -> None:
+        view, capacity, stats = self._view, self.capacity, self._stats
+        try:
+            while True:
+                with self._cond:
+                    if self._size == capacity and not self._closed:
+                        waited = time.monotonic()
+                        while self._size == capacity and not self._closed:
+                            self._cond.wait()
+                        stats.full_wait += time.monotonic() - waited
+                    if self._closed:
+                        return
+                    tail = (self._head + self._size) % capacity
+                    n = min(self.chunk_size, capacity - self._size, capacity - tail)
+                started = time.monotonic()
+                try:
+                    got = os.readv(self.src_fd, [view[tail : tail + n]])
+                except OSError:
+                    # 원본 쪽 오류는 EOF 와 같이 취급 (교체할 원본이 있으면 이어 읽는다)
+                    got = 0
+                elapsed = time.monotonic() - started
+                with self._cond:
+                    stats.read_blocked += elapsed
+                    if not got:
+                        if self._switch_source():
+                            continue
+                        return
+                    self._size += got
+                    stats.bytes_in += got
+                    self._cond.notify_all()
+        finally:
+            with self._cond:
+                self._eof = True
+                self._cond.notify_all()
+
+    def _drain(self) -> None:
+        view, capacity, stats = self._view, self.capacity, self._stats
+        try:
+            while True:
+                with self._cond:
+                    if self._size == 0 and not (self._eof or self._closed):
+                        waited = time.monotonic()
+                        while self._size == 0 and not (self._eof or self._closed):
+                            self._cond.wait()
+                        stats.empty_wait += time.monotonic() - waited
+                    if self._size == 0 or self._closed:
+                        return
+                    head = self._head
+                    n = min(self._size, capacity - head, self.chunk_size)
+                started = time.monotonic()
+                written = os.write(self.dst_fd, view[head : head + n])
+                elapsed = time.monotonic() - started
+                with self._cond:
+                    stats.write_blocked += elapsed
+                    self._head = (head + written) % capacity
+                    self._size -= written
+                    stats.bytes_out += written
+                    self._cond.notify_all()
+        except OSError:
+            # 소비자가 파이프를 닫음(EPIPE)
+            return
+        finally:
+            with self._cond:
+                self._closed = True
+                self._cond.notify_all()
+            with contextlib.suppress(OSError):
+                os.close(self.dst_fd)
+
+    def _forward(self) -> None:
+        try:
+            while True:
+                try:
+                    forward(self.src_fd, self.dst_fd, self._stats, self.backend, self.chunk_size)
+                except BrokenPipeError:
+                    # 소비자가 파이프를 닫음
+                    return
+                except OSError:
+                    # 원본 fd 가 닫힘: EOF 와 같이 취급
+                    pass
+                with self._cond:
+                    if not self._switch_source():
+                        return
+        finally:
+            with self._cond:
+                self._eof = self._closed = True
+                self._cond.notify_all()
+            with contextlib.suppress(OSError):
+                os.close(self.dst_fd)
+
+    def _report(self) -> None:
+        while True:
+            with self._cond:
+                if self._cond.wait_for(lambda: self._closed, self.report_interval):
+                    return
+            print(f"relay: {self.snapshot().describe()}", file=sys.stderr)
+
+
+def start_relay(
+    src_fd: int,
+    capacity: int = DEFAULT_CAPACITY,
+    report_interval: float | None = None,
+    backend: str = "ring",
+) -> tuple[Relay, int]:
+    # 새 파이프를 만들어 (relay, 소비자 stdin 으로 줄 읽기 fd) 를 돌려준다.
+    # 읽기 fd 는 호출한 쪽이 닫는다 (copy 실패 후 ffmpeg 를 다시 붙일 때까지 열어 둔다)
+    read_fd, write_fd = os.pipe()
+    relay = Relay(
+        src_fd, write_fd, capacity=capacity, report_interval=report_interval, backend=backend
+    )
+    return relay.start(), read_fd
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+
+@dataclass
+class PollPolicy:
+    base_interval: float = 15.0
+    max_interval: float = 180.0
+    backoff_factor: float = 1.5
+    jitter: float = 0.2
+    # 예정된 라이브 시작 전후 구간에서는 이 간격으로 촘촘히 폴링
+    fast_interval: float = 5.0
+    lead_seconds: float = 120.0
+    grace_seconds: float = 900.0
+
+
+@dataclass
+class ChannelSchedule:
+    next_poll_at: float = 0.0
+    quiet_streak: int = 0
+    live_status: str | None = None
+    release_timestamp: float | None = None
+
+
+class PollScheduler:
+    # 조용한 채널은 지터를 섞어 지수적으로 간격을 늘리고, 예정된 라이브(is_upcoming)가 있으면
+    # 시작 시각 직전까지는 느슨하게, 시작 시각 전후로는 fast_interval 로 폴링한다.
+    # next_poll_at 은 epoch 초라서 그대로 로그/상태 조회에 쓸 수 있다.
+
+    def __init__(
+        self,
+        policy: PollPolicy | None = None,
+        clock: Callable[[], float] = time.time,
+        rng: Callable[[], float] = random.random,
+    ) -> None:
+        self.policy = policy or PollPolicy()
+        self._clock = clock
+        self._rng = rng
+        self._channels: dict[str, ChannelSchedule] = {}
+        self._lock = threading.Lock()
+
+    def _jittered(self, delay: float) -> float:
+        spread = self.policy.jitter * (2 * self._rng() - 1)
+        return max(0.0, delay * (1 + spread))
+
+    def record(
+        self,
+        key: str,
+        live_status: str | None,
+        release_timestamp: float | None = None,
+    ) -> float:
+        policy = self.policy
+        now = self._clock()
+        with self._lock:
+            state = self._channels.setdefault(key, ChannelSchedule())
+            state.live_status = live_status
+            state.release_timestamp = release_timestamp
+
+            max_interval = max(policy.max_interval, policy.base_interval)
+            backoff = min(
+                max_interval, policy.base_interval * policy.backoff_factor**state.quiet_streak
+            )
+            state.quiet_streak += 1
+
+            if live_status == "is_upcoming" and release_timestamp is not None:
+                until_start = release_timestamp - now
+                if until_start > policy.lead_seconds:
+                    # 시작 lead_seconds 전에는 반드시 깨어나도록 상한을 건다
+                    delay = max(
+                        policy.fast_interval,
+                        min(self._jittered(backoff), until_start - policy.lead_seconds),
+                    )
+                elif until_start >= -policy.grace_seconds:
+                    delay = policy.fast_interval
+                else:
+                    # 예정 시각이 한참 지났는데 시작하지 않은 방송: 기본 간격 유지
+                    delay = self._jittered(policy.base_interval)
+            else:
+                delay = self._jittered(backoff)
+
+            state.next_poll_at = now + delay
+        return delay
+
+    def reset(self, key: str) -> float:
+        # 라이브가 끝난 직후에는 재시작 가능성이 높으므로 기본 간격부터 다시 시작
+        now = self._clock()
+        with self._lock:
+            state = self._channels.setdefault(key, ChannelSchedule())
+            state.quiet_streak = 0
+            state.live_status = None
+            state.release_timestamp = None
+            state.next_poll_at = now + self.policy.base_interval
+        return self.policy.base_interval
+
+    def next_poll_at(self, key: str) -> float | None:
+        with self._lock:
+            state = self._channels.get(key)
+            return state.next_poll_at if state is not None else None
+
+    def snapshot(self) -> dict[str, ChannelSchedule]:
+        with self._lock:
+            return {key: ChannelSchedule(**vars(state)) for key, state in self._channels.items()}
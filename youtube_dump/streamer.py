@@ -1,32 +1,114 @@
 from __future__ import annotations
 
+import contextlib
+import json
+import os
 import shutil
 import signal
 import subprocess
 import sys
-from dataclasses import dataclass
+import tempfile
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from . import metrics
+from .archive import ArchiveConfig, ArchiveRecorder
+from .infocache import CachedInfo, InfoCache, video_id_from_url
+from .presets import AUTO_PRESET, PresetController, PresetSession, scale_filter, shared_controller
+from .producer import (
+    InProcessProducer,
+    UnsupportedSourceError,
+    extract_formats,
+    resolve_formats,
+    start_inprocess_producer,
+    url_expiry,
+)
+from .progress import FfmpegProgress, ProgressReader, SpeedAlarm
+from .relay import SPLICE_AVAILABLE, Relay, start_relay
+from .watchdog import StallPolicy, StallWatchdog
+
+PRODUCER_MODES = ("subprocess", "inprocess", "direct")
+# direct 모드: 서명 URL 만료 이 시간 전에 미리 다시 추출해 ffmpeg 를 재시작
+DIRECT_REFRESH_MARGIN_SECONDS = 300.0
+# direct 모드: 이 시간 안에 끝난 ffmpeg 실행이 연속 이 횟수를 넘으면 포기
+DIRECT_MIN_UPTIME_SECONDS = 30.0
+DIRECT_MAX_QUICK_FAILURES = 3
+ACTIVE_SESSIONS = metrics.REGISTRY.gauge("youtube_dump_active_sessions", "송출 중인 세션 수")
+SESSIONS = metrics.REGISTRY.counter(
+    "youtube_dump_sessions_total",
+    "끝난 세션 수 (outcome: ended, stopped, failed / mode: 최종 copy 또는 reencode)",
+    ("outcome", "mode"),
+)
+SESSION_SECONDS = metrics.REGISTRY.histogram(
+    "youtube_dump_session_duration_seconds",
+    "세션 길이",
+    buckets=(10.0, 60.0, 300.0, 900.0, 1800.0, 3600.0, 7200.0, 14400.0, 43200.0),
+)
+FFMPEG_EXITS = metrics.REGISTRY.counter(
+    "youtube_dump_ffmpeg_exits_total", "ffmpeg 종료 코드별 횟수", ("code",)
+)
+PRODUCER_RESTARTS = metrics.REGISTRY.counter(
+    "youtube_dump_producer_restarts_total", "원본 멈춤으로 yt-dlp 를 재시작한 횟수"
+)
+COPY_FALLBACKS = metrics.REGISTRY.counter(
+    "youtube_dump_copy_fallbacks_total", "copy 실패 후 재인코딩으로 전환한 횟수"
+)
+RELAY_BYTES = metrics.REGISTRY.counter(
+    "youtube_dump_relay_bytes_total", "relay 를 거쳐 ffmpeg 로 넘긴 바이트 (세션 종료 시 반영)"
+)
+OUTPUT_BYTES = metrics.REGISTRY.counter(
+    "youtube_dump_ffmpeg_output_bytes_total", "ffmpeg 가 출력한 바이트 (-progress total_size)"
+)
+ENCODE_SPEED = metrics.REGISTRY.histogram(
+    "youtube_dump_encode_speed_ratio",
+    "ffmpeg -progress speed 표본 (1.0 미만이면 실시간을 못 따라감)",
+    buckets=(0.25, 0.5, 0.75, 0.9, 0.95, 1.0, 1.05, 1.25, 2.0),
+)
+# --relay 사용 시 verbose 모드에서 처리량을 출력하는 간격
+RELAY_REPORT_SECONDS = 30.0
+# FLV/RTMP 로 재인코딩 없이 복사할 수 있는 코덱 (yt-dlp vcodec/acodec 또는 ffprobe codec_name 접두어)
+FLV_VIDEO_CODECS = ("avc1", "avc3", "h264")
+FLV_AUDIO_CODECS = ("mp4a", "aac")
 
 
 class ProcessPair:
-    def __init__(self, producer: subprocess.Popen, consumer: subprocess.Popen) -> None:
+    def __init__(
+        self, producer: subprocess.Popen | InProcessProducer, consumer: subprocess.Popen
+    ) -> None:
         self.producer = producer
         self.consumer = consumer
 
     def terminate(self) -> None:
-        for p in (self.producer, self.consumer):
-            if p.poll() is None:
-                try:
-                    p.terminate()
-                except Exception:
-                    pass
+        if self.producer.poll() is None:
+            with contextlib.suppress(Exception):
+                _signal_producer(self.producer, signal.SIGTERM)
+        if self.consumer.poll() is None:
+            with contextlib.suppress(Exception):
+                self.consumer.terminate()
 
     def kill(self) -> None:
-        for p in (self.producer, self.consumer):
-            if p.poll() is None:
-                try:
-                    p.kill()
-                except Exception:
-                    pass
+        if self.producer.poll() is None:
+            with contextlib.suppress(Exception):
+                _signal_producer(self.producer, signal.SIGKILL)
+        if self.consumer.poll() is None:
+            with contextlib.suppress(Exception):
+                self.consumer.kill()
+
+
+def _signal_producer(producer: subprocess.Popen | InProcessProducer, sig: int) -> None:
+    # yt-dlp 는 자기 세션(프로세스 그룹)으로 띄운다. 라이브 HLS 를 받는 FFmpegFD 는 ffmpeg 자식이
+    # stdout 파이프를 쥐고 있어 yt-dlp 만 죽이면 파이프가 닫히지 않으므로 그룹 전체에 보낸다
+    pid = getattr(producer, "pid", None)
+    if pid is not None and os.getpgid(pid) == pid:
+        os.killpg(pid, sig)
+    elif sig == signal.SIGKILL:
+        producer.kill()
+    else:
+        producer.terminate()
 
 
 class MissingBinaryError(RuntimeError):
@@ -40,6 +122,31 @@ def ensure_binaries(verbose: bool = False) -> None:
         )
 
 
+@dataclass
+class Rendition:
+    # 래더의 출력 하나. height 가 None 이면 원본 높이, 비트레이트가 None 이면 세션 기본값
+    output: str
+    height: int | None = None
+    video_bitrate: str | None = None
+    audio_bitrate: str | None = None
+    audio_only: bool = False
+
+
+def parse_rendition(text: str) -> Rendition:
+    # "720p@2500k=rtmp://...", "1080p=./out.ts", "audio@128k=./audio.m4a"
+    spec, sep, output = text.partition("=")
+    if not sep or not output:
+        raise ValueError(f"렌디션 형식 오류 (예: 720p@2500k=URL): {text}")
+    name, _, bitrate = spec.strip().lower().partition("@")
+    if name == "audio":
+        return Rendition(output=output, audio_bitrate=bitrate or None, audio_only=True)
+    if name == "source":
+        return Rendition(output=output, video_bitrate=bitrate or None)
+    if not name.endswith("p") or not name[:-1].isdigit():
+        raise ValueError(f"렌디션 높이 형식 오류 (720p, source, audio): {text}")
+    return Rendition(output=output, height=int(name[:-1]), video_bitrate=bitrate or None)
+
+
 @dataclass
 class StreamConfig:
     ingest_url: str
@@ -50,11 +157,32 @@ class StreamConfig:
     x264_preset: str
     live_from_start: bool
     verbose: bool
+    inputs: list[str] = field(default_factory=lambda: ["pipe:0"])
+    input_headers: dict[str, str] = field(default_factory=dict)
+    extra_outputs: list[str] = field(default_factory=list)
+    archive: ArchiveConfig | None = None
+    # 재인코딩 시 출력 최대 높이 (호스트가 못 따라갈 때 preset 컨트롤러가 정한다)
+    max_height: int | None = None
+    # 같은 디코딩 결과로 함께 인코딩할 추가 렌디션 (build_ffmpeg_cmd 가 filter_complex 로 묶는다)
+    renditions: list[Rendition] = field(default_factory=list)
+    on_progress: list[Callable[[FfmpegProgress], None]] = field(default_factory=list, repr=False)
 
     @property
     def output_url(self) -> str:
         return f"{self.ingest_url.rstrip('/')}/{self.stream_key}"
 
+    @property
+    def outputs(self) -> list[str]:
+        primary = [self.output_url] if self.stream_key else []
+        return primary + list(self.extra_outputs)
+
+    @property
+    def output_specs(self) -> list[tuple[str, str, dict[str, str]]]:
+        specs = [output_spec(output) for output in self.outputs]
+        if self.archive is not None:
+            specs.append(self.archive.output_spec())
+        return specs
+
     @staticmethod
     def _bufsize_from_bitrate(video_bitrate: str) -> str:
         if video_bitrate.endswith("k"):
@@ -65,42 +193,205 @@ class StreamConfig:
                 return video_bitrate
         return video_bitrate
 
-    def build_ffmpeg_cmd(self) -> list[str]:
+    def build_ffmpeg_cmd(self, progress_url: str | None = None) -> list[str]:
+        # progress_url: ffmpeg -progress 출력 대상 (_spawn_ffmpeg 가 on_progress 가 있을 때 파이프를 넘긴다)
         base = [
             "ffmpeg",
             "-hide_banner",
             "-loglevel",
             "info" if self.verbose else "warning",
-            "-re",
-            "-i",
-            "pipe:0",
         ]
+        if progress_url:
+            base += ["-progress", progress_url, "-nostats"]
+        for url in self.inputs:
+            if url.startswith(("http://", "https://")):
+                # 원격 매니페스트 직접 입력: yt-dlp 가 준 헤더를 그대로 쓰고, 멈추면 종료되도록
+                if self.input_headers:
+                    headers = "".join(f"{k}: {v}\r\n" for k, v in self.input_headers.items())
+                    base += ["-headers", headers]
+                base += ["-rw_timeout", "15000000"]
+            base += ["-re", "-i", url]
+        if self.renditions:
+            return base + self._ladder_args()
+        if len(self.inputs) > 1:
+            # 분리 포맷(bestvideo+bestaudio): 영상은 첫 입력, 음성은 마지막 입력에서
+            base += ["-map", "0:v:0", "-map", f"{len(self.inputs) - 1}:a:0"]
         if self.copy_mode:
             codec = ["-c:v", "copy", "-c:a", "copy"]
         else:
-            codec = [
-                "-c:v",
-                "libx264",
-                "-preset",
-                self.x264_preset,
-                "-b:v",
-                self.video_bitrate,
-                "-maxrate",
-                self.video_bitrate,
-                "-bufsize",
-                self._bufsize_from_bitrate(self.video_bitrate),
-                "-c:a",
-                "aac",
-                "-b:a",
-                self.audio_bitrate,
-                "-ar",
-                "48000",
-                "-ac",
-                "2",
-            ]
-        tail = ["-f", "flv", self.output_url]
+            codec = ["-vf", scale_filter(self.max_height)] if self.max_height else []
+            codec += self._video_codec_args(self.video_bitrate)
+            codec += self._audio_codec_args(self.audio_bitrate)
+        specs = self.output_specs
+        if not specs:
+            raise ValueError("출력 대상이 없습니다.")
+        if len(specs) == 1:
+            tail = _muxer_args(specs, self.copy_mode)
+        else:
+            # 한 번 인코딩하고 tee 로 여러 목적지에 나눠 보낸다. 한 곳이 실패해도 나머지는 계속
+            tail = [] if len(self.inputs) > 1 else ["-map", "0:v?", "-map", "0:a?"]
+            tail += _muxer_args(specs, self.copy_mode)
         return base + codec + tail
 
+    def _video_codec_args(self, video_bitrate: str) -> list[str]:
+        return [
+            "-c:v",
+            "libx264",
+            "-preset",
+            self.x264_preset,
+            "-b:v",
+            video_bitrate,
+            "-maxrate",
+            video_bitrate,
+            "-bufsize",
+            self._bufsize_from_bitrate(video_bitrate),
+        ]
+
+    @staticmethod
+    def _audio_codec_args(audio_bitrate: str) -> list[str]:
+        return ["-c:a", "aac", "-b:a", audio_bitrate, "-ar", "48000", "-ac", "2"]
+
+    def _ladder_args(self) -> list[str]:
+        # 한 번 디코딩한 영상을 split 으로 나눠 렌디션마다 스케일/인코딩하고 각자의 출력으로 보낸다.
+        # 기본 출력(송출 키, extra_outputs, archive)은 첫 렌디션처럼 다루고, copy 모드면 복사한다.
+        video_in = "0:v:0"
+        audio_in = f"{len(self.inputs) - 1}:a:0?"
+        specs = self.output_specs
+        encode_main = bool(specs) and not self.copy_mode
+        heights = [self.max_height] if encode_main else []
+        heights += [r.height for r in self.renditions if not r.audio_only]
+        labels, graph = _split_scale_graph(video_in, heights)
+        args = ["-filter_complex", graph] if graph else []
+        if specs:
+            if self.copy_mode:
+                args += ["-map", f"{video_in}?", "-map", audio_in, "-c:v", "copy", "-c:a", "copy"]
+            else:
+                args += ["-map", labels.pop(0), "-map", audio_in]
+                args += self._video_codec_args(self.video_bitrate)
+                args += self._audio_codec_args(self.audio_bitrate)
+            args += _muxer_args(specs, self.copy_mode)
+        for rendition in self.renditions:
+            audio_bitrate = rendition.audio_bitrate or self.audio_bitrate
+            if rendition.audio_only:
+                args += ["-map", audio_in, "-vn"]
+            else:
+                args += ["-map", labels.pop(0), "-map", audio_in]
+                args += self._video_codec_args(rendition.video_bitrate or self.video_bitrate)
+            args += self._audio_codec_args(audio_bitrate)
+            args += _muxer_args([output_spec(rendition.output)], copy_mode=False)
+        return args
+
+
+def _split_scale_graph(video_in: str, heights: list[int | None]) -> tuple[list[str], str]:
+    # 출력마다 쓸 영상 라벨과 filter_complex 그래프. 높이가 None 이면 원본 크기 그대로
+    if not heights:
+        return [], ""
+    if len(heights) == 1:
+        if heights[0] is None:
+            return [video_in], ""
+        return ["[v0]"], f"[{video_in}]{scale_filter(heights[0])}[v0]"
+    chains = [f"[{video_in}]split={len(heights)}" + "".join(f"[s{i}]" for i in range(len(heights)))]
+    labels = []
+    for i, height in enumerate(heights):
+        if height is None:
+            labels.append(f"[s{i}]")
+        else:
+            chains.append(f"[s{i}]{scale_filter(height)}[v{i}]")
+            labels.append(f"[v{i}]")
+    return labels, ";".join(chains)
+
+
+def _muxer_args(specs: list[tuple[str, str, dict[str, str]]], copy_mode: bool) -> list[str]:
+    if len(specs) == 1:
+        muxer, url, options = specs[0]
+        args = ["-f", muxer]
+        for key, value in options.items():
+            args += [f"-{key}", value]
+        return [*args, url]
+    args = [] if copy_mode else ["-flags", "+global_header"]
+    return [*args, "-f", "tee", "|".join(_tee_slave(spec) for spec in specs)]
+
+
+_FILE_MUXERS = {
+    ".aac": "adts",
+    ".m4a": "mp4",
+    ".flv": "flv",
+    ".ts": "mpegts",
+    ".mkv": "matroska",
+    ".mp4": "mp4",
+    ".nut": "nut",
+}
+
+
+def output_spec(output: str) -> tuple[str, str, dict[str, str]]:
+    # 출력 문자열 -> (muxer, URL, muxer 옵션). "null" 은 결과를 버리는 테스트/벤치마크용
+    if output == "null":
+        return "null", "-", {}
+    lowered = output.lower()
+    if lowered.startswith(("rtmp://", "rtmps://")):
+        return "flv", output, {}
+    if lowered.startswith(("srt://", "udp://", "tcp://")):
+        return "mpegts", output, {}
+    muxer = _FILE_MUXERS.get(os.path.splitext(lowered)[1], "flv")
+    if muxer == "mp4":
+        # 중간에 끊겨도 읽을 수 있도록 fragmented MP4 로 쓴다
+        return muxer, output, {"movflags": "+frag_keyframe+empty_moov"}
+    return muxer, output, {}
+
+
+def _tee_slave(spec: tuple[str, str, dict[str, str]]) -> str:
+    muxer, url, options = spec
+    opts = ":".join([f"f={muxer}", "onfail=ignore"] + [f"{k}={v}" for k, v in options.items()])
+    escaped = url
+    for char in ("\\", "|", "[", "]"):
+        escaped = escaped.replace(char, "\\" + char)
+    return f"[{opts}]{escaped}"
+
+
+def probe_codecs(url: str, headers: dict[str, str] | None = None) -> tuple[str, str]:
+    # ffprobe 로 원격 입력의 앞부분만 읽어 (vcodec, acodec) 을 얻는다. 실패하면 빈 문자열
+    if shutil.which("ffprobe") is None:
+        return "", ""
+    cmd = ["ffprobe", "-v", "error", "-show_entries", "stream=codec_type,codec_name", "-of", "json"]
+    if headers:
+        cmd += ["-headers", "".join(f"{k}: {v}\r\n" for k, v in headers.items())]
+    cmd.append(url)
+    try:
+        out = subprocess.run(cmd, capture_output=True, timeout=20, check=True).stdout
+        streams = json.loads(out).get("streams", [])
+    except Exception:
+        return "", ""
+    codecs = {s.get("codec_type"): s.get("codec_name") or "" for s in streams}
+    return codecs.get("video", "none"), codecs.get("audio", "none")
+
+
+def copy_compatible(formats: list[dict]) -> bool:
+    has_stream = False
+    for fmt in formats:
+        vcodec = (fmt.get("vcodec") or "").lower()
+        acodec = (fmt.get("acodec") or "").lower()
+        if (not vcodec or not acodec) and fmt.get("url"):
+            probed_v, probed_a = probe_codecs(str(fmt["url"]), fmt.get("http_headers"))
+            vcodec = vcodec or probed_v
+            acodec = acodec or probed_a
+        for codec, allowed in ((vcodec, FLV_VIDEO_CODECS), (acodec, FLV_AUDIO_CODECS)):
+            if codec == "none":
+                continue
+            if not codec.startswith(allowed):
+                return False
+            has_stream = True
+    return has_stream
+
+
+def decide_copy_mode(copy_mode: bool | None, formats: list[dict] | None, verbose: bool) -> bool:
+    # copy_mode 가 None 이면 선택된 포맷의 코덱을 보고 복사 가능 여부를 자동으로 정한다
+    if copy_mode is not None:
+        return copy_mode
+    decided = formats is not None and copy_compatible(formats)
+    if verbose:
+        print(f"코덱 자동 판별: {'copy' if decided else 'reencode'}", file=sys.stderr)
+    return decided
+
 
 def build_ffmpeg_cmd(
     ingest_url: str,
@@ -129,6 +420,7 @@ def build_ytdlp_cmd(
     yt_dlp_format: str,
     live_from_start: bool,
     verbose: bool,
+    info_json: str | os.PathLike | None = None,
 ) -> list[str]:
     cmd = [
         sys.executable,
@@ -143,7 +435,11 @@ def build_ytdlp_cmd(
     ]
     if live_from_start:
         cmd.append("--live-from-start")
-    cmd.append(source_url)
+    if info_json is not None:
+        # 감지 단계에서 저장한 info 를 그대로 써서 추출을 생략한다
+        cmd += ["--load-info-json", str(info_json)]
+    else:
+        cmd.append(source_url)
 
     if verbose:
         print("yt-dlp:", " ".join(cmd), file=sys.stderr)
@@ -151,11 +447,161 @@ def build_ytdlp_cmd(
     return cmd
 
 
-def _forward_stream(src, dst) -> None:
-    # 필요 시 로깅/중계 스레드 사용 가능 (현재는 직접 파이프 연결)
-    for chunk in iter(lambda: src.read(64 * 1024), b""):
-        dst.write(chunk)
-        dst.flush()
+# copy 모드에서 이 종류의 실패는 재인코딩으로 바꾸면 해결될 가능성이 높다
+COPY_FALLBACK_FAILURES = ("codec", "timestamp")
+_FAILURE_PATTERNS = (
+    (
+        "codec",
+        (
+            "codec not currently supported in container",
+            "could not find tag for codec",
+            "not compatible with flv",
+        ),
+    ),
+    (
+        "timestamp",
+        (
+            "non-monotonous dts",
+            "non monotonically increasing dts",
+            "invalid dts",
+            "pts < dts",
+            "invalid, non monotonically",
+        ),
+    ),
+    (
+        "output",
+        (
+            "connection refused",
+            "connection reset",
+            "broken pipe",
+            "server returned 4",
+            "rtmp_",
+            "failed to update header",
+            "error writing trailer",
+        ),
+    ),
+    # 헤더 쓰기/출력 초기화 실패는 원인 문구를 함께 찍으므로 (": Broken pipe" 등) 출력 쪽을 먼저 본다
+    (
+        "codec",
+        (
+            "incompatible",
+            "could not write header",
+            "error initializing output stream",
+        ),
+    ),
+    (
+        "input",
+        (
+            "invalid data found when processing input",
+            "could not find codec parameters",
+            "end of file",
+        ),
+    ),
+)
+
+
+def classify_ffmpeg_failure(lines: list[str]) -> str:
+    text = "\n".join(lines).lower()
+    for failure, patterns in _FAILURE_PATTERNS:
+        if any(pattern in text for pattern in patterns):
+            return failure
+    return "unknown"
+
+
+class FfmpegLog:
+    # ffmpeg stderr 를 읽어 최근 줄만 보관하고(실패 분류용), verbose 이면 그대로 흘려보낸다
+
+    def __init__(
+        self,
+        stream,  # type: ignore[no-untyped-def]
+        echo: bool = False,
+        maxlen: int = 50,
+        progress: ProgressReader | None = None,
+    ) -> None:
+        self._lines: deque[str] = deque(maxlen=maxlen)
+        self._echo = echo
+        # -progress 를 켠 경우 같은 ffmpeg 의 진행 파이프 리더
+        self.progress = progress
+        self._thread: threading.Thread | None = None
+        if stream is not None and hasattr(stream, "readline"):
+            self._thread = threading.Thread(
+                target=self._drain, args=(stream,), name="ffmpeg-stderr", daemon=True
+            )
+            self._thread.start()
+
+    def _drain(self, stream) -> None:  # type: ignore[no-untyped-def]
+        try:
+            for raw in iter(stream.readline, b""):
+                line = raw.decode("utf-8", "replace").rstrip()
+                self._lines.append(line)
+                if self._echo:
+                    print(line, file=sys.stderr)
+        except (OSError, ValueError):
+            pass
+
+    def join(self, timeout: float = 2.0) -> None:
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if self.progress is not None:
+            self.progress.join(timeout)
+
+    def lines(self) -> list[str]:
+        return list(self._lines)
+
+
+@dataclass
+class SessionResult:
+    source_url: str
+    producer_mode: str
+    requested_copy_mode: bool | None
+    copy_mode: bool
+    fallbacks: int = 0
+    failure: str | None = None
+    rc_producer: int | None = None
+    rc_consumer: int | None = None
+    stopped: bool = False
+    error: str | None = None
+    started_at: float = field(default_factory=time.time)
+    ended_at: float | None = None
+    relay: dict | None = None
+    producer_restarts: int = 0
+    progress: dict | None = None
+    x264_preset: str | None = None
+    max_height: int | None = None
+
+    @property
+    def final_mode(self) -> str:
+        return "copy" if self.copy_mode else "reencode"
+
+
+def append_session_log(path: str | os.PathLike, result: SessionResult) -> None:
+    # 세션마다 한 줄(JSON). 어떤 모드로 끝났는지 모아 기본 프로필을 조정하는 데 쓴다
+    record = asdict(result)
+    record["final_mode"] = result.final_mode
+    with open(path, "a", encoding="utf-8") as fp:
+        fp.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+@contextlib.contextmanager
+def _terminate_on_signals(terminate: Callable[[], None]) -> Iterator[None]:
+    # 시그널 핸들러는 메인 스레드에서만 설치 가능 (watch-many 세션은 워커 스레드에서 실행)
+    if threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def _handle_signal(signum, frame):  # type: ignore[no-untyped-def]
+        terminate()
+
+    previous_int = signal.signal(signal.SIGINT, _handle_signal)
+    previous_term = signal.signal(signal.SIGTERM, _handle_signal)
+    try:
+        yield
+    finally:
+        try:
+            signal.signal(signal.SIGINT, previous_int)
+            signal.signal(signal.SIGTERM, previous_term)
+        except Exception:
+            pass
 
 
 def restream_youtube(
@@ -163,73 +609,697 @@ def restream_youtube(
     stream_key: str,
     ingest_url: str,
     yt_dlp_format: str,
-    copy_mode: bool,
+    copy_mode: bool | None,
     video_bitrate: str,
     audio_bitrate: str,
     x264_preset: str,
     live_from_start: bool,
     verbose: bool,
-) -> None:
+    stop_event: threading.Event | None = None,
+    producer_mode: str = "subprocess",
+    info: dict | None = None,
+    session_log: str | os.PathLike | None = None,
+    extra_outputs: list[str] | None = None,
+    archive: ArchiveConfig | None = None,
+    relay: bool | str = False,
+    stall_timeout: float | None = None,
+    speed_alert: float | None = None,
+    on_progress: Callable[[FfmpegProgress], None] | None = None,
+    info_cache: InfoCache | None = None,
+    preset_controller: PresetController | None = None,
+    renditions: list[Rendition] | None = None,
+) -> SessionResult:
+    # x264_preset="auto": 호스트 보정 결과와 최근 세션의 speed 로 세션마다 preset 을 고른다
     ensure_binaries(verbose=verbose)
+    if producer_mode not in PRODUCER_MODES:
+        raise ValueError(f"알 수 없는 producer 모드: {producer_mode}")
 
     cfg = StreamConfig(
         ingest_url=ingest_url,
         stream_key=stream_key,
-        copy_mode=copy_mode,
+        copy_mode=bool(copy_mode),
         video_bitrate=video_bitrate,
         audio_bitrate=audio_bitrate,
         x264_preset=x264_preset,
         live_from_start=live_from_start,
         verbose=verbose,
+        extra_outputs=list(extra_outputs or []),
+        archive=archive,
+        renditions=list(renditions or []),
     )
-
-    ytdlp_cmd = build_ytdlp_cmd(
+    result = SessionResult(
         source_url=source_url,
-        yt_dlp_format=yt_dlp_format,
-        live_from_start=live_from_start,
-        verbose=verbose,
+        producer_mode=producer_mode,
+        requested_copy_mode=copy_mode,
+        copy_mode=cfg.copy_mode,
+    )
+    if on_progress is not None:
+        cfg.on_progress.append(on_progress)
+    if preset_controller is None and x264_preset == AUTO_PRESET:
+        preset_controller = shared_controller()
+    presets = _choose_preset(cfg, preset_controller) if preset_controller is not None else None
+    result.x264_preset = cfg.x264_preset
+    result.max_height = cfg.max_height
+    alarm: SpeedAlarm | None = None
+    if speed_alert:
+        alarm = SpeedAlarm(speed_alert, on_alert=_warn_slow_encode(source_url, speed_alert))
+        cfg.on_progress.append(alarm)
+    if cfg.on_progress:
+        cfg.on_progress.append(_ProgressMetrics())
+    recorder = ArchiveRecorder(archive, verbose=verbose) if archive is not None else None
+    ACTIVE_SESSIONS.inc()
+    try:
+        if recorder is not None:
+            recorder.start()
+        _run_session(
+            cfg,
+            result,
+            source_url,
+            yt_dlp_format,
+            copy_mode=copy_mode,
+            info=info,
+            stop_event=stop_event,
+            relay_backend="ring" if relay is True else relay or None,
+            stall=StallPolicy(stall_seconds=stall_timeout) if stall_timeout else None,
+            info_cache=info_cache,
+        )
+    except BaseException as exc:
+        result.error = str(exc) or type(exc).__name__
+        raise
+    finally:
+        if recorder is not None:
+            recorder.stop()
+        if presets is not None and preset_controller is not None:
+            preset_controller.end_session(presets, reencoded=not cfg.copy_mode)
+        if alarm is not None:
+            result.progress = alarm.summary()
+        result.ended_at = time.time()
+        ACTIVE_SESSIONS.dec()
+        _record_session_metrics(result)
+        if session_log is not None:
+            append_session_log(session_log, result)
+    return result
+
+
+def _run_session(
+    cfg: StreamConfig,
+    result: SessionResult,
+    source_url: str,
+    yt_dlp_format: str,
+    *,
+    copy_mode: bool | None,
+    info: dict | None,
+    stop_event: threading.Event | None,
+    relay_backend: str | None = None,
+    stall: StallPolicy | None = None,
+    info_cache: InfoCache | None = None,
+) -> None:
+    verbose = cfg.verbose
+    info, cached = _lookup_cached_info(cfg, source_url, info, info_cache)
+    info_json = cached.path if cached is not None else None
+    if result.producer_mode == "direct":
+        formats = _resolve_direct_formats(result, source_url, yt_dlp_format, verbose, info)
+        if formats is not None:
+            cfg.copy_mode = result.copy_mode = decide_copy_mode(copy_mode, formats, verbose)
+            _restream_direct(
+                cfg, result, source_url, yt_dlp_format, formats=formats, stop_event=stop_event
+            )
+            return
+
+    # 캐시 없이 추출한 info 는 세션 동안만 쓰는 임시 디렉터리에 둔다
+    with contextlib.ExitStack() as scratch:
+        inprocess: InProcessProducer | None = None
+        if result.producer_mode == "inprocess":
+            inprocess = _start_inprocess(cfg, result, source_url, yt_dlp_format, info)
+
+        if copy_mode is None:
+            if inprocess is not None:
+                formats = inprocess.formats
+            else:
+                formats, extracted_json = _extract_session_formats(
+                    cfg,
+                    source_url,
+                    yt_dlp_format,
+                    info,
+                    info_cache=info_cache if info_json is None else None,
+                    scratch=scratch if info_json is None else None,
+                )
+                info_json = info_json or extracted_json
+            cfg.copy_mode = result.copy_mode = decide_copy_mode(copy_mode, formats, verbose)
+
+        pipe = _connect_producer(cfg, source_url, yt_dlp_format, inprocess, info_json)
+        relay, stall = _attach_relay(cfg, pipe, relay_backend, stall)
+        restarter: _StallRestarter | None = None
+        if stall is not None and relay is not None:
+            restarter = _StallRestarter(
+                cfg, stall, relay, result, source_url=source_url, yt_dlp_format=yt_dlp_format
+            )
+
+        consumer, log = _spawn_ffmpeg(cfg, pipe.stdin, pipe.popen_extra)
+        try:
+            log = _supervise(
+                cfg,
+                result,
+                ProcessPair(pipe.producer, consumer),
+                log,
+                pipe,
+                stop_event=stop_event,
+                restarter=restarter,
+            )
+        finally:
+            _close_session_pipes(result, pipe, relay, restarter, verbose)
+
+        # 마지막 진행 레코드까지 콜백이 끝나도록
+        log.join()
+        result.copy_mode = cfg.copy_mode
+        rc_producer, rc_consumer = result.rc_producer, result.rc_consumer
+        if not result.stopped and (rc_consumer != 0 or rc_producer != 0):
+            if result.failure is None and rc_consumer != 0:
+                result.failure = classify_ffmpeg_failure(log.lines())
+            raise RuntimeError(f"프로세스 종료 코드: yt-dlp={rc_producer}, ffmpeg={rc_consumer}")
+
+
+@dataclass
+class _SessionPipe:
+    # producer 와 ffmpeg 사이의 연결. stdin 은 ffmpeg 표준 입력(relay 를 켜면 relay 의 읽기 끝),
+    # 분리 포맷을 in-process 로 받으면 popen_extra 의 pass_fds 로 파이프 여러 개를 넘긴다
+    producer: subprocess.Popen | InProcessProducer
+    stdin: object
+    popen_extra: dict = field(default_factory=dict)
+    inprocess: InProcessProducer | None = None
+
+
+def _lookup_cached_info(
+    cfg: StreamConfig, source_url: str, info: dict | None, info_cache: InfoCache | None
+) -> tuple[dict | None, CachedInfo | None]:
+    # --live-from-start 는 추출 단계 옵션이라 감지기가 저장한 info 와 포맷 목록이 다르다
+    if info_cache is None or cfg.live_from_start:
+        return info, None
+    cached = info_cache.get(video_id_from_url(source_url) or (info or {}).get("id"))
+    if cached is not None and info is None:
+        info = cached.info
+    return info, cached
+
+
+def _resolve_direct_formats(
+    result: SessionResult, source_url: str, yt_dlp_format: str, verbose: bool, info: dict | None
+) -> list[dict] | None:
+    try:
+        _, formats = resolve_formats(source_url, yt_dlp_format, verbose, info)
+    except UnsupportedSourceError as exc:
+        if verbose:
+            print(f"direct 모드 불가, subprocess 로 전환: {exc}", file=sys.stderr)
+        result.producer_mode = "subprocess"
+        return None
+    return formats
+
+
+def _start_inprocess(
+    cfg: StreamConfig,
+    result: SessionResult,
+    source_url: str,
+    yt_dlp_format: str,
+    info: dict | None,
+) -> InProcessProducer | None:
+    try:
+        return start_inprocess_producer(
+            source_url=source_url,
+            yt_dlp_format=yt_dlp_format,
+            live_from_start=cfg.live_from_start,
+            verbose=cfg.verbose,
+            info=info,
+        )
+    except UnsupportedSourceError as exc:
+        if cfg.verbose:
+            print(f"in-process producer 불가, subprocess 로 전환: {exc}", file=sys.stderr)
+        result.producer_mode = "subprocess"
+        return None
+
+
+def _extract_session_formats(
+    cfg: StreamConfig,
+    source_url: str,
+    yt_dlp_format: str,
+    info: dict | None,
+    *,
+    info_cache: InfoCache | None,
+    scratch: contextlib.ExitStack | None,
+) -> tuple[list[dict] | None, Path | None]:
+    # copy 가능 여부를 정하려고 포맷을 미리 추출한다. 실패하면 재인코딩으로 간다.
+    # 추출한 info 는 캐시(없으면 scratch 가 세션 끝에 지우는 임시 디렉터리)에 저장하고 그 경로를
+    # 돌려준다. yt-dlp 가 --load-info-json 으로 그대로 받으므로 같은 라이브를 두 번 추출하지 않는다
+    try:
+        extracted, formats = extract_formats(source_url, yt_dlp_format, cfg.verbose, info)
+    except Exception:
+        return None, None
+    if cfg.live_from_start:
+        return formats, None
+    if info_cache is None:
+        if scratch is None:
+            return formats, None
+        info_cache = InfoCache(
+            scratch.enter_context(tempfile.TemporaryDirectory(prefix="youtube_dump-info-"))
+        )
+    return formats, _cache_quietly(info_cache, extracted, cfg.verbose)
+
+
+def _connect_producer(
+    cfg: StreamConfig,
+    source_url: str,
+    yt_dlp_format: str,
+    inprocess: InProcessProducer | None,
+    info_json: Path | None,
+) -> _SessionPipe:
+    if inprocess is None:
+        producer = _spawn_ytdlp(
+            source_url, yt_dlp_format, cfg.live_from_start, cfg.verbose, info_json=info_json
+        )
+        return _SessionPipe(producer=producer, stdin=producer.stdout)
+    read_fds = inprocess.read_fds
+    if len(read_fds) == 1:
+        return _SessionPipe(producer=inprocess, stdin=read_fds[0], inprocess=inprocess)
+    cfg.inputs = [f"pipe:{fd}" for fd in read_fds]
+    return _SessionPipe(
+        producer=inprocess,
+        stdin=subprocess.DEVNULL,
+        popen_extra={"pass_fds": tuple(read_fds)},
+        inprocess=inprocess,
     )
-    ffmpeg_cmd = cfg.build_ffmpeg_cmd()
 
+
+def _attach_relay(
+    cfg: StreamConfig,
+    pipe: _SessionPipe,
+    relay_backend: str | None,
+    stall: StallPolicy | None,
+) -> tuple[Relay | None, StallPolicy | None]:
+    verbose = cfg.verbose
+    if stall is not None:
+        if pipe.inprocess is not None:
+            # in-process producer 는 멈춘 네트워크 읽기를 끊을 수 없어 재시작 대상이 아니다
+            if verbose:
+                print("stall watchdog 생략: in-process producer", file=sys.stderr)
+            stall = None
+        elif relay_backend is None:
+            # 수신 바이트 수만 필요하므로 가장 가벼운 백엔드를 쓴다
+            relay_backend = "splice" if SPLICE_AVAILABLE else "copy"
+    if relay_backend is None:
+        return None, stall
+    if pipe.popen_extra:
+        # 분리 포맷을 여러 파이프로 넘기는 in-process 모드는 relay 를 거치지 않는다
+        if verbose:
+            print("relay 생략: 입력 파이프가 여러 개입니다.", file=sys.stderr)
+        return None, stall
+    src_fd = pipe.stdin if isinstance(pipe.stdin, int) else pipe.producer.stdout.fileno()
+    relay, pipe.stdin = start_relay(
+        src_fd,
+        report_interval=RELAY_REPORT_SECONDS if verbose else None,
+        backend=relay_backend,
+    )
+    return relay, stall
+
+
+class _StallRestarter:
+    # 원본이 멈추면 ffmpeg(RTMP 연결)는 두고 yt-dlp 만 라이브 엣지에서 다시 띄운다
+
+    def __init__(
+        self,
+        cfg: StreamConfig,
+        stall: StallPolicy,
+        relay: Relay,
+        result: SessionResult,
+        *,
+        source_url: str,
+        yt_dlp_format: str,
+    ) -> None:
+        self.watchdog = StallWatchdog(stall)
+        self.relay = relay
+        self.result = result
+        self.source_url = source_url
+        self.yt_dlp_format = yt_dlp_format
+        self.verbose = cfg.verbose
+        self.retired: list[subprocess.Popen] = []
+        cfg.on_progress.append(lambda record: self.watchdog.observe_speed(record.speed))
+
+    def check(self, pair: ProcessPair) -> None:
+        if not self.watchdog.observe(self.relay.snapshot().bytes_in):
+            return
+        if self.watchdog.exhausted:
+            if self.verbose:
+                print("원본이 계속 멈춰 있어 세션을 종료합니다.", file=sys.stderr)
+            self.result.failure = "stall"
+            pair.terminate()
+            return
+        if self.verbose:
+            print("원본 멈춤 감지: yt-dlp 를 라이브 엣지에서 재시작", file=sys.stderr)
+        fresh = _spawn_ytdlp(self.source_url, self.yt_dlp_format, False, self.verbose)
+        self.relay.replace_source(fresh.stdout.fileno())
+        self.retired.append(pair.producer)
+        pair.producer = fresh
+        with contextlib.suppress(Exception):
+            _signal_producer(self.retired[-1], signal.SIGKILL)
+        self.watchdog.restarted()
+        self.result.producer_restarts += 1
+
+    def reap(self) -> None:
+        for old in self.retired:
+            # relay 가 더 이상 읽지 않는 것을 확인한 뒤에 fd 를 닫는다 (fd 번호 재사용 방지)
+            old.wait()
+            if old.stdout is not None:
+                old.stdout.close()
+
+
+def _supervise(
+    cfg: StreamConfig,
+    result: SessionResult,
+    pair: ProcessPair,
+    log: FfmpegLog,
+    pipe: _SessionPipe,
+    *,
+    stop_event: threading.Event | None,
+    restarter: _StallRestarter | None,
+) -> FfmpegLog:
+    # ffmpeg 가 끝날 때까지 기다리고, copy 실패면 재인코딩 ffmpeg 를 다시 붙인다.
+    # 종료 코드와 중단 여부는 result 에 기록하고 마지막 ffmpeg 의 로그를 돌려준다
+    tick = (lambda: restarter.check(pair)) if restarter is not None else None
+    with _terminate_on_signals(pair.terminate):
+        while True:
+            result.stopped = _wait_consumer(pair.consumer, stop_event, tick)
+            if result.stopped:
+                pair.terminate()
+            result.rc_consumer = pair.consumer.wait()
+            if result.stopped or result.rc_consumer == 0 or pair.producer.poll() is not None:
+                break
+            if result.failure == "stall":
+                break
+            if not _should_fall_back(cfg, result, log, result.rc_consumer):
+                break
+            # producer 는 그대로 두고 같은 파이프에 재인코딩 ffmpeg 만 다시 붙인다
+            pair.consumer, log = _spawn_ffmpeg(cfg, pipe.stdin, pipe.popen_extra)
+        producer = pair.producer
+        if producer.poll() is None:
+            with contextlib.suppress(Exception):
+                _signal_producer(producer, signal.SIGTERM)
+        result.rc_producer = producer.wait()
+    return log
+
+
+def _close_session_pipes(
+    result: SessionResult,
+    pipe: _SessionPipe,
+    relay: Relay | None,
+    restarter: _StallRestarter | None,
+    verbose: bool,
+) -> None:
+    if relay is not None:
+        # 소비자 쪽 읽기 끝을 닫아 relay 쓰기 스레드가 EPIPE 로 끝나도록
+        with contextlib.suppress(OSError):
+            os.close(pipe.stdin)
+        relay.close()
+        relay.join(timeout=5)
+        result.relay = asdict(relay.snapshot())
+        if verbose:
+            print(f"relay: {relay.snapshot().describe()}", file=sys.stderr)
+    if restarter is not None:
+        restarter.reap()
+    if pipe.inprocess is not None:
+        pipe.inprocess.close_read_fds()
+
+
+def _spawn_ffmpeg(
+    cfg: StreamConfig, stdin: object, popen_extra: dict
+) -> tuple[subprocess.Popen, FfmpegLog]:
+    if not cfg.on_progress:
+        consumer = subprocess.Popen(
+            cfg.build_ffmpeg_cmd(),
+            stdin=stdin,
+            stdout=sys.stdout if cfg.verbose else subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            bufsize=0,
+            **popen_extra,
+        )
+        return consumer, FfmpegLog(getattr(consumer, "stderr", None), echo=cfg.verbose)
+
+    # ffmpeg 마다 진행 파이프를 새로 만든다 (copy 실패 후 재시작, direct 모드 재시작 포함)
+    read_fd, write_fd = os.pipe()
+    extra = dict(popen_extra)
+    extra["pass_fds"] = (*extra.get("pass_fds", ()), write_fd)
+    try:
+        consumer = subprocess.Popen(
+            cfg.build_ffmpeg_cmd(progress_url=f"pipe:{write_fd}"),
+            stdin=stdin,
+            stdout=sys.stdout if cfg.verbose else subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            bufsize=0,
+            **extra,
+        )
+    except BaseException:
+        os.close(read_fd)
+        raise
+    finally:
+        os.close(write_fd)
+    progress = ProgressReader(read_fd, cfg.on_progress)
+    return consumer, FfmpegLog(getattr(consumer, "stderr", None), cfg.verbose, progress=progress)
+
+
+class _ProgressMetrics:
+    # -progress 레코드마다 출력 바이트 증가분과 speed 를 메트릭에 반영
+    def __init__(self) -> None:
+        self._total_size = 0
+
+    def __call__(self, record: FfmpegProgress) -> None:
+        if record.total_size is not None:
+            # ffmpeg 가 재시작되면 total_size 가 0 부터 다시 센다
+            previous = self._total_size if record.total_size >= self._total_size else 0
+            OUTPUT_BYTES.inc(record.total_size - previous)
+            self._total_size = record.total_size
+        if record.speed is not None and not record.done:
+            ENCODE_SPEED.observe(record.speed)
+
+
+def _record_session_metrics(result: SessionResult) -> None:
+    if result.error is not None:
+        outcome = "failed"
+    elif result.stopped:
+        outcome = "stopped"
+    else:
+        outcome = "ended"
+    SESSIONS.inc(outcome=outcome, mode=result.final_mode)
+    if result.ended_at is not None:
+        SESSION_SECONDS.observe(result.ended_at - result.started_at)
+    if result.rc_consumer is not None:
+        FFMPEG_EXITS.inc(code=result.rc_consumer)
+    if result.producer_restarts:
+        PRODUCER_RESTARTS.inc(result.producer_restarts)
+    if result.fallbacks:
+        COPY_FALLBACKS.inc(result.fallbacks)
+    if result.relay:
+        RELAY_BYTES.inc(result.relay["bytes_out"])
+
+
+def _warn_slow_encode(source_url: str, threshold: float) -> Callable[[FfmpegProgress], None]:
+    def _warn(record: FfmpegProgress) -> None:
+        # 실시간을 못 따라가는 상태: 호스트가 과부하이거나 preset 이 너무 무겁다
+        print(
+            f"경고: 인코딩 속도 {record.speed}x < {threshold}x ({source_url}, "
+            f"fps={record.fps}, drop={record.drop_frames}, dup={record.dup_frames})",
+            file=sys.stderr,
+        )
+
+    return _warn
+
+
+def _choose_preset(cfg: StreamConfig, controller: PresetController) -> PresetSession:
+    # copy 로 시작해도 재인코딩으로 전환될 수 있어 미리 골라 둔다
+    session = controller.start_session(cfg.x264_preset)
+    choice = session.choice
+    cfg.x264_preset = choice.preset
+    cfg.max_height = choice.max_height
+    cfg.on_progress.append(session)
+    if cfg.verbose:
+        text = choice.preset
+        if choice.max_height:
+            text += f", 최대 {choice.max_height}p"
+        if choice.cost is not None:
+            text += f", 예상 {choice.cost:.1f}코어"
+        print(f"x264 preset: {text}", file=sys.stderr)
+    return session
+
+
+def _cache_quietly(info_cache: InfoCache, info: dict, verbose: bool) -> Path | None:
+    # 캐시 디렉터리 문제로 송출이 실패하면 안 된다
+    try:
+        return info_cache.put(info)
+    except Exception as exc:
+        if verbose:
+            print(f"info 캐시 저장 실패: {exc}", file=sys.stderr)
+        return None
+
+
+def _spawn_ytdlp(
+    source_url: str,
+    yt_dlp_format: str,
+    live_from_start: bool,
+    verbose: bool,
+    info_json: str | os.PathLike | None = None,
+) -> subprocess.Popen:
     producer = subprocess.Popen(
-        ytdlp_cmd,
+        build_ytdlp_cmd(
+            source_url=source_url,
+            yt_dlp_format=yt_dlp_format,
+            live_from_start=live_from_start,
+            verbose=verbose,
+            info_json=info_json,
+        ),
         stdout=subprocess.PIPE,
         stderr=sys.stderr if verbose else subprocess.DEVNULL,
         bufsize=0,
+        # _signal_producer 가 yt-dlp 가 띄운 ffmpeg 까지 함께 종료할 수 있도록
+        start_new_session=True,
     )
     if producer.stdout is None:
         raise RuntimeError("yt-dlp 파이프 생성 실패")
+    return producer
 
-    consumer = subprocess.Popen(
-        ffmpeg_cmd,
-        stdin=producer.stdout,
-        stdout=sys.stdout if verbose else subprocess.DEVNULL,
-        stderr=sys.stderr if verbose else subprocess.DEVNULL,
-        bufsize=0,
-    )
 
-    pair = ProcessPair(producer, consumer)
+def _wait_consumer(
+    consumer: subprocess.Popen,
+    stop_event: threading.Event | None,
+    tick: Callable[[], None] | None = None,
+) -> bool:
+    if stop_event is None and tick is None:
+        consumer.wait()
+        return False
+    stop = stop_event if stop_event is not None else threading.Event()
+    while consumer.poll() is None and not stop.wait(0.5):
+        if tick is not None:
+            tick()
+    return stop.is_set()
 
-    def _handle_signal(signum, frame):  # type: ignore[no-untyped-def]
-        pair.terminate()
 
-    previous_int = signal.signal(signal.SIGINT, _handle_signal)
-    previous_term = signal.signal(signal.SIGTERM, _handle_signal)
+def _should_fall_back(
+    cfg: StreamConfig, result: SessionResult, log: FfmpegLog, rc_consumer: int
+) -> bool:
+    log.join()
+    result.failure = classify_ffmpeg_failure(log.lines())
+    if not cfg.copy_mode or result.failure not in COPY_FALLBACK_FAILURES:
+        return False
+    if cfg.verbose:
+        print(
+            f"copy 모드 실패({result.failure}, 종료 코드={rc_consumer}), 재인코딩으로 전환",
+            file=sys.stderr,
+        )
+    cfg.copy_mode = False
+    result.fallbacks += 1
+    return True
 
-    try:
-        rc_consumer = consumer.wait()
-        if producer.poll() is None:
-            try:
-                producer.terminate()
-            except Exception:
-                pass
-        rc_producer = producer.wait()
 
-        if rc_consumer != 0 or rc_producer != 0:
-            raise RuntimeError(f"프로세스 종료 코드: yt-dlp={rc_producer}, ffmpeg={rc_consumer}")
-    finally:
-        try:
-            signal.signal(signal.SIGINT, previous_int)
-            signal.signal(signal.SIGTERM, previous_term)
-        except Exception:
-            pass
+def _restream_direct(
+    cfg: StreamConfig,
+    result: SessionResult,
+    source_url: str,
+    yt_dlp_format: str,
+    *,
+    formats: list[dict],
+    stop_event: threading.Event | None,
+) -> None:
+    # 매니페스트 URL 을 ffmpeg 입력으로 직접 넘긴다 (producer 프로세스와 파이프 복사 없음).
+    # 서명 URL 이 만료되기 전, 또는 ffmpeg 가 만료로 끝났을 때 다시 추출해 ffmpeg 를 재시작한다.
+    stop = stop_event if stop_event is not None else threading.Event()
+    quick_failures = 0
+
+    while True:
+        expires_at = _apply_direct_formats(cfg, formats)
+        started = time.monotonic()
+        rc, log, fresh = _run_direct_ffmpeg(cfg, stop, expires_at, source_url, yt_dlp_format)
+        result.rc_consumer = rc
+        result.copy_mode = cfg.copy_mode
+
+        if stop.is_set():
+            result.stopped = True
+            return
+        if fresh is None and rc != 0 and _should_fall_back(cfg, result, log, rc):
+            # 같은 매니페스트로 재인코딩 ffmpeg 를 다시 띄운다
+            continue
+        if fresh is None:
+            fresh = _refresh_after_exit(cfg, rc, expires_at, source_url, yt_dlp_format)
+            if fresh is None:
+                return
+
+        quick_failures = _count_quick_failure(started, quick_failures, rc)
+        if cfg.verbose:
+            print("매니페스트 URL 재발급, ffmpeg 재시작", file=sys.stderr)
+        formats = fresh
+
+
+def _apply_direct_formats(cfg: StreamConfig, formats: list[dict]) -> float | None:
+    # ffmpeg 입력을 포맷 URL 로 바꾸고 가장 이른 서명 URL 만료 시각을 돌려준다
+    cfg.inputs = [str(fmt["url"]) for fmt in formats]
+    cfg.input_headers = dict(formats[0].get("http_headers") or {})
+    expiries = [e for e in (url_expiry(url) for url in cfg.inputs) if e is not None]
+    return min(expiries) if expiries else None
+
+
+def _run_direct_ffmpeg(
+    cfg: StreamConfig,
+    stop: threading.Event,
+    expires_at: float | None,
+    source_url: str,
+    yt_dlp_format: str,
+) -> tuple[int, FfmpegLog, list[dict] | None]:
+    # ffmpeg 하나를 끝날 때까지 돌린다. 만료 전에 새 URL 을 받으면 ffmpeg 를 멈추고 함께 돌려준다
+    refresh_at = expires_at - DIRECT_REFRESH_MARGIN_SECONDS if expires_at is not None else None
+    consumer, log = _spawn_ffmpeg(cfg, subprocess.DEVNULL, {})
+    fresh: list[dict] | None = None
+    with _terminate_on_signals(stop.set):
+        while consumer.poll() is None and not stop.wait(0.5):
+            if refresh_at is not None and time.time() >= refresh_at:
+                fresh = _refresh_direct_formats(source_url, yt_dlp_format, cfg.verbose)
+                if fresh is not None:
+                    break
+                # 다시 추출할 수 없으면(라이브 종료 등) ffmpeg 가 끝날 때까지 그대로 둔다
+                refresh_at = None
+        if consumer.poll() is None:
+            consumer.terminate()
+        rc = consumer.wait()
+    log.join()
+    return rc, log, fresh
+
+
+def _refresh_after_exit(
+    cfg: StreamConfig,
+    rc: int,
+    expires_at: float | None,
+    source_url: str,
+    yt_dlp_format: str,
+) -> list[dict] | None:
+    # ffmpeg 가 스스로 끝났을 때: 정상 종료이고 URL 도 유효하면 방송이 끝난 것
+    expired = expires_at is not None and time.time() >= expires_at - DIRECT_REFRESH_MARGIN_SECONDS
+    if rc == 0 and not expired:
+        return None
+    fresh = _refresh_direct_formats(source_url, yt_dlp_format, cfg.verbose)
+    if fresh is None and rc != 0:
+        raise RuntimeError(f"프로세스 종료 코드: ffmpeg={rc}")
+    return fresh
+
+
+def _count_quick_failure(started: float, quick_failures: int, rc: int) -> int:
+    # 곧바로 끝나는 재시작이 계속되면 URL 재발급으로 해결되지 않는 문제로 보고 포기한다
+    if time.monotonic() - started >= DIRECT_MIN_UPTIME_SECONDS:
+        return 0
+    quick_failures += 1
+    if quick_failures > DIRECT_MAX_QUICK_FAILURES:
+        raise RuntimeError(f"ffmpeg 가 반복해서 곧바로 종료됨: 종료 코드={rc}")
+    return quick_failures
+
+
+def _refresh_direct_formats(
+    source_url: str, yt_dlp_format: str, verbose: bool
+) -> list[dict] | None:
+    try:
+        info, formats = resolve_formats(source_url, yt_dlp_format, verbose)
+    except Exception:
+        return None
+    if not info.get("is_live"):
+        return None
+    return formats
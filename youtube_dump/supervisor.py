@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+
+
+@dataclass
+class RestartPolicy:
+    # 첫 재시작까지 대기(초). 실패가 이어지면 backoff_factor 배씩 늘리고 max_delay 에서 멈춘다
+    initial_delay: float = 1.0
+    max_delay: float = 60.0
+    backoff_factor: float = 2.0
+    # window_seconds 동안 재시작은 max_restarts 번까지. 넘으면 창이 빌 때까지 기다린다
+    max_restarts: int = 10
+    window_seconds: float = 600.0
+    # 이보다 오래 송출한 뒤의 실패는 일시적인 것으로 보고 대기 시간을 처음부터 센다
+    healthy_seconds: float = 60.0
+
+
+class RestartSupervisor:
+    # 송출 세션이 실패할 때마다 다음 재시작까지 기다릴 시간을 정한다.
+    # 라이브가 끝났는지 여부는 호출한 쪽(watcher)이 재감지로 판단하고, 여기서는
+    # 파이프라인 실패에 대한 backoff 와 창 안의 재시작 횟수만 관리한다.
+
+    def __init__(
+        self,
+        policy: RestartPolicy | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.policy = policy or RestartPolicy()
+        self.failures = 0
+        self.total_restarts = 0
+        self._clock = clock
+        self._restarts: deque[float] = deque()
+
+    def failed(self, ran_seconds: float) -> float:
+        # 실패를 기록하고 재시작까지 기다릴 시간(초)을 돌려준다
+        policy = self.policy
+        now = self._clock()
+        if ran_seconds >= policy.healthy_seconds:
+            self.failures = 0
+        delay = min(policy.max_delay, policy.initial_delay * policy.backoff_factor**self.failures)
+        self.failures += 1
+
+        while self._restarts and now - self._restarts[0] >= policy.window_seconds:
+            self._restarts.popleft()
+        if len(self._restarts) >= policy.max_restarts:
+            # 창 안의 가장 오래된 재시작이 창을 벗어날 때까지 미룬다
+            delay = max(delay, self._restarts[0] + policy.window_seconds - now)
+        self._restarts.append(now + delay)
+        self.total_restarts += 1
+        return delay
+
+    def reset(self) -> None:
+        # 라이브가 정상적으로 끝났을 때. 다음 라이브는 처음부터 센다
+        self.failures = 0
+        self._restarts.clear()
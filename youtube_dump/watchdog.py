@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+
+@dataclass
+class StallPolicy:
+    # 이 시간 동안 원본에서 데이터가 한 바이트도 오지 않으면 멈춘 것으로 본다
+    stall_seconds: float = 20.0
+    # 연속 재시작 한도. 넘으면 세션을 끝낸다 (라이브 종료 등 회복 불가)
+    max_restarts: int = 5
+    # 재시작 후 이만큼 정상적으로 흐르면 재시작 횟수를 초기화
+    healthy_seconds: float = 300.0
+    # ffmpeg speed 가 이 값 미만으로 stall_seconds 동안 이어져도 멈춘 것으로 본다
+    # (원본이 연결만 유지한 채 미디어를 거의 보내지 않는 경우)
+    min_speed: float = 0.1
+
+
+class StallWatchdog:
+    # relay 가 센 누적 수신 바이트를 주기적으로 넣어 주면 멈춤 여부를 알려 준다.
+    # 재시작 판단만 하고 실제 재시작은 호출한 쪽(streamer)이 한다.
+
+    def __init__(
+        self,
+        policy: StallPolicy | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.policy = policy or StallPolicy()
+        self.restarts = 0
+        self.total_restarts = 0
+        self._clock = clock
+        self._last_bytes = 0
+        self._last_progress = clock()
+        self._last_restart: float | None = None
+        self._slow_since: float | None = None
+
+    def observe_speed(self, speed: float | None) -> None:
+        # ffmpeg -progress 레코드마다 호출 (진행 파이프 스레드)
+        if speed is None or speed >= self.policy.min_speed:
+            self._slow_since = None
+        elif self._slow_since is None:
+            self._slow_since = self._clock()
+
+    def observe(self, bytes_in: int) -> bool:
+        now = self._clock()
+        if bytes_in != self._last_bytes:
+            self._last_bytes = bytes_in
+            self._last_progress = now
+            if (
+                self._last_restart is not None
+                and now - self._last_restart >= self.policy.healthy_seconds
+            ):
+                self.restarts = 0
+                self._last_restart = None
+        slow_since = self._slow_since
+        if slow_since is not None and now - slow_since >= self.policy.stall_seconds:
+            return True
+        return now - self._last_progress >= self.policy.stall_seconds
+
+    @property
+    def exhausted(self) -> bool:
+        return self.restarts >= self.policy.max_restarts
+
+    def restarted(self) -> None:
+        now = self._clock()
+        self.restarts += 1
+        self.total_restarts += 1
+        self._last_restart = now
+        # 새 producer 가 첫 바이트를 낼 때까지 다시 stall_seconds 만큼 기다린다
+        self._last_progress = now
+        self._slow_since = None
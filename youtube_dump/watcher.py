@@ -1,10 +1,62 @@
 from __future__ import annotations
 
+import contextlib
+import json
+import os
+import sys
+import threading
 import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from dataclasses import dataclass, field, fields
+from pathlib import Path
 
-import yt_dlp
+from . import metrics
+from .archive import ArchiveConfig
+from .infocache import InfoCache
+from .probe import LiveProbe
+from .progress import DEFAULT_SPEED_ALERT
+from .scheduler import ChannelSchedule, PollPolicy, PollScheduler
+from .streamer import MissingBinaryError, Rendition, parse_rendition, restream_youtube
+from .supervisor import RestartPolicy, RestartSupervisor
 
-from .streamer import restream_youtube
+DEFAULT_INGEST_URL = "rtmp://a.rtmp.youtube.com/live2"
+
+# yt_dlp 는 import 에만 수백 ms 가 들어 첫 감지 때 불러온다 (_yt_dlp 참고)
+yt_dlp = None
+
+POLL_SECONDS = metrics.REGISTRY.histogram(
+    "youtube_dump_poll_duration_seconds",
+    "채널 폴링 1회 소요 시간 (path: probe 에서 끝남 / extract 까지 감)",
+    ("path",),
+)
+POLLS = metrics.REGISTRY.counter(
+    "youtube_dump_polls_total", "폴링 결과 (live, upcoming, offline)", ("status",)
+)
+EXTRACT_ERRORS = metrics.REGISTRY.counter(
+    "youtube_dump_extract_errors_total", "감지 중 extract_info 예외 (라이브가 아닌 채널 포함)"
+)
+DETECTION_DELAY = metrics.REGISTRY.histogram(
+    "youtube_dump_detection_delay_seconds",
+    "라이브 시작 시각부터 감지까지 걸린 시간",
+    buckets=(5.0, 10.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0),
+)
+SESSION_RESTARTS = metrics.REGISTRY.counter(
+    "youtube_dump_session_restarts_total", "라이브가 계속되는 중 송출 실패로 세션을 재시작한 횟수"
+)
+
+# 재시작해도 나아지지 않는 오류 (바이너리 없음, 잘못된 설정)
+_FATAL_ERRORS = (MissingBinaryError, ValueError)
+
+
+def _yt_dlp():  # type: ignore[no-untyped-def]
+    global yt_dlp  # noqa: PLW0603
+    if yt_dlp is None:
+        import yt_dlp as module  # noqa: PLC0415
+
+        yt_dlp = module
+    return yt_dlp
 
 
 def normalize_channel_live_url(channel_url: str) -> str:
@@ -16,23 +68,38 @@ def normalize_channel_live_url(channel_url: str) -> str:
     return url + "/live"
 
 
-def get_live_video_url(channel_url: str) -> str | None:
-    live_url = normalize_channel_live_url(channel_url)
+DETECT_YDL_OPTS = {
+    "quiet": True,
+    "nocheckcertificate": True,
+    "noplaylist": True,
+    "skip_download": True,
+    "extract_flat": False,
+    # 예정된 라이브도 live_status/release_timestamp 를 얻을 수 있도록
+    "ignore_no_formats_error": True,
+}
 
-    ydl_opts = {
-        "quiet": True,
-        "nocheckcertificate": True,
-        "noplaylist": True,
-        "skip_download": True,
-        "extract_flat": False,
-    }
 
-    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-        try:
-            info = ydl.extract_info(live_url, download=False)
-        except Exception:
-            return None
+@dataclass
+class Detection:
+    live_video_url: str | None = None
+    live_status: str | None = None
+    release_timestamp: float | None = None
+    info: dict | None = None
 
+
+def _detection_from_info(info: dict | None) -> Detection:
+    if info is None:
+        return Detection()
+    release_timestamp = info.get("release_timestamp")
+    return Detection(
+        live_video_url=_live_url_from_info(info),
+        live_status=info.get("live_status"),
+        release_timestamp=float(release_timestamp) if release_timestamp else None,
+        info=info,
+    )
+
+
+def _live_url_from_info(info: object) -> str | None:
     if not isinstance(info, dict):
         return None
 
@@ -44,12 +111,188 @@ def get_live_video_url(channel_url: str) -> str | None:
     return None
 
 
+class DetectionSession:
+    # YoutubeDL 인스턴스(추출기, 쿠키, HTTP 커넥션 풀)를 폴링 간에 재사용한다.
+    # 일정 횟수/시간마다, 또는 추출 오류 직후에 새 인스턴스로 교체한다.
+    # probe 가 있으면 가벼운 1차 확인에서 오프라인으로 판단된 폴링은 전체 추출을 건너뛴다.
+
+    def __init__(
+        self,
+        ydl_opts: dict | None = None,
+        max_uses: int = 500,
+        max_age_seconds: float = 3600.0,
+        probe: LiveProbe | None = None,
+        cache: InfoCache | None = None,
+    ) -> None:
+        self.ydl_opts = dict(DETECT_YDL_OPTS if ydl_opts is None else ydl_opts)
+        self.cache = cache
+        self.max_uses = max_uses
+        self.max_age_seconds = max_age_seconds
+        self.probe = probe
+        self.recycles = 0
+        self.full_extractions = 0
+        self.avoided_extractions = 0
+        self._lock = threading.Lock()
+        self._ydl = None
+        self._uses = 0
+        self._created_at = 0.0
+        # 같은 라이브를 다시 감지했을 때 감지 지연을 중복 기록하지 않도록
+        self._seen_live: deque[str] = deque(maxlen=256)
+
+    def __enter__(self) -> DetectionSession:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _acquire(self):  # type: ignore[no-untyped-def]
+        expired = (
+            self._uses >= self.max_uses
+            or time.monotonic() - self._created_at >= self.max_age_seconds
+        )
+        if self._ydl is not None and expired:
+            self._discard()
+            self.recycles += 1
+        if self._ydl is None:
+            self._ydl = _yt_dlp().YoutubeDL(self.ydl_opts)
+            self._uses = 0
+            self._created_at = time.monotonic()
+        return self._ydl
+
+    def _discard(self) -> None:
+        ydl, self._ydl = self._ydl, None
+        close = getattr(ydl, "close", None)
+        if close is not None:
+            try:
+                close()
+            except Exception:
+                pass
+
+    def extract_info(self, url: str) -> dict | None:
+        with self._lock:
+            ydl = self._acquire()
+            self._uses += 1
+            self.full_extractions += 1
+            try:
+                info = ydl.extract_info(url, download=False)
+            except Exception:
+                # 세션 상태(쿠키/커넥션)가 꼬였을 수 있으므로 다음 폴링은 새 인스턴스로
+                self._discard()
+                EXTRACT_ERRORS.inc()
+                return None
+        return info if isinstance(info, dict) else None
+
+    def detect(self, channel_url: str) -> Detection:
+        live_url = normalize_channel_live_url(channel_url)
+        started = time.monotonic()
+        if self.probe is not None and not self.probe.probe(live_url).live_likely:
+            with self._lock:
+                self.avoided_extractions += 1
+            POLL_SECONDS.observe(time.monotonic() - started, path="probe")
+            POLLS.inc(status="offline")
+            return Detection()
+        detection = _detection_from_info(self.extract_info(live_url))
+        POLL_SECONDS.observe(time.monotonic() - started, path="extract")
+        self._record(detection)
+        return detection
+
+    def _record(self, detection: Detection) -> None:
+        if not detection.live_video_url:
+            upcoming = detection.live_status == "is_upcoming"
+            POLLS.inc(status="upcoming" if upcoming else "offline")
+            return
+        POLLS.inc(status="live")
+        info = detection.info or {}
+        if self.cache is not None:
+            # 재송출 producer 가 같은 info 로 바로 받을 수 있도록 (재시작 시 추출 생략)
+            try:
+                self.cache.put(info)
+            except Exception as exc:
+                print(f"info 캐시 저장 실패: {exc}", file=sys.stderr)
+        video_id = str(info.get("id") or detection.live_video_url)
+        started_at = info.get("release_timestamp") or info.get("timestamp")
+        with self._lock:
+            if video_id in self._seen_live:
+                return
+            self._seen_live.append(video_id)
+        if started_at:
+            DETECTION_DELAY.observe(max(0.0, time.time() - float(started_at)))
+
+    def get_live_video_url(self, channel_url: str) -> str | None:
+        return self.detect(channel_url).live_video_url
+
+    def close(self) -> None:
+        with self._lock:
+            self._discard()
+
+
+def get_live_video_url(channel_url: str, session: DetectionSession | None = None) -> str | None:
+    if session is not None:
+        return session.get_live_video_url(channel_url)
+
+    live_url = normalize_channel_live_url(channel_url)
+
+    with _yt_dlp().YoutubeDL(DETECT_YDL_OPTS) as ydl:
+        try:
+            info = ydl.extract_info(live_url, download=False)
+        except Exception:
+            return None
+
+    return _live_url_from_info(info)
+
+
+def detect_live(channel_url: str, session: DetectionSession) -> Detection:
+    return session.detect(channel_url)
+
+
+def supervise_restream(
+    channel_url: str,
+    detection: Detection,
+    detect: Callable[[str], Detection],
+    start: Callable[[Detection], object],
+    policy: RestartPolicy | None = None,
+    stop_event: threading.Event | None = None,
+    verbose: bool = False,
+) -> None:
+    # 라이브 하나가 끝날 때까지 송출을 유지한다. 세션이 끝나면(실패든 정상 종료든) 채널을 바로
+    # 다시 감지해서 라이브가 계속되면 backoff 후 재시작하고, 끝났으면(라이브 종료) 돌아간다.
+    # 재생목록이 잠깐 끊겨도 yt-dlp 는 정상 종료하므로 종료 코드만으로는 라이브 종료를 알 수 없다
+    supervisor = RestartSupervisor(policy)
+    while True:
+        started = time.monotonic()
+        error: Exception | None = None
+        try:
+            start(detection)
+        except _FATAL_ERRORS:
+            raise
+        except Exception as exc:
+            error = exc
+        if stop_event is not None and stop_event.is_set():
+            return
+        detection = detect(channel_url)
+        if not detection.live_video_url:
+            if verbose and error is not None:
+                print(f"라이브 종료({channel_url}): 마지막 세션 오류: {error}", file=sys.stderr)
+            return
+        delay = supervisor.failed(time.monotonic() - started)
+        SESSION_RESTARTS.inc()
+        reason = f"송출 실패({channel_url}): {error}" if error else f"송출 세션 종료({channel_url})"
+        print(
+            f"{reason} -> 라이브가 계속되어 {delay:.1f}초 후 재시작 (연속 {supervisor.failures}회)",
+            file=sys.stderr,
+        )
+        if stop_event is None:
+            time.sleep(delay)
+        elif stop_event.wait(delay):
+            return
+
+
 def watch_channel_and_restream(
     channel_url: str,
     stream_key: str,
     ingest_url: str,
     yt_dlp_format: str,
-    copy_mode: bool,
+    copy_mode: bool | None,
     video_bitrate: str,
     audio_bitrate: str,
     x264_preset: str,
@@ -57,24 +300,434 @@ def watch_channel_and_restream(
     verbose: bool,
     poll_interval_seconds: float = 15.0,
     max_checks: int | None = None,
+    probe: bool = True,
+    max_poll_interval_seconds: float = 180.0,
+    producer_mode: str = "subprocess",
+    session_log: str | os.PathLike | None = None,
+    extra_outputs: list[str] | None = None,
+    archive: ArchiveConfig | None = None,
+    relay: bool | str = False,
+    stall_timeout: float | None = None,
+    speed_alert: float | None = None,
+    restart_policy: RestartPolicy | None = None,
+    info_cache: InfoCache | None = None,
+    ingest_for: Callable[[Detection], contextlib.AbstractContextManager[tuple[str, str]]]
+    | None = None,
+    renditions: list[Rendition] | None = None,
+    stop_event: threading.Event | None = None,
 ) -> None:
+    # ingest_for: 라이브마다 (인제스트 주소, 스트림 키) 를 정해 주는 컨텍스트 (watch-oauth 의
+    # 라이브별 방송). 라이브가 끝나면(재시작 포함 세션 전체가 끝나면) 빠져나온다.
+    # stop_event: 설정되면 송출 중인 세션을 끝내고 다음 폴링 전에 돌아간다 (daemon 작업 취소)
     checks = 0
-    while True:
-        live_video_url = get_live_video_url(channel_url)
-        if live_video_url:
+    scheduler = PollScheduler(
+        PollPolicy(base_interval=poll_interval_seconds, max_interval=max_poll_interval_seconds)
+    )
+    destination = (ingest_url, stream_key)
+
+    def _restream(detection: Detection) -> None:
+        restream_youtube(
+            source_url=str(detection.live_video_url),
+            stream_key=destination[1],
+            ingest_url=destination[0],
+            yt_dlp_format=yt_dlp_format,
+            copy_mode=copy_mode,
+            video_bitrate=video_bitrate,
+            audio_bitrate=audio_bitrate,
+            x264_preset=x264_preset,
+            live_from_start=live_from_start,
+            verbose=verbose,
+            stop_event=stop_event,
+            producer_mode=producer_mode,
+            info=detection.info,
+            session_log=session_log,
+            extra_outputs=extra_outputs,
+            archive=archive,
+            relay=relay,
+            stall_timeout=stall_timeout,
+            speed_alert=speed_alert,
+            info_cache=info_cache,
+            renditions=renditions,
+        )
+
+    with DetectionSession(probe=LiveProbe() if probe else None, cache=info_cache) as session:
+        while True:
+            detection = detect_live(channel_url, session)
+            if detection.live_video_url:
+                with contextlib.ExitStack() as stack:
+                    try:
+                        destination = stack.enter_context(
+                            ingest_for(detection)
+                            if ingest_for is not None
+                            else contextlib.nullcontext((ingest_url, stream_key))
+                        )
+                    except Exception as exc:
+                        # 방송 준비(Data API) 실패는 세션 실패처럼 출력만 하고 다시 폴링한다
+                        print(f"송출 대상 준비 실패({channel_url}): {exc}", file=sys.stderr)
+                    else:
+                        supervise_restream(
+                            channel_url,
+                            detection,
+                            detect=lambda url: detect_live(url, session),
+                            start=_restream,
+                            policy=restart_policy,
+                            stop_event=stop_event,
+                            verbose=verbose,
+                        )
+                delay = scheduler.reset(channel_url)
+            else:
+                delay = scheduler.record(
+                    channel_url, detection.live_status, detection.release_timestamp
+                )
+            checks += 1
+            if max_checks is not None and checks >= max_checks:
+                break
+            if verbose:
+                _print_next_poll(channel_url, scheduler)
+            if stop_event is None:
+                time.sleep(delay)
+            elif stop_event.wait(delay):
+                break
+
+
+def _print_next_poll(channel_url: str, scheduler: PollScheduler) -> None:
+    next_poll_at = scheduler.next_poll_at(channel_url)
+    if next_poll_at is not None:
+        when = time.strftime("%H:%M:%S", time.localtime(next_poll_at))
+        print(f"다음 폴링({channel_url}): {when}", file=sys.stderr)
+
+
+@dataclass
+class ChannelConfig:
+    channel_url: str
+    stream_key: str
+    ingest_url: str = DEFAULT_INGEST_URL
+    yt_dlp_format: str = "bestvideo+bestaudio/best"
+    copy_mode: bool | None = None
+    video_bitrate: str = "3000k"
+    audio_bitrate: str = "160k"
+    x264_preset: str = "veryfast"
+    live_from_start: bool = False
+    producer_mode: str = "subprocess"
+    extra_outputs: list[str] = field(default_factory=list)
+    archive: ArchiveConfig | None = None
+    # True 또는 relay 백엔드 이름 ("ring", "splice", "copy")
+    relay: bool | str = False
+    # 원본 멈춤 감지 시간(초). 켜면 relay 를 둔다. None 이면 끔
+    stall_timeout: float | None = None
+    # 인코딩 속도 경고 기준(배속). None 이면 끔
+    speed_alert: float | None = DEFAULT_SPEED_ALERT
+    # 추가 렌디션 ("720p@2500k=URL" 형식, parse_rendition 참고)
+    renditions: list[str] = field(default_factory=list)
+
+
+def load_channel_configs(path: str | os.PathLike) -> list[ChannelConfig]:
+    # {"defaults": {...}, "channels": [{...}, ...]} 또는 채널 객체 배열.
+    # stream_key 대신 stream_key_env 로 환경변수 이름을 지정할 수 있다.
+    # archive 를 지정한 채널은 stream_key 없이 로컬 기록만 할 수 있다.
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    if isinstance(data, dict):
+        defaults = data.get("defaults", {})
+        entries = data.get("channels", [])
+    else:
+        defaults = {}
+        entries = data
+
+    return [
+        parse_channel_config({**defaults, **entry}, f"채널 #{index}")
+        for index, entry in enumerate(entries)
+    ]
+
+
+def _matches_annotation(value: object, annotation: str) -> bool:
+    # dataclass 필드 주석("float | None", "list[str]" 등)에 JSON 값이 맞는지 본다. bool 은 숫자로 치지 않는다
+    number = isinstance(value, (int, float)) and not isinstance(value, bool)
+    checks = {
+        "None": value is None,
+        "str": isinstance(value, str),
+        "bool": isinstance(value, bool),
+        "int": number and isinstance(value, int),
+        "float": number,
+        "list[str]": isinstance(value, list) and all(isinstance(item, str) for item in value),
+    }
+    return any(checks.get(name, False) for name in annotation.split(" | "))
+
+
+def _check_field_types(cls: type, values: dict, label: str) -> None:
+    for f in fields(cls):
+        if f.name in values and not _matches_annotation(values[f.name], str(f.type)):
+            raise ValueError(f"{label}: {f.name} 항목은 {f.type} 이어야 합니다: {values[f.name]!r}")
+
+
+def parse_channel_config(entry: dict, label: str = "채널") -> ChannelConfig:
+    # 설정 파일 항목 하나(또는 daemon 작업 요청)를 검증해 ChannelConfig 로 만든다
+    merged = dict(entry)
+    key_env = merged.pop("stream_key_env", None)
+    if key_env and not merged.get("stream_key"):
+        merged["stream_key"] = os.environ.get(key_env, "")
+    unknown = set(merged) - {f.name for f in fields(ChannelConfig)}
+    if unknown:
+        raise ValueError(f"{label}: 알 수 없는 항목 {sorted(unknown)}")
+    # renditions 등을 쓰기 전에 항목 형식부터 확인한다 (daemon 요청은 아무 JSON 이나 올 수 있다)
+    if isinstance(merged.get("archive"), dict):
+        _check_field_types(ArchiveConfig, merged["archive"], f"{label} archive")
+        try:
+            merged["archive"] = ArchiveConfig(**merged["archive"])
+        except TypeError as exc:
+            raise ValueError(f"{label}: archive 항목 오류: {exc}") from exc
+    _check_field_types(ChannelConfig, {k: v for k, v in merged.items() if k != "archive"}, label)
+    if merged.get("archive") is not None and not isinstance(merged["archive"], ArchiveConfig):
+        raise ValueError(f"{label}: archive 항목은 객체여야 합니다: {merged['archive']!r}")
+    try:
+        for spec in merged.get("renditions", []):
+            parse_rendition(spec)
+    except ValueError as exc:
+        raise ValueError(f"{label}: {exc}") from exc
+    if not merged.get("channel_url") or not (
+        merged.get("stream_key") or merged.get("archive") or merged.get("renditions")
+    ):
+        raise ValueError(f"{label}: channel_url 과 stream_key 가 필요합니다.")
+    merged.setdefault("stream_key", "")
+    return ChannelConfig(**merged)
+
+
+@dataclass
+class _ChannelState:
+    config: ChannelConfig
+    next_poll_at: float = 0.0
+    checks: int = 0
+    detection: Future | None = None
+    session: threading.Thread | None = None
+
+
+class MultiChannelWatcher:
+    # 감지는 크기가 고정된 스레드 풀에서, 재송출은 라이브가 잡힌 채널별 세션 스레드에서 돌린다.
+    # 한 채널이 송출 중이어도 다른 채널의 폴링은 지연되지 않는다.
+
+    def __init__(
+        self,
+        channels: list[ChannelConfig],
+        verbose: bool = False,
+        poll_interval_seconds: float = 15.0,
+        max_detect_workers: int = 4,
+        max_checks: int | None = None,
+        probe: bool = True,
+        max_poll_interval_seconds: float = 180.0,
+        session_log: str | os.PathLike | None = None,
+        restart_policy: RestartPolicy | None = None,
+        info_cache: InfoCache | None = None,
+    ) -> None:
+        self.verbose = verbose
+        self.info_cache = info_cache
+        self.session_log = session_log
+        self.restart_policy = restart_policy
+        self.poll_interval_seconds = poll_interval_seconds
+        self.max_checks = max_checks
+        self.scheduler = PollScheduler(
+            PollPolicy(base_interval=poll_interval_seconds, max_interval=max_poll_interval_seconds)
+        )
+        self._states = [_ChannelState(config) for config in channels]
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(1, max_detect_workers), thread_name_prefix="detect"
+        )
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        # 감지 워커 스레드마다 DetectionSession 하나를 두고 여러 채널이 공유한다
+        self._local = threading.local()
+        self._probe = LiveProbe() if probe else None
+        self._sessions: list[DetectionSession] = []
+        self._sessions_lock = threading.Lock()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wakeup.set()
+
+    def active_sessions(self) -> list[str]:
+        return [
+            s.config.channel_url
+            for s in self._states
+            if s.session is not None and s.session.is_alive()
+        ]
+
+    def schedule(self) -> dict[str, ChannelSchedule]:
+        return self.scheduler.snapshot()
+
+    def run(self) -> None:
+        # 첫 폴링을 간격 안에 고르게 흩어 수백 채널이 동시에 요청하지 않도록 한다
+        start = time.monotonic()
+        count = len(self._states)
+        for index, state in enumerate(self._states):
+            state.next_poll_at = start + self.poll_interval_seconds * index / max(count, 1)
+
+        try:
+            while not self._stop.is_set():
+                self._wakeup.clear()
+                now = time.monotonic()
+                for state in self._states:
+                    self._advance(state, now)
+                if self._finished():
+                    break
+                self._wakeup.wait(timeout=self._next_timeout(now))
+        finally:
+            self._stop.set()
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            for state in self._states:
+                if state.session is not None:
+                    state.session.join()
+            with self._sessions_lock:
+                if self.verbose:
+                    full = sum(session.full_extractions for session in self._sessions)
+                    avoided = sum(session.avoided_extractions for session in self._sessions)
+                    print(f"감지 통계: 전체 추출 {full}회, 생략 {avoided}회", file=sys.stderr)
+                for session in self._sessions:
+                    session.close()
+                self._sessions.clear()
+
+    def _detect(self, channel_url: str) -> Detection:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = DetectionSession(probe=self._probe, cache=self.info_cache)
+            self._local.session = session
+            with self._sessions_lock:
+                self._sessions.append(session)
+        return detect_live(channel_url, session)
+
+    def _recheck(self, channel_url: str) -> Detection:
+        # 세션 스레드의 재감지도 감지 풀에서 돌린다. 호출 스레드마다 DetectionSession 을 만들면
+        # 세션 스레드가 바뀔 때마다 감지기가 쌓인다 (감지기는 감지 워커 수만큼만)
+        try:
+            future = self._pool.submit(self._detect, channel_url)
+        except RuntimeError:
+            # run() 이 끝나며 풀이 닫힘: 라이브 종료로 보고 세션을 끝낸다
+            return Detection()
+        with contextlib.suppress(CancelledError):
+            return future.result()
+        return Detection()
+
+    def _exhausted(self, state: _ChannelState) -> bool:
+        return self.max_checks is not None and state.checks >= self.max_checks
+
+    def _finished(self) -> bool:
+        return all(
+            self._exhausted(s) and s.detection is None and s.session is None for s in self._states
+        )
+
+    def _next_timeout(self, now: float) -> float | None:
+        due = [
+            s.next_poll_at
+            for s in self._states
+            if s.detection is None and s.session is None and not self._exhausted(s)
+        ]
+        if not due:
+            return None
+        return max(0.0, min(due) - now)
+
+    def _advance(self, state: _ChannelState, now: float) -> None:
+        channel_url = state.config.channel_url
+        if state.session is not None and not state.session.is_alive():
+            state.session = None
+            state.next_poll_at = now + self.scheduler.reset(channel_url)
+
+        if state.detection is not None and state.detection.done():
+            future, state.detection = state.detection, None
+            state.checks += 1
+            try:
+                detection = future.result()
+            except Exception:
+                detection = Detection()
+            if detection.live_video_url:
+                self._start_session(state, detection)
+            else:
+                state.next_poll_at = now + self.scheduler.record(
+                    channel_url, detection.live_status, detection.release_timestamp
+                )
+
+        if (
+            state.session is None
+            and state.detection is None
+            and not self._exhausted(state)
+            and now >= state.next_poll_at
+        ):
+            state.detection = self._pool.submit(self._detect, channel_url)
+            state.detection.add_done_callback(lambda _: self._wakeup.set())
+
+    def _start_session(self, state: _ChannelState, detection: Detection) -> None:
+        state.session = threading.Thread(
+            target=self._run_session,
+            args=(state.config, detection),
+            name=f"session:{state.config.channel_url}",
+            daemon=True,
+        )
+        state.session.start()
+
+    def _run_session(self, config: ChannelConfig, detection: Detection) -> None:
+        live_video_url = str(detection.live_video_url)
+        if self.verbose:
+            print(f"라이브 감지: {config.channel_url} -> {live_video_url}", file=sys.stderr)
+
+        def _restream(detection: Detection) -> None:
             restream_youtube(
-                source_url=live_video_url,
-                stream_key=stream_key,
-                ingest_url=ingest_url,
-                yt_dlp_format=yt_dlp_format,
-                copy_mode=copy_mode,
-                video_bitrate=video_bitrate,
-                audio_bitrate=audio_bitrate,
-                x264_preset=x264_preset,
-                live_from_start=live_from_start,
-                verbose=verbose,
+                source_url=str(detection.live_video_url),
+                stream_key=config.stream_key,
+                ingest_url=config.ingest_url,
+                yt_dlp_format=config.yt_dlp_format,
+                copy_mode=config.copy_mode,
+                video_bitrate=config.video_bitrate,
+                audio_bitrate=config.audio_bitrate,
+                x264_preset=config.x264_preset,
+                live_from_start=config.live_from_start,
+                verbose=self.verbose,
+                stop_event=self._stop,
+                producer_mode=config.producer_mode,
+                info=detection.info,
+                session_log=self.session_log,
+                extra_outputs=config.extra_outputs,
+                archive=config.archive,
+                relay=config.relay,
+                stall_timeout=config.stall_timeout,
+                speed_alert=config.speed_alert,
+                info_cache=self.info_cache,
+                renditions=[parse_rendition(spec) for spec in config.renditions],
+            )
+
+        try:
+            supervise_restream(
+                config.channel_url,
+                detection,
+                detect=self._recheck,
+                start=_restream,
+                policy=self.restart_policy,
+                stop_event=self._stop,
+                verbose=self.verbose,
             )
-        checks += 1
-        if max_checks is not None and checks >= max_checks:
-            break
-        time.sleep(poll_interval_seconds)
+        except Exception as exc:
+            # 한 채널의 실패가 다른 채널 감시를 멈추지 않도록 여기서 삼킨다
+            print(f"오류({config.channel_url}): {exc}", file=sys.stderr)
+        finally:
+            self._wakeup.set()
+
+
+def watch_many_channels(
+    channels: list[ChannelConfig],
+    verbose: bool,
+    poll_interval_seconds: float = 15.0,
+    max_detect_workers: int = 4,
+    max_checks: int | None = None,
+    probe: bool = True,
+    max_poll_interval_seconds: float = 180.0,
+    session_log: str | os.PathLike | None = None,
+    restart_policy: RestartPolicy | None = None,
+    info_cache: InfoCache | None = None,
+) -> None:
+    MultiChannelWatcher(
+        channels,
+        verbose=verbose,
+        poll_interval_seconds=poll_interval_seconds,
+        max_detect_workers=max_detect_workers,
+        max_checks=max_checks,
+        probe=probe,
+        max_poll_interval_seconds=max_poll_interval_seconds,
+        session_log=session_log,
+        restart_policy=restart_policy,
+        info_cache=info_cache,
+    ).run()
@@ -1,13 +1,23 @@
 from __future__ import annotations
 
+import contextlib
 import datetime as dt
 import os
+import sys
+import threading
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
+import httplib2
+from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
+from googleapiclient.http import HttpRequest
 
 SCOPES = [
     "https://www.googleapis.com/auth/youtube",
@@ -15,6 +25,10 @@ SCOPES = [
 
 DEFAULT_CLIENT_SECRETS = os.environ.get("YOUTUBE_CLIENT_SECRETS", "client_secret.json")
 DEFAULT_TOKEN_FILE = os.environ.get("YOUTUBE_TOKEN_FILE", "token.json")
+# 재사용 liveStream 제목: "<접두어>:<풀 이름>:<번호>"
+STREAM_TITLE_PREFIX = "youtube-dump"
+# 배치 요청 하나에 넣는 최대 요청 수
+BATCH_LIMIT = 50
 
 
 def _load_credentials(
@@ -28,7 +42,7 @@ def _load_credentials(
     if not creds or not creds.valid:
         if creds and creds.expired and creds.refresh_token:
             try:
-                creds.refresh(request=None)  # type: ignore[arg-type]
+                creds.refresh(Request())
             except Exception:
                 creds = None
         if not creds:
@@ -47,42 +61,416 @@ def login(
 
 def logout(token_path: str | os.PathLike = DEFAULT_TOKEN_FILE) -> None:
     Path(token_path).unlink(missing_ok=True)
+    reset_service()
+
+
+_service_lock = threading.Lock()
+_service: Any = None
+_service_creds: Credentials | None = None
+_service_token: Path | None = None
+_thread_http = threading.local()
+
+
+def _http_for_thread(creds: Credentials) -> AuthorizedHttp:
+    # httplib2.Http 는 스레드 안전하지 않으므로 스레드마다 연결을 따로 둔다 (Credentials 는 공유)
+    http = getattr(_thread_http, "http", None)
+    if http is None or http.credentials is not creds:
+        http = AuthorizedHttp(creds, http=httplib2.Http())
+        _thread_http.http = http
+    return http
+
+
+def _per_thread_requests(creds: Credentials) -> Any:
+    # 서비스가 만드는 요청마다 호출한 스레드의 http 를 쓰도록 하는 requestBuilder
+    def _build_request(http: Any, *args: Any, **kwargs: Any) -> HttpRequest:
+        return HttpRequest(_http_for_thread(creds), *args, **kwargs)
+
+    return _build_request
 
 
 def build_service(creds: Credentials | None = None) -> Any:
-    if creds is None:
-        creds = _load_credentials()
-    return build("youtube", "v3", credentials=creds)
+    # 서비스 객체는 프로세스에서 한 번만 만든다 (토큰 파일 읽기 + discovery 문서 파싱 생략).
+    # discovery 문서는 라이브러리에 포함된 것(static_discovery)을 써서 네트워크 왕복이 없다.
+    # 만료된 토큰은 같은 Credentials 객체에서 갱신해 파일에도 다시 쓴다.
+    # 요청은 스레드별 http 로 보내므로 LiveBroadcasts 실행기와 watcher 스레드가 함께 써도 된다.
+    global _service, _service_creds, _service_token  # noqa: PLW0603
+    if creds is not None:
+        return build("youtube", "v3", credentials=creds, static_discovery=True)
+    with _service_lock:
+        if _service is None:
+            _service_token = Path(DEFAULT_TOKEN_FILE)
+            _service_creds = _load_credentials(token_path=_service_token)
+            _service = build(
+                "youtube",
+                "v3",
+                credentials=_service_creds,
+                requestBuilder=_per_thread_requests(_service_creds),
+                static_discovery=True,
+            )
+        else:
+            _refresh_in_place(_service_creds, _service_token)
+        return _service
 
 
-def create_stream_and_broadcast(
-    title: str,
-    privacy_status: str = "private",
-) -> tuple[str, str]:
-    service = build_service()
+def reset_service() -> None:
+    global _service, _service_creds, _service_token  # noqa: PLW0603
+    with _service_lock:
+        _service = _service_creds = _service_token = None
 
-    # 1) Create liveStream (returns ingestion info)
-    stream_body = {
-        "snippet": {
-            "title": title,
-        },
-        "cdn": {
-            "frameRate": "variable",
-            "ingestionType": "rtmp",
-            "resolution": "variable",
-        },
-    }
-    stream_resp = (
-        service.liveStreams()
-        .insert(part="snippet,cdn,contentDetails", body=stream_body)
-        .execute()
+
+def _refresh_in_place(creds: Credentials | None, token: Path | None) -> None:
+    if creds is None or creds.valid or not creds.refresh_token:
+        return
+    creds.refresh(Request())
+    if token is not None:
+        token.write_text(creds.to_json(), encoding="utf-8")
+
+
+@dataclass
+class IngestStream:
+    stream_id: str
+    ingestion_address: str
+    stream_name: str
+    title: str = ""
+
+
+def _ingest_stream(resp: dict) -> IngestStream:
+    ingestion = resp["cdn"]["ingestionInfo"]
+    return IngestStream(
+        stream_id=resp["id"],
+        ingestion_address=ingestion["ingestionAddress"],
+        stream_name=ingestion["streamName"],
+        title=resp.get("snippet", {}).get("title", ""),
     )
-    ingestion = stream_resp["cdn"]["ingestionInfo"]
-    ingestion_address: str = ingestion["ingestionAddress"]
-    stream_name: str = ingestion["streamName"]
-    stream_id: str = stream_resp["id"]
 
-    # 2) Create liveBroadcast
+
+class BroadcastError(RuntimeError):
+    pass
+
+
+def execute_batch(service: Any, requests: list[Any]) -> list[tuple[Any, Exception | None]]:
+    # 여러 요청을 배치 HTTP 요청 하나로 보내고 (응답, 예외) 를 요청 순서대로 돌려준다.
+    # 요청 하나는 배치 없이 그대로 보낸다.
+    if len(requests) == 1:
+        try:
+            return [(requests[0].execute(), None)]
+        except Exception as exc:  # noqa: BLE001
+            return [(None, exc)]
+    results: list[tuple[Any, Exception | None]] = [(None, None)] * len(requests)
+
+    def _collect(request_id: str, response: Any, exception: Exception | None) -> None:
+        results[int(request_id)] = (response, exception)
+
+    for start in range(0, len(requests), BATCH_LIMIT):
+        batch = service.new_batch_http_request(callback=_collect)
+        for index in range(start, min(start + BATCH_LIMIT, len(requests))):
+            batch.add(requests[index], request_id=str(index))
+        batch.execute()
+    return results
+
+
+class StreamPool:
+    # 재사용 가능한(isReusable) liveStream 을 빌려준다. 세션마다 새 liveStream 을 만들지 않고
+    # 새 broadcast 만 기존 스트림에 묶으면 되므로 API 호출(할당량)과 왕복이 줄어든다.
+    # 채널에 이미 있는 "youtube-dump:<이름>:N" 스트림을 처음 한 번 목록으로 읽어 오고,
+    # 모자라면 새로 만든다. 같은 채널을 여러 프로세스가 쓰면 풀 이름을 다르게 준다.
+
+    def __init__(self, name: str = "default", service: Any = None) -> None:
+        self.name = name
+        self._service = service
+        self._idle: list[IngestStream] | None = None
+        self._leased: dict[str, IngestStream] = {}
+        self._titles: set[str] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def service(self) -> Any:
+        return self._service if self._service is not None else build_service()
+
+    @property
+    def title_prefix(self) -> str:
+        return f"{STREAM_TITLE_PREFIX}:{self.name}:"
+
+    def acquire(self) -> IngestStream:
+        return self.acquire_many(1)[0]
+
+    def acquire_many(self, count: int) -> list[IngestStream]:
+        # 모자란 스트림은 배치 요청 하나로 한꺼번에 만든다
+        with self._lock:
+            if self._idle is None:
+                self._idle = self._list_idle()
+            streams = self._idle[:count]
+            del self._idle[:count]
+            missing = count - len(streams)
+            if missing:
+                try:
+                    streams += self._insert_many(missing)
+                except BaseException:
+                    self._idle[:0] = streams
+                    raise
+            for stream in streams:
+                self._leased[stream.stream_id] = stream
+            return streams
+
+    def warm(self) -> None:
+        with self._lock:
+            if self._idle is None:
+                self._idle = self._list_idle()
+            if not self._idle:
+                self._idle += self._insert_many(1)
+
+    def release(self, stream: IngestStream) -> None:
+        with self._lock:
+            if self._leased.pop(stream.stream_id, None) is not None and self._idle is not None:
+                self._idle.append(stream)
+
+    def _list_idle(self) -> list[IngestStream]:
+        idle: list[IngestStream] = []
+        request = self.service.liveStreams().list(
+            part="id,snippet,cdn,status,contentDetails", mine=True, maxResults=50
+        )
+        while request is not None:
+            resp = request.execute()
+            for item in resp.get("items", []):
+                title = item.get("snippet", {}).get("title", "")
+                if not title.startswith(self.title_prefix):
+                    continue
+                self._titles.add(title)
+                reusable = item.get("contentDetails", {}).get("isReusable", True)
+                # active: 지금 데이터를 받고 있는 스트림 (다른 세션이 쓰는 중)
+                busy = item.get("status", {}).get("streamStatus") == "active"
+                if reusable and not busy:
+                    idle.append(_ingest_stream(item))
+            request = self.service.liveStreams().list_next(request, resp)
+        return sorted(idle, key=lambda s: s.title)
+
+    def _next_title(self) -> str:
+        # 채널에 이미 있는 이름과 겹치지 않는 가장 작은 번호
+        index = 1
+        while f"{self.title_prefix}{index}" in self._titles:
+            index += 1
+        title = f"{self.title_prefix}{index}"
+        self._titles.add(title)
+        return title
+
+    def _insert_many(self, count: int) -> list[IngestStream]:
+        service = self.service
+        requests = []
+        for _ in range(count):
+            stream_body = {
+                "snippet": {"title": self._next_title()},
+                "cdn": {
+                    "frameRate": "variable",
+                    "ingestionType": "rtmp",
+                    "resolution": "variable",
+                },
+                "contentDetails": {"isReusable": True},
+            }
+            requests.append(
+                service.liveStreams().insert(part="snippet,cdn,contentDetails", body=stream_body)
+            )
+        streams, errors = [], []
+        for resp, exc in execute_batch(service, requests):
+            if exc is None:
+                streams.append(_ingest_stream(resp))
+            else:
+                errors.append(exc)
+        if errors:
+            # 만들어진 스트림은 다음 요청에 쓰도록 남겨 둔다
+            self._idle.extend(streams)  # type: ignore[union-attr]
+            raise BroadcastError(f"liveStream 생성 실패: {errors[0]}") from errors[0]
+        return streams
+
+
+_default_pools: dict[str, StreamPool] = {}
+
+
+def default_stream_pool(name: str = "default") -> StreamPool:
+    return _default_pools.setdefault(name, StreamPool(name))
+
+
+@dataclass
+class Broadcast:
+    broadcast_id: str
+    title: str
+    stream: IngestStream
+    # liveBroadcast status.lifeCycleStatus (created, ready, testing, live, complete, revoked ...)
+    status: str = "created"
+
+    @property
+    def ingest(self) -> tuple[str, str]:
+        return self.stream.ingestion_address, self.stream.stream_name
+
+
+class BroadcastManager:
+    # liveBroadcast 생성/바인딩/상태 조회/종료를 배치 요청으로 묶는다.
+    # 채널 30개를 한꺼번에 띄워도 생성은 (스트림 목록) + insert 배치 + bind 배치 왕복이면 되고,
+    # poll() 은 살아 있는 모든 broadcast 의 상태를 요청 하나로 읽는다.
+
+    def __init__(self, pool: StreamPool | None = None, service: Any = None) -> None:
+        self.pool = pool or default_stream_pool()
+        self._service = service
+        self._active: dict[str, Broadcast] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def service(self) -> Any:
+        return self._service if self._service is not None else self.pool.service
+
+    @property
+    def active(self) -> list[Broadcast]:
+        with self._lock:
+            return list(self._active.values())
+
+    def create(self, title: str, privacy_status: str = "private") -> Broadcast:
+        return self.create_many([title], privacy_status)[0]
+
+    def create_many(
+        self,
+        titles: list[str],
+        privacy_status: str = "private",
+        streams: list[IngestStream] | None = None,
+    ) -> list[Broadcast]:
+        # streams 를 주면 (미리 pool 에서 빌린) 그 스트림에 묶는다. 어느 쪽이든 스트림은
+        # 이후 manager 가 맡아서, 실패하거나 방송이 끝나면 pool 로 돌려준다.
+        if not titles:
+            return []
+        service = self.service
+        if streams is None:
+            streams = self.pool.acquire_many(len(titles))
+        inserted: list[tuple[Any, Exception | None]] = []
+        try:
+            inserted = execute_batch(
+                service, [_insert_broadcast_request(service, t, privacy_status) for t in titles]
+            )
+            _raise_first(inserted, "liveBroadcast 생성 실패")
+            ids = [resp["id"] for resp, _ in inserted]
+            bound = execute_batch(
+                service,
+                [
+                    service.liveBroadcasts().bind(
+                        part="id,status", id=broadcast_id, streamId=stream.stream_id
+                    )
+                    for broadcast_id, stream in zip(ids, streams, strict=True)
+                ],
+            )
+            _raise_first(bound, "liveBroadcast 바인딩 실패")
+        except BaseException:
+            # 만들어 둔 broadcast 는 채널에 남지 않도록 지우고 스트림은 돌려준다
+            self._discard(service, [resp["id"] for resp, _ in inserted if resp])
+            for stream in streams:
+                self.pool.release(stream)
+            raise
+        broadcasts = [
+            Broadcast(
+                broadcast_id=resp["id"],
+                title=title,
+                stream=stream,
+                status=resp.get("status", {}).get("lifeCycleStatus", "created"),
+            )
+            for (resp, _), title, stream in zip(bound, titles, streams, strict=True)
+        ]
+        with self._lock:
+            for broadcast in broadcasts:
+                self._active[broadcast.broadcast_id] = broadcast
+        return broadcasts
+
+    def poll(self) -> dict[str, str]:
+        # 살아 있는 broadcast 의 상태를 한 번에 읽어 갱신하고 {id: lifeCycleStatus} 를 돌려준다.
+        # 끝났거나(complete, revoked) 채널에서 사라진 broadcast 는 목록에서 빼고 스트림을 돌려준다.
+        return self._refresh(self.active)
+
+    def _refresh(self, broadcasts: list[Broadcast]) -> dict[str, str]:
+        if not broadcasts:
+            return {}
+        service = self.service
+        ids = [b.broadcast_id for b in broadcasts]
+        requests = [
+            service.liveBroadcasts().list(
+                part="id,status", id=",".join(ids[i : i + BATCH_LIMIT]), maxResults=BATCH_LIMIT
+            )
+            for i in range(0, len(ids), BATCH_LIMIT)
+        ]
+        results = execute_batch(service, requests)
+        _raise_first(results, "liveBroadcast 상태 조회 실패")
+        statuses = {
+            item["id"]: item.get("status", {}).get("lifeCycleStatus", "")
+            for resp, _ in results
+            for item in resp.get("items", [])
+        }
+        for broadcast in broadcasts:
+            broadcast.status = statuses.get(broadcast.broadcast_id, "revoked")
+            statuses[broadcast.broadcast_id] = broadcast.status
+            if broadcast.status in _FINISHED_STATUSES:
+                self._forget(broadcast)
+        return statuses
+
+    def end(self, broadcast: Broadcast) -> None:
+        self.end_many([broadcast])
+
+    def end_many(self, broadcasts: list[Broadcast]) -> None:
+        # 송출된 broadcast 는 complete 로 전환하고, 한 번도 송출되지 않은 것은 지운다.
+        # 자동 시작/종료(enableAutoStart/Stop)로 상태가 바뀌었을 수 있어 먼저 상태를 읽는다.
+        # 종료 요청이 실패해도 스트림은 pool 로 돌려준다 (다음 세션은 새 broadcast 에 묶는다)
+        try:
+            self._refresh([b for b in broadcasts if b.status not in _FINISHED_STATUSES])
+            self._finish([b for b in broadcasts if b.status not in _FINISHED_STATUSES])
+        finally:
+            for broadcast in broadcasts:
+                self._forget(broadcast)
+
+    def _finish(self, broadcasts: list[Broadcast]) -> None:
+        if not broadcasts:
+            return
+        service = self.service
+        requests = []
+        for broadcast in broadcasts:
+            if broadcast.status in _ON_AIR_STATUSES:
+                request = service.liveBroadcasts().transition(
+                    broadcastStatus="complete", id=broadcast.broadcast_id, part="id,status"
+                )
+            else:
+                request = service.liveBroadcasts().delete(id=broadcast.broadcast_id)
+            requests.append(request)
+        results = execute_batch(service, requests)
+        for broadcast, (_, exc) in zip(broadcasts, results, strict=True):
+            if exc is None:
+                broadcast.status = "complete"
+        _raise_first(results, "liveBroadcast 종료 실패")
+
+    def _discard(self, service: Any, broadcast_ids: list[str]) -> None:
+        # 정리 중의 실패가 원래 오류를 가리지 않도록 출력만 한다
+        if not broadcast_ids:
+            return
+        requests = [
+            service.liveBroadcasts().delete(id=broadcast_id) for broadcast_id in broadcast_ids
+        ]
+        try:
+            results = execute_batch(service, requests)
+        except Exception as exc:
+            results = [(None, exc)] * len(broadcast_ids)
+        for broadcast_id, (_, exc) in zip(broadcast_ids, results, strict=True):
+            if exc is not None:
+                print(f"liveBroadcast {broadcast_id} 삭제 실패: {exc}", file=sys.stderr)
+
+    def _forget(self, broadcast: Broadcast) -> None:
+        with self._lock:
+            if self._active.pop(broadcast.broadcast_id, None) is None:
+                return
+        self.pool.release(broadcast.stream)
+
+
+_FINISHED_STATUSES = frozenset({"complete", "revoked"})
+_ON_AIR_STATUSES = frozenset({"live", "liveStarting"})
+
+
+def _raise_first(results: list[tuple[Any, Exception | None]], message: str) -> None:
+    for _, exc in results:
+        if exc is not None:
+            raise BroadcastError(f"{message}: {exc}") from exc
+
+
+def _insert_broadcast_request(service: Any, title: str, privacy_status: str) -> Any:
     start_time = dt.datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
     broadcast_body = {
         "snippet": {
@@ -97,15 +485,82 @@ def create_stream_and_broadcast(
             "enableAutoStop": True,
         },
     }
-    broadcast_resp = (
-        service.liveBroadcasts()
-        .insert(part="snippet,status,contentDetails", body=broadcast_body)
-        .execute()
+    return service.liveBroadcasts().insert(
+        part="snippet,status,contentDetails", body=broadcast_body
     )
-    broadcast_id: str = broadcast_resp["id"]
 
-    # 3) Bind broadcast to stream
-    service.liveBroadcasts().bind(part="id,contentDetails", id=broadcast_id, streamId=stream_id).execute()
 
-    # Return ingestion endpoint + stream key
-    return ingestion_address, stream_name
+# liveBroadcast 제목 최대 길이
+MAX_TITLE_LENGTH = 100
+
+
+def broadcast_title(info: dict | None, now: dt.datetime | None = None) -> str:
+    # 원본 라이브 제목으로 "[채널] 제목" 을 만들고, 정보가 없으면 시각으로 대신한다
+    info = info or {}
+    title = str(info.get("title") or "").strip()
+    if not title:
+        return (now or dt.datetime.now()).strftime("Archive %Y-%m-%d %H:%M:%S")
+    channel = str(info.get("channel") or info.get("uploader") or "").strip()
+    if channel:
+        title = f"[{channel}] {title}"
+    # 제목에 < > 는 쓸 수 없다
+    title = title.replace("<", "").replace(">", "")
+    return title[:MAX_TITLE_LENGTH]
+
+
+class LiveBroadcasts:
+    # watch-oauth 용: 감지된 라이브마다 방송을 하나씩 만들고 라이브가 끝나면 닫는다.
+    # 재사용 스트림의 키는 방송보다 먼저 정해지므로, 송출은 바로 시작하고
+    # 방송 생성/바인딩은 백그라운드에서 한다 (enableAutoStart 로 바인딩되는 즉시 송출 시작).
+
+    def __init__(
+        self,
+        manager: BroadcastManager | None = None,
+        privacy_status: str = "private",
+        verbose: bool = False,
+    ) -> None:
+        self.manager = manager or BroadcastManager()
+        self.privacy_status = privacy_status
+        self.verbose = verbose
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="broadcasts")
+
+    def prewarm(self) -> Future:
+        # 스트림 목록을 미리 읽고 빈 스트림이 없으면 하나 만들어 둔다 (풀당 처음 한 번만 비용이 든다)
+        return self._executor.submit(self.manager.pool.warm)
+
+    @contextlib.contextmanager
+    def session(self, title: str) -> Iterator[tuple[str, str]]:
+        stream = self.manager.pool.acquire()
+        pending = self._executor.submit(
+            self.manager.create_many, [title], self.privacy_status, [stream]
+        )
+        try:
+            yield stream.ingestion_address, stream.stream_name
+        finally:
+            self._finish(pending)
+
+    def _finish(self, pending: Future) -> None:
+        try:
+            (broadcast,) = pending.result()
+        except Exception as exc:  # noqa: BLE001
+            print(f"방송 생성 실패: {exc}", file=sys.stderr)
+            return
+        try:
+            self.manager.end(broadcast)
+        except Exception as exc:  # noqa: BLE001
+            print(f"방송 종료 실패 ({broadcast.broadcast_id}): {exc}", file=sys.stderr)
+            return
+        if self.verbose:
+            print(f"방송 종료: {broadcast.title} ({broadcast.broadcast_id})", file=sys.stderr)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+def create_stream_and_broadcast(
+    title: str,
+    privacy_status: str = "private",
+    pool: StreamPool | None = None,
+) -> tuple[str, str]:
+    # 풀에서 재사용 스트림을 빌려 새 broadcast 를 묶는다. (인제스트 주소, 스트림 키)
+    return BroadcastManager(pool).create(title, privacy_status).ingest